@@ -0,0 +1,93 @@
+"""
+NewsForge — Transcript chunker microbenchmark.
+Times the previous sentence chunker against the byte-tracking chunk_text on
+synthetic transcripts from 100 KB to 5 MB, and checks each chunk against the
+byte budget and whether the original newlines survive.
+Usage: python -m benchmarks.bench_chunker [--sizes-kb 100 500 1000 5000] [--max-bytes 7000]
+"""
+import argparse
+import random
+import time
+
+from pipeline.fastino_client import FASTINO_CHUNK_OVERLAP, chunk_text
+
+SENTENCES = [
+    "ANCHOR: Officials in Brussels said the European Central Bank would meet again on day {}.",
+    "Reporters in São Paulo and Zürich described the market reaction as muted.",
+    "The minister told Parliament that talks with Tōkyō would resume next week!",
+    "Is this the turning point analysts have been waiting for?",
+]
+
+
+def _legacy_chunk_text(text: str, max_bytes: int = 7000) -> list[str]:
+    """The previous implementation, kept verbatim for comparison."""
+    if len(text.encode("utf-8")) <= max_bytes:
+        return [text]
+
+    sentences = text.replace("\n", ". ").split(". ")
+    chunks = []
+    current = ""
+    for s in sentences:
+        candidate = current + s + ". " if current else s + ". "
+        if len(candidate.encode("utf-8")) > max_bytes:
+            if current:
+                chunks.append(current.strip())
+            current = s + ". "
+        else:
+            current = candidate
+    if current.strip():
+        chunks.append(current.strip())
+    return chunks if chunks else [text[:max_bytes]]
+
+
+def _transcript(size_bytes: int, seed: int = 7) -> str:
+    """Speaker turns separated by newlines, with the odd unpunctuated run-on caption block."""
+    rng = random.Random(seed)
+    parts, total, i = [], 0, 0
+    while total < size_bytes:
+        if i % 400 == 399:
+            part = " ".join(f"word{j}" for j in range(1500)) + "\n"  # ~12 KB with no sentence end
+        else:
+            part = rng.choice(SENTENCES).format(i) + ("\n" if i % 5 == 4 else " ")
+        parts.append(part)
+        total += len(part.encode("utf-8"))
+        i += 1
+    return "".join(parts)
+
+
+def _measure(chunker, text: str, repeat: int) -> tuple[float, list[str]]:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        chunks = chunker(text)
+        best = min(best, time.perf_counter() - start)
+    return best, chunks
+
+
+def main(sizes_kb: list[int], repeat: int, max_bytes: int):
+    print(f"max_bytes={max_bytes}, overlap={FASTINO_CHUNK_OVERLAP} bytes, best of {repeat}")
+    print(f"{'transcript':>10} {'impl':>7} {'time':>9} {'MB/s':>7} {'chunks':>7} {'max bytes':>10} {'over budget':>12} {'newlines':>9}")
+    for kb in sizes_kb:
+        text = _transcript(kb * 1024)
+        newlines = text.count("\n")
+        for name, chunker in (
+            ("legacy", lambda t: _legacy_chunk_text(t, max_bytes)),
+            ("new", lambda t: chunk_text(t, max_bytes, FASTINO_CHUNK_OVERLAP)),
+        ):
+            elapsed, chunks = _measure(chunker, text, repeat)
+            sizes = [len(c.encode("utf-8")) for c in chunks]
+            over = sum(1 for size in sizes if size > max_bytes)
+            kept = sum(c.count("\n") for c in chunks)
+            print(
+                f"{kb:>8}KB {name:>7} {elapsed * 1000:>7.1f}ms {kb / 1024 / elapsed:>7.1f} {len(chunks):>7} "
+                f"{max(sizes):>10} {over:>12} {min(kept, newlines) / newlines:>8.0%}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes-kb", type=int, nargs="+", default=[100, 500, 1000, 5000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-bytes", type=int, default=7000, help="chunk budget; the legacy cost grows with it")
+    args = parser.parse_args()
+    main(args.sizes_kb, args.repeat, args.max_bytes)
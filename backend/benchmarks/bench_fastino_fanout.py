@@ -0,0 +1,90 @@
+"""
+NewsForge — Fastino chunk fan-out benchmark.
+Runs extract_entities over synthetic transcripts of increasing size against a
+mock GLiNER endpoint with fixed per-request latency, comparing the old
+sequential per-chunk loop with the concurrent fan-out.
+Usage: python -m benchmarks.bench_fastino_fanout [--latency-ms 300]
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from pipeline import fastino_client
+from pipeline.fastino_client import chunk_text, extract_entities
+
+SENTENCE = "Officials in Brussels said the European Central Bank would meet again on day {}. "
+
+
+def _transcript(size_bytes: int) -> str:
+    """Distinct sentences, so the coalescer cannot deduplicate chunks away."""
+    parts, total, i = [], 0, 0
+    while total < size_bytes:
+        sentence = SENTENCE.format(i)
+        parts.append(sentence)
+        total += len(sentence)
+        i += 1
+    return "".join(parts)
+
+
+def _mock_client(latency: float, fail_every: int = 0) -> httpx.AsyncClient:
+    calls = {"n": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls["n"] += 1
+        await asyncio.sleep(latency)
+        if fail_every and calls["n"] % fail_every == 0:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"result": {"entities": {"location": ["Brussels"], "organization": ["European Central Bank"]}}})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+async def _sequential_extract(text: str, client: httpx.AsyncClient) -> dict:
+    """The pre-fan-out implementation: one chunk at a time."""
+    schema = ["person", "organization", "location", "country", "date", "topic"]
+    merged = {label: [] for label in schema}
+    for chunk in chunk_text(text):
+        resp = await client.post(f"{fastino_client.FASTINO_BASE}/gliner-2", json={"task": "extract_entities", "text": chunk, "schema": schema})
+        resp.raise_for_status()
+        entities = resp.json().get("result", {}).get("entities", {})
+        for label in schema:
+            for item in entities.get(label, []):
+                if item and item not in merged[label]:
+                    merged[label].append(item)
+    return merged
+
+
+async def main(latency_ms: float, sizes_kb: list[int]):
+    latency = latency_ms / 1000
+    print(f"Mock GLiNER latency {latency_ms:.0f} ms, FASTINO_MAX_CONCURRENCY={fastino_client.FASTINO_MAX_CONCURRENCY}")
+    print(f"{'transcript':>10} {'chunks':>7} {'sequential':>12} {'fan-out':>10} {'speedup':>8}")
+    for kb in sizes_kb:
+        text = _transcript(kb * 1024)
+        chunks = len(chunk_text(text))
+
+        async with _mock_client(latency) as client:
+            start = time.perf_counter()
+            await _sequential_extract(text, client)
+            sequential = time.perf_counter() - start
+
+        async with _mock_client(latency) as client:
+            start = time.perf_counter()
+            await extract_entities(text, "bench", client)
+            fan_out = time.perf_counter() - start
+
+        print(f"{kb:>8}KB {chunks:>7} {sequential:>11.2f}s {fan_out:>9.2f}s {sequential / fan_out:>7.1f}x")
+
+    async with _mock_client(latency, fail_every=5) as client:
+        start = time.perf_counter()
+        result = await extract_entities(_transcript(140 * 1024), "bench", client)
+        print(f"With every 5th request failing: {time.perf_counter() - start:.2f}s, merged labels intact: {bool(result['location'])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--sizes-kb", type=int, nargs="+", default=[7, 35, 70, 140, 280])
+    args = parser.parse_args()
+    asyncio.run(main(args.latency_ms, args.sizes_kb))
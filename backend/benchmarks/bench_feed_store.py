@@ -0,0 +1,117 @@
+"""
+NewsForge — Feed history store benchmark.
+Fills a throwaway SQLite FeedStore with synthetic feeds (100k by default) and
+reports batched write throughput and the latency of the /api/feeds and
+/api/search queries: plain and filtered listings, a deep cursor page, a
+single-feed fetch and full-text searches of rare and common terms.
+Usage: python -m benchmarks.bench_feed_store [--feeds 100000] [--batch 500] [--repeat 50]
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from pipeline.feed_store import FeedStore
+
+PEOPLE = [f"Person {i}" for i in range(2000)]
+ORGS = ["European Central Bank", "NATO", "World Health Organization", "Reuters", "MIT"] + [f"Org {i}" for i in range(500)]
+PLACES = ["Brussels", "Tokyo", "São Paulo", "Zürich", "Nairobi"] + [f"City {i}" for i in range(1000)]
+CATEGORIES = ["politics", "economy", "technology", "health", "conflict", "environment", "other"]
+VERDICTS = ["verified", "disputed", "unclear"]
+WORDS = "inflation ceasefire election vaccine drought merger tariff protest summit outage earthquake budget".split()
+
+
+def _feed(i: int, rng: random.Random) -> dict:
+    events = [
+        {"headline": f"{rng.choice(WORDS).title()} talks in {rng.choice(PLACES)}", "summary": " ".join(rng.choices(WORDS, k=12)),
+         "category": rng.choice(CATEGORIES), "severity": "medium"}
+        for _ in range(rng.randint(2, 6))
+    ]
+    topics: dict[str, int] = {}
+    for e in events:
+        topics[e["category"]] = topics.get(e["category"], 0) + 1
+    return {
+        "video_title": f"NewsForge Analysis — broadcast {i}",
+        "video_id": f"vid-{i}",
+        "transcript_summary": "",
+        "raw_reka": {"transcript": " ".join(rng.choices(WORDS, k=400)) + f" marker{i}"},
+        "events": events,
+        "entities": {
+            "persons": rng.sample(PEOPLE, 5),
+            "organizations": rng.sample(ORGS, 3),
+            "locations": rng.sample(PLACES, 3),
+            "dates": [],
+            "topics": rng.sample(WORDS, 2),
+        },
+        "verified_claims": [
+            {"claim": f"The {rng.choice(WORDS)} figure rose {rng.randint(1, 90)}%", "verdict": rng.choice(VERDICTS),
+             "confidence": 0.7, "explanation": ""}
+            for _ in range(rng.randint(0, 5))
+        ],
+        "overall_sentiment": rng.choice(["positive", "neutral", "negative"]),
+        "bias_indicator": "center",
+        "alert_level": rng.choice(["critical", "high", "medium", "low"]),
+        "credibility_score": 0.6,
+        "topic_distribution": topics,
+        "total_stories": len(events),
+    }
+
+
+async def _time(call, repeat: int) -> tuple[float, float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await call()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+async def main(feeds: int, batch: int, repeat: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        store = FeedStore(path=os.path.join(tmp, "feeds.db"), batch_size=batch)
+        rng = random.Random(7)
+        start = time.perf_counter()
+        for i in range(feeds):
+            await store.add(_feed(i, rng), f"https://youtu.be/{i}")
+            if (i + 1) % batch == 0:
+                await store.flush()
+        await store.flush()
+        elapsed = time.perf_counter() - start
+        stats = store.stats()
+        print(f"wrote {stats['written']} feeds in {elapsed:.1f}s ({stats['written'] / elapsed:.0f} feeds/s, "
+              f"{stats['avg_batch_write_ms']:.1f}ms per {batch}-feed batch)")
+
+        deep = (await store.list_feeds(limit=1, cursor=feeds // 2))["items"][0]["id"]
+        queries = [
+            ("latest page", lambda: store.list_feeds(limit=20)),
+            ("deep cursor page", lambda: store.list_feeds(limit=20, cursor=deep)),
+            ("alert_level=high", lambda: store.list_feeds(limit=20, alert_level="high")),
+            ("verdict=disputed", lambda: store.list_feeds(limit=20, verdict="disputed")),
+            ("entity=NATO", lambda: store.list_feeds(limit=20, entity="nato")),
+            ("entity (rare)", lambda: store.list_feeds(limit=20, entity="Person 1234")),
+            ("topic=health", lambda: store.list_feeds(limit=20, topic="health")),
+            ("get feed", lambda: store.get_feed(deep)),
+            ("search rare term", lambda: store.search(f"marker{feeds // 3}")),
+            ("search prefix", lambda: store.search(f"marker{feeds // 30}*")),
+            ("search common term", lambda: store.search("ceasefire")),
+            ("search common, deep", lambda: store.search("ceasefire", cursor=deep)),
+            ("search common, bm25", lambda: store.search("ceasefire", sort="relevance")),
+        ]
+        print(f"{'query':>20} {'p50':>8} {'p95':>8}")
+        for name, call in queries:
+            p50, p95 = await _time(call, repeat)
+            print(f"{name:>20} {p50:>6.2f}ms {p95:>6.2f}ms")
+        await store.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--feeds", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.feeds, args.batch, args.repeat))
@@ -0,0 +1,207 @@
+"""
+NewsForge — End-to-end load benchmark against mock vendors.
+Starts benchmarks.mock_vendors and a NewsForge backend pointed at it (or uses
+running ones via --mock-url/--backend-url). It drives --jobs /api/analyze runs
+with --concurrency in flight and reports end-to-end latency (p50/p95/p99), time
+to the first pipeline event, jobs per minute and vendor calls per job. Add
+--json to save the numbers for comparing runs. The backend inherits this
+process's environment, e.g. PIPELINE_MAX_CONCURRENT. Its caches and feed history
+stay off unless --with-caches is given. Mock options (latency, faults,
+streaming) are passed through.
+Usage: python -m benchmarks.bench_load [--jobs 20] [--concurrency 4] [--rate-limit-rate 0.02] [--json out.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Optional
+
+import httpx
+
+from benchmarks.mock_vendors import add_arguments
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered) + 0.5) - 1))]
+
+
+async def _wait_ready(url: str, timeout: float = 30):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(url)).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.2)
+    raise SystemExit(f"{url} did not come up within {timeout:.0f}s")
+
+
+def _spawn(args: list[str], env: dict) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, *args], cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL)
+
+
+def _mock_args(args: argparse.Namespace, port: int) -> list[str]:
+    argv = ["-m", "benchmarks.mock_vendors", "--port", str(port)]
+    for name in (
+        "reka_latency_ms", "fastino_latency_ms", "yutori_latency_ms", "latency_sigma", "error_rate",
+        "rate_limit_rate", "stream_chunks", "stream_interval_ms", "transcript_kb", "indexing_s", "research_s", "seed",
+    ):
+        value = getattr(args, name)
+        if value is not None:
+            argv += [f"--{name.replace('_', '-')}", str(value)]
+    return argv
+
+
+def _backend_env(mock_url: str, with_caches: bool) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "REKA_BASE": mock_url, "FASTINO_BASE": mock_url, "YUTORI_BASE": mock_url,
+        "REKA_BYPASS": "false", "DEMO_MODE": "false",
+        "REKA_API_KEY": "bench", "FASTINO_API_KEY": "bench", "YUTORI_API_KEY": "bench",
+    })
+    if not with_caches:
+        for name in ("FEED_CACHE_ENABLED", "CLAIM_CACHE_ENABLED", "REKA_INDEX_ENABLED", "FEED_STORE_ENABLED"):
+            env[name] = "false"
+    return env
+
+
+async def _run_job(client: httpx.AsyncClient, backend_url: str, video_url: str) -> dict:
+    started = time.perf_counter()
+    first_event: Optional[float] = None
+    event = None
+    try:
+        async with client.stream("POST", f"{backend_url}/api/analyze", json={"video_url": video_url}) as resp:
+            if resp.status_code != 200 or not resp.headers.get("content-type", "").startswith("text/event-stream"):
+                await resp.aread()
+                return {"ok": False, "error": f"HTTP {resp.status_code}: {resp.text[:120]}"}
+            async for line in resp.aiter_lines():
+                if line.startswith("event:"):
+                    event = line[6:].strip()
+                elif line.startswith("data:"):
+                    now = time.perf_counter() - started
+                    if first_event is None and event not in ("job", "ping", "queued"):
+                        first_event = now
+                    if event == "complete":
+                        return {"ok": True, "latency": now, "first_event": first_event}
+                    if event in ("error", "cancelled"):
+                        return {"ok": False, "error": f"{event}: {line[5:].strip()[:120]}"}
+    except httpx.HTTPError as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    return {"ok": False, "error": "stream ended without a complete event"}
+
+
+async def _drive(backend_url: str, mock_url: str, jobs: int, concurrency: int, same_url: bool) -> dict:
+    limits = httpx.Limits(max_connections=concurrency + 4)
+    async with httpx.AsyncClient(timeout=httpx.Timeout(None, connect=10), limits=limits) as client:
+        await client.post(f"{mock_url}/_mock/reset")
+        gate = asyncio.Semaphore(concurrency)
+
+        async def one(i: int) -> dict:
+            async with gate:
+                url = "https://www.youtube.com/watch?v=benchmark" if same_url else f"https://www.youtube.com/watch?v=bench{i:06d}"
+                return await _run_job(client, backend_url, url)
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(one(i) for i in range(jobs)))
+        wall = time.perf_counter() - started
+        vendor = (await client.get(f"{mock_url}/_mock/stats")).json()
+    return {"results": results, "wall": wall, "vendor": vendor}
+
+
+def _summarize(run: dict, jobs: int, concurrency: int) -> dict:
+    ok = [r for r in run["results"] if r["ok"]]
+    latencies = [r["latency"] for r in ok]
+    firsts = [r["first_event"] for r in ok if r["first_event"] is not None]
+    by_vendor: dict[str, int] = defaultdict(int)
+    for endpoint, count in run["vendor"]["calls"].items():
+        by_vendor[endpoint.split(" ", 1)[0]] += count
+    return {
+        "jobs": jobs,
+        "concurrency": concurrency,
+        "completed": len(ok),
+        "failed": jobs - len(ok),
+        "errors": sorted({r["error"] for r in run["results"] if not r["ok"]})[:5],
+        "wall_seconds": round(run["wall"], 2),
+        "jobs_per_minute": round(len(ok) / run["wall"] * 60, 2),
+        "latency_seconds": {f"p{p}": round(_percentile(latencies, p), 3) for p in (50, 95, 99)},
+        "first_event_seconds": {f"p{p}": round(_percentile(firsts, p), 3) for p in (50, 95, 99)},
+        "vendor_calls_per_job": {vendor: round(count / jobs, 2) for vendor, count in sorted(by_vendor.items())},
+        "endpoint_calls_per_job": {ep: round(count / jobs, 2) for ep, count in sorted(run["vendor"]["calls"].items())},
+        "injected_faults": run["vendor"]["faults"],
+    }
+
+
+def _report(summary: dict):
+    print(f"{summary['completed']}/{summary['jobs']} jobs completed at concurrency {summary['concurrency']} "
+          f"in {summary['wall_seconds']}s — {summary['jobs_per_minute']} jobs/min")
+    for name, key in (("end-to-end", "latency_seconds"), ("first event", "first_event_seconds")):
+        pct = summary[key]
+        print(f"{name:>12}: p50 {pct['p50']:.2f}s  p95 {pct['p95']:.2f}s  p99 {pct['p99']:.2f}s")
+    print("vendor calls per job: " + ", ".join(f"{v} {n}" for v, n in summary["vendor_calls_per_job"].items()))
+    for endpoint, n in summary["endpoint_calls_per_job"].items():
+        print(f"{endpoint:>32} {n:>7}")
+    if summary["injected_faults"]:
+        print("injected faults: " + ", ".join(f"{k} ×{v}" for k, v in summary["injected_faults"].items()))
+    for error in summary["errors"]:
+        print(f"  failed: {error}")
+
+
+async def main(args: argparse.Namespace):
+    processes = []
+    mock_url, backend_url = args.mock_url, args.backend_url
+    try:
+        if not mock_url:
+            port = _free_port()
+            mock_url = f"http://127.0.0.1:{port}"
+            processes.append(_spawn(_mock_args(args, port), dict(os.environ)))
+        await _wait_ready(f"{mock_url}/_mock/stats")
+        if not backend_url:
+            port = _free_port()
+            backend_url = f"http://127.0.0.1:{port}"
+            processes.append(_spawn(
+                ["-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+                _backend_env(mock_url, args.with_caches),
+            ))
+        await _wait_ready(f"{backend_url}/api/health")
+
+        summary = _summarize(await _drive(backend_url, mock_url, args.jobs, args.concurrency, args.same_url), args.jobs, args.concurrency)
+        _report(summary)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(summary, f, indent=2)
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--jobs", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4, help="/api/analyze streams held open at once")
+    parser.add_argument("--mock-url", help="use an already running mock vendor server")
+    parser.add_argument("--backend-url", help="use an already running backend (it must point at the mock)")
+    parser.add_argument("--same-url", action="store_true", help="analyze one URL repeatedly instead of a unique URL per job")
+    parser.add_argument("--with-caches", action="store_true", help="leave the backend's caches and feed history enabled")
+    parser.add_argument("--json", help="write the summary to this file")
+    add_arguments(parser)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,71 @@
+"""
+NewsForge — Complete-event serialization benchmark.
+Builds a feed whose raw Reka answers hold a long transcript (1-8 MB by
+default). For each size it measures the time to encode the complete event
+into an SSE frame on the event loop: json.dumps plus sse_starlette (the old
+path) vs. serialization.sse_frame (orjson). It also reports the frame size
+sent inline vs. by reference, where raw_reka is fetched from
+/api/feeds/{id}/raw (gzip size shown).
+Usage: python -m benchmarks.bench_serialization [--sizes-mb 1 2 4 8] [--repeat 10]
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+
+from sse_starlette.sse import ServerSentEvent
+
+from pipeline import serialization
+from pipeline.feed_store import slim_feed
+from pipeline.orchestrator import DEMO_FEED
+
+WORDS = "the minister said inflation ceasefire talks resumed in brussels while markets rallied on tariff news".split()
+
+
+def _feed(transcript_mb: float, rng: random.Random) -> dict:
+    feed = DEMO_FEED.model_dump()
+    words = []
+    size = 0
+    while size < transcript_mb * 1024 * 1024:
+        word = rng.choice(WORDS)
+        words.append(word)
+        size += len(word) + 1
+    transcript = " ".join(words)
+    feed["raw_reka"] = {
+        "transcript": transcript,
+        "events": transcript[: len(transcript) // 20],
+        "claims": transcript[: len(transcript) // 40],
+    }
+    return feed
+
+
+def _time(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main(args: argparse.Namespace):
+    rng = random.Random(7)
+    print(f"{'transcript':>10} {'json+sse ms':>12} {'sse_frame ms':>13} {'inline KB':>10} {'by-ref KB':>10} {'raw gzip KB':>12}")
+    for mb in args.sizes_mb:
+        feed = _feed(mb, rng)
+        event = {"feed": feed, "degraded": False}
+        slim = {"feed": slim_feed(feed), "degraded": False, "feed_id": 1, "raw_url": "/api/feeds/1/raw"}
+        std = _time(lambda: ServerSentEvent(id="1", event="complete", data=json.dumps(event)).encode(), args.repeat)
+        fast = _time(lambda: serialization.sse_frame("complete", event, "1"), args.repeat)
+        inline = len(serialization.dumps_bytes(event)) / 1024
+        by_ref = len(serialization.dumps_bytes(slim)) / 1024
+        raw_gz = len(gzip.compress(serialization.dumps_bytes(feed["raw_reka"]), compresslevel=6)) / 1024
+        print(f"{mb:>8g}MB {std:>12.2f} {fast:>13.2f} {inline:>10.0f} {by_ref:>10.1f} {raw_gz:>12.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes-mb", type=float, nargs="+", default=[1, 2, 4, 8], help="transcript sizes")
+    parser.add_argument("--repeat", type=int, default=10, help="timing runs per size (best is reported)")
+    main(parser.parse_args())
@@ -0,0 +1,104 @@
+"""
+NewsForge — Reka stream framing benchmark.
+Streams six Reka prompts at once through a real Job and an SSE-encoding
+subscriber, the way /api/analyze does. It compares the old framing (one
+event per upstream chunk re-sending the last 80 characters) with
+StreamCoalescer's rate-limited delta frames, and reports SSE frames, bytes
+and CPU time per job. It also checks that the delta frames rebuild every
+answer exactly.
+Usage: python -m benchmarks.bench_stream_frames [--chunks 400] [--chunk-chars 24] [--chunk-interval-ms 5] [--interval-ms 100] [--jobs 5]
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from sse_starlette.sse import ServerSentEvent
+
+from pipeline.jobs import Job
+from pipeline.stream_frames import StreamCoalescer
+
+PROMPTS = ("transcript", "events", "sentiment", "locations", "claims", "quotes")
+
+
+def _answer(prompt: str, chunks: int, chunk_chars: int) -> list[str]:
+    """Cumulative answer texts as Reka streams them, one per chunk."""
+    word = f"{prompt} words "
+    text, out = "", []
+    for _ in range(chunks):
+        text += (word * (chunk_chars // len(word) + 1))[:chunk_chars]
+        out.append(text)
+    return out
+
+
+async def _legacy_prompt(prompt: str, texts: list[str], emit, interval: float):
+    for text in texts:
+        await emit("reka_stream", {"prompt": prompt, "chunk": text[-80:] if len(text) > 80 else text, "done": False})
+        await asyncio.sleep(interval)
+    await emit("reka_prompt_complete", {"prompt": prompt, "char_count": len(texts[-1])})
+
+
+async def _coalesced_prompt(prompt: str, texts: list[str], emit, interval: float):
+    for text in texts:
+        await emit("reka_stream", {"prompt": prompt, "text": text})
+        await asyncio.sleep(interval)
+    await emit("reka_prompt_complete", {"prompt": prompt, "char_count": len(texts[-1])})
+
+
+async def _run_job(mode: str, answers: dict[str, list[str]], chunk_interval: float, frame_interval: float) -> dict:
+    job = Job("https://example.com/bench")
+    frames = 0
+    sent_bytes = 0
+    rebuilt: dict[str, str] = {}
+
+    async def subscriber():
+        nonlocal frames, sent_bytes
+        async for item in job.stream():
+            if item is None:
+                continue
+            event_id, event_type, data = item
+            sent_bytes += len(ServerSentEvent(id=str(event_id), event=event_type, data=json.dumps(data)).encode())
+            frames += 1
+            if event_type == "reka_stream" and "delta" in data:
+                rebuilt[data["prompt"]] = rebuilt.get(data["prompt"], "")[:data["offset"]] + data["delta"]
+
+    consumer = asyncio.ensure_future(subscriber())
+    await asyncio.sleep(0)
+    cpu = time.process_time()
+    if mode == "legacy":
+        await asyncio.gather(*(_legacy_prompt(p, t, job.publish, chunk_interval) for p, t in answers.items()))
+    else:
+        emit = StreamCoalescer(job.publish, frame_interval)
+        await asyncio.gather(*(_coalesced_prompt(p, t, emit, chunk_interval) for p, t in answers.items()))
+        await emit.aclose()
+    await job.publish("complete", {"feed": {}})
+    await job.finish()
+    await consumer
+    cpu = time.process_time() - cpu
+    exact = all(rebuilt.get(p) == t[-1] for p, t in answers.items()) if mode == "coalesced" else None
+    return {"frames": frames, "bytes": sent_bytes, "cpu_ms": cpu * 1000, "exact": exact}
+
+
+async def main(args: argparse.Namespace):
+    answers = {p: _answer(p, args.chunks, args.chunk_chars) for p in PROMPTS}
+    text_bytes = sum(len(t[-1]) for t in answers.values())
+    print(f"{len(PROMPTS)} prompts × {args.chunks} chunks of {args.chunk_chars} chars every {args.chunk_interval_ms:g} ms "
+          f"({text_bytes / 1024:.0f} KB of answer text per job); frame interval {args.interval_ms:g} ms\n")
+    print(f"{'framing':<11} {'frames/job':>11} {'KB/job':>9} {'CPU ms/job':>11}  lossless")
+    for mode in ("legacy", "coalesced"):
+        runs = [await _run_job(mode, answers, args.chunk_interval_ms / 1000, args.interval_ms / 1000) for _ in range(args.jobs)]
+        frames = sum(r["frames"] for r in runs) / len(runs)
+        kb = sum(r["bytes"] for r in runs) / len(runs) / 1024
+        cpu = sorted(r["cpu_ms"] for r in runs)[len(runs) // 2]
+        exact = "n/a (tail only)" if mode == "legacy" else ("yes" if all(r["exact"] for r in runs) else "NO")
+        print(f"{mode:<11} {frames:>11.0f} {kb:>9.1f} {cpu:>11.1f}  {exact}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunks", type=int, default=400, help="upstream chunks per prompt")
+    parser.add_argument("--chunk-chars", type=int, default=24, help="characters each chunk adds")
+    parser.add_argument("--chunk-interval-ms", type=float, default=5, help="time between upstream chunks")
+    parser.add_argument("--interval-ms", type=float, default=100, help="StreamCoalescer frame interval")
+    parser.add_argument("--jobs", type=int, default=5, help="jobs per framing (CPU is the median)")
+    asyncio.run(main(parser.parse_args()))
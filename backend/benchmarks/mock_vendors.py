@@ -0,0 +1,297 @@
+"""
+NewsForge — Local stand-in for the Reka, Fastino and Yutori APIs.
+Serves every endpoint the pipeline calls from one app, with lognormal latency
+per vendor, streamed Reka answers, simulated indexing and research durations,
+and injected 429 and 5xx responses, so the pipeline can be load-tested without
+spending vendor quota. Point the backend at it with
+REKA_BASE=FASTINO_BASE=YUTORI_BASE=http://127.0.0.1:9100 and REKA_BYPASS=false.
+GET /_mock/stats returns per-endpoint call counts; POST /_mock/reset clears them.
+Usage: python -m benchmarks.mock_vendors [--port 9100] [--reka-latency-ms 300] [--error-rate 0.01] [--rate-limit-rate 0.02]
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+from pipeline.orchestrator import _synthetic_reka_outputs
+from pipeline.reka_client import REKA_PROMPTS
+
+PERSONS = ["Jensen Huang", "Donald Trump", "Ursula von der Leyen", "Christine Lagarde", "António Guterres", "Olaf Scholz"]
+ORGANIZATIONS = ["Nvidia", "Mercedes-Benz", "European Central Bank", "NATO", "Reuters", "United Nations"]
+LOCATIONS = ["Las Vegas", "Brussels", "Beijing", "Frankfurt", "Geneva", "Tokyo"]
+COUNTRIES = ["China", "United States", "Germany", "Japan"]
+TOPICS = ["artificial intelligence", "export controls", "autonomous vehicles", "inflation", "semiconductors"]
+
+
+@dataclass
+class VendorProfile:
+    """Latency and fault behaviour of one mocked vendor."""
+
+    latency_ms: float = 100.0
+    sigma: float = 0.5  # lognormal spread; 0 makes every call take exactly latency_ms
+    error_rate: float = 0.0
+    rate_limit_rate: float = 0.0
+
+    def delay(self, rng: random.Random) -> float:
+        return self.latency_ms / 1000 * math.exp(self.sigma * rng.gauss(0, 1))
+
+
+@dataclass
+class MockConfig:
+    reka: VendorProfile = field(default_factory=lambda: VendorProfile(latency_ms=300))
+    fastino: VendorProfile = field(default_factory=lambda: VendorProfile(latency_ms=80))
+    yutori: VendorProfile = field(default_factory=lambda: VendorProfile(latency_ms=120))
+    stream_chunks: int = 20  # SSE chunks per streamed Reka answer
+    stream_interval_ms: float = 50.0
+    transcript_kb: int = 0  # pad the transcript answer to at least this size (0 = as-is)
+    indexing_seconds: float = 0.0
+    research_seconds: float = 5.0
+    research_updates: int = 3
+    retry_after: int = 1
+    seed: Optional[int] = None
+
+
+def _answers(transcript_kb: int) -> dict[str, str]:
+    answers = dict(_synthetic_reka_outputs()[0])
+    transcript = answers.get("transcript", "")
+    if transcript_kb and transcript:
+        answers["transcript"] = "\n".join([transcript] * max(1, transcript_kb * 1024 // len(transcript) + 1))
+    return answers
+
+
+def create_app(config: Optional[MockConfig] = None) -> FastAPI:
+    """Build the mock vendor app; ``config`` defaults to ``MockConfig()``."""
+    config = config or MockConfig()
+    rng = random.Random(config.seed)
+    answers = _answers(config.transcript_kb)
+    prompt_names = {question: name for name, question in REKA_PROMPTS.items()}
+    videos: dict[str, float] = {}
+    tasks: dict[str, dict] = {}
+    calls: Counter = Counter()
+    faults: Counter = Counter()
+    app = FastAPI(title="NewsForge mock vendors")
+
+    async def vendor_call(vendor: str, endpoint: str) -> Optional[JSONResponse]:
+        """Count the call, wait out its latency and maybe inject a fault."""
+        profile: VendorProfile = getattr(config, vendor)
+        calls[f"{vendor} {endpoint}"] += 1
+        await asyncio.sleep(profile.delay(rng))
+        roll = rng.random()
+        if roll < profile.rate_limit_rate:
+            faults[f"{vendor} 429"] += 1
+            return JSONResponse({"error": "rate limited"}, status_code=429, headers={"Retry-After": str(config.retry_after)})
+        if roll < profile.rate_limit_rate + profile.error_rate:
+            faults[f"{vendor} 500"] += 1
+            return JSONResponse({"error": "injected failure"}, status_code=500)
+        return None
+
+    # ── Reka Vision ──
+
+    @app.post("/v1/videos/upload")
+    async def reka_upload():
+        fault = await vendor_call("reka", "upload")
+        if fault:
+            return fault
+        video_id = f"mock-{uuid.uuid4().hex[:12]}"
+        videos[video_id] = time.monotonic()
+        return {"video_id": video_id, "status": "indexing"}
+
+    @app.get("/v1/videos/{video_id}")
+    async def reka_video(video_id: str):
+        fault = await vendor_call("reka", "video_status")
+        if fault:
+            return fault
+        uploaded = videos.get(video_id)
+        if uploaded is None:
+            return JSONResponse({"error": "video not found"}, status_code=404)
+        indexed = time.monotonic() - uploaded >= config.indexing_seconds
+        return {"video_id": video_id, "indexing_status": "indexed" if indexed else "indexing"}
+
+    @app.post("/v1/qa/chat")
+    async def reka_chat(request: Request):
+        body = await request.json()
+        streaming = bool(body.get("stream"))
+        fault = await vendor_call("reka", "chat_stream" if streaming else "chat")
+        if fault:
+            return fault
+        question = (body.get("messages") or [{}])[-1].get("content", "")
+        text = answers.get(prompt_names.get(question, ""), "No answer.")
+        if not streaming:
+            return {"chat_response": text}
+
+        async def frames():
+            chunks = max(1, config.stream_chunks)
+            for i in range(1, chunks + 1):
+                await asyncio.sleep(config.stream_interval_ms / 1000)
+                yield f"data: {json.dumps({'chat_response': text[:len(text) * i // chunks]})}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(frames(), media_type="text/event-stream")
+
+    @app.post("/v1/qa/indexedtag")
+    async def reka_tags():
+        fault = await vendor_call("reka", "tags")
+        if fault:
+            return fault
+        return {"tags": [{"name": tag} for tag in TOPICS[:3]]}
+
+    # ── Fastino GLiNER 2 ──
+
+    def gliner_result(task: str, text: str, schema) -> dict:
+        pick = random.Random(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest())
+        if task == "extract_entities":
+            return {"entities": {
+                "person": pick.sample(PERSONS, 3),
+                "organization": pick.sample(ORGANIZATIONS, 3),
+                "location": pick.sample(LOCATIONS, 2),
+                "country": pick.sample(COUNTRIES, 1),
+                "date": ["next year"],
+                "topic": pick.sample(TOPICS, 2),
+            }}
+        if task == "classify_text":
+            categories = schema.get("categories", ["neutral"]) if isinstance(schema, dict) else ["neutral"]
+            return {"category": pick.choice(categories)}
+        if task == "extract_json":
+            sentences = [s.strip() for s in text.replace("\n", ". ").split(". ") if len(s.strip()) > 20]
+            return {"events": [
+                {
+                    "headline": sentence[:90],
+                    "summary": sentence,
+                    "category": pick.choice(["politics", "economy", "science", "other"]),
+                    "sentiment": pick.choice(["positive", "neutral", "negative"]),
+                    "severity": pick.choice(["low", "medium", "high"]),
+                    "timestamp": "",
+                }
+                for sentence in sentences[:2]
+            ]}
+        return {}
+
+    @app.post("/gliner-2")
+    async def gliner(request: Request):
+        body = await request.json()
+        task = body.get("task", "")
+        fault = await vendor_call("fastino", task or "gliner")
+        if fault:
+            return fault
+        if "texts" in body:
+            return {"results": [{"result": gliner_result(task, text, body.get("schema"))} for text in body["texts"]]}
+        return {"result": gliner_result(task, body.get("text", ""), body.get("schema"))}
+
+    # ── Yutori Research ──
+
+    @app.post("/v1/research/tasks")
+    async def yutori_create(request: Request):
+        body = await request.json()
+        fault = await vendor_call("yutori", "create_task")
+        if fault:
+            return fault
+        task_id = uuid.uuid4().hex
+        tasks[task_id] = {"created": time.monotonic(), "query": body.get("query", ""), "cancelled": False}
+        return {"task_id": task_id, "view_url": f"http://mock.yutori/research/tasks/{task_id}", "status": "queued"}
+
+    @app.get("/v1/research/tasks/{task_id}")
+    async def yutori_get(task_id: str):
+        fault = await vendor_call("yutori", "get_task")
+        if fault:
+            return fault
+        task = tasks.get(task_id)
+        if task is None:
+            return JSONResponse({"error": "task not found"}, status_code=404)
+        progress = (time.monotonic() - task["created"]) / config.research_seconds if config.research_seconds else 1.0
+        updates = [
+            {"content": f"Checked source {i + 1} for the claim.", "citations": [{"url": f"https://example.org/source-{i + 1}"}]}
+            for i in range(min(config.research_updates, int(progress * config.research_updates)))
+        ]
+        data = {"task_id": task_id, "view_url": f"http://mock.yutori/research/tasks/{task_id}", "updates": updates}
+        if task["cancelled"]:
+            return {**data, "status": "failed"}
+        if progress < 1:
+            return {**data, "status": "running"}
+        pick = random.Random(task_id)
+        return {
+            **data,
+            "status": "succeeded",
+            "result": "The claim matches published reporting.",
+            "structured_result": {
+                "verdict": pick.choice(["verified", "disputed", "unclear"]),
+                "explanation": "Mock verdict from the local research stand-in.",
+                "source_url": "https://example.org/source-1",
+                "confidence": round(pick.uniform(0.5, 0.95), 2),
+            },
+        }
+
+    @app.post("/v1/research/tasks/{task_id}/cancel")
+    async def yutori_cancel(task_id: str):
+        fault = await vendor_call("yutori", "cancel_task")
+        if fault:
+            return fault
+        if task_id in tasks:
+            tasks[task_id]["cancelled"] = True
+        return {"task_id": task_id, "status": "cancelled"}
+
+    # ── Harness hooks ──
+
+    @app.get("/_mock/stats")
+    async def mock_stats():
+        return {"calls": dict(calls), "faults": dict(faults), "total_calls": sum(calls.values())}
+
+    @app.post("/_mock/reset")
+    async def mock_reset():
+        calls.clear()
+        faults.clear()
+        return {"reset": True}
+
+    return app
+
+
+def config_from_args(args: argparse.Namespace) -> MockConfig:
+    def profile(latency_ms: float) -> VendorProfile:
+        return VendorProfile(latency_ms, args.latency_sigma, args.error_rate, args.rate_limit_rate)
+
+    return MockConfig(
+        reka=profile(args.reka_latency_ms),
+        fastino=profile(args.fastino_latency_ms),
+        yutori=profile(args.yutori_latency_ms),
+        stream_chunks=args.stream_chunks,
+        stream_interval_ms=args.stream_interval_ms,
+        transcript_kb=args.transcript_kb,
+        indexing_seconds=args.indexing_s,
+        research_seconds=args.research_s,
+        seed=args.seed,
+    )
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--reka-latency-ms", type=float, default=300, help="median latency per Reka call")
+    parser.add_argument("--fastino-latency-ms", type=float, default=80, help="median latency per GLiNER call")
+    parser.add_argument("--yutori-latency-ms", type=float, default=120, help="median latency per Yutori call")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="lognormal spread of every latency (0 = fixed)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of calls answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of calls answered with 429 + Retry-After")
+    parser.add_argument("--stream-chunks", type=int, default=20, help="SSE chunks per streamed Reka answer")
+    parser.add_argument("--stream-interval-ms", type=float, default=50, help="delay between streamed chunks")
+    parser.add_argument("--transcript-kb", type=int, default=0, help="pad the transcript answer to this size")
+    parser.add_argument("--indexing-s", type=float, default=0, help="seconds before an uploaded video is indexed")
+    parser.add_argument("--research-s", type=float, default=5, help="seconds a Yutori research task runs")
+    parser.add_argument("--seed", type=int, default=None)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9100)
+    add_arguments(parser)
+    args = parser.parse_args()
+    uvicorn.run(create_app(config_from_args(args)), host=args.host, port=args.port, log_level="warning")
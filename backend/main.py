@@ -1,23 +1,69 @@
 """NewsForge — FastAPI backend with SSE streaming pipeline."""
 import asyncio
-import json
+import gzip
 import os
 import time
 from contextlib import asynccontextmanager
+from typing import Optional
 
 import httpx
 from dotenv import load_dotenv
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
 from pydantic import BaseModel
 from sse_starlette.sse import EventSourceResponse
 
 load_dotenv(os.path.join(os.path.dirname(__file__), '..', '.env'))
 
 from models import AnalyzeRequest
-from pipeline.orchestrator import run_pipeline
+from pipeline import cancellation, resilience, serialization, tracing
+from pipeline.metrics import AppCollector
+from pipeline.broker import JobBroker
+from pipeline.batch import BATCH_MAX_ITEMS, BatchProgress, analyze_url, batch_concurrency, run_batch
+from pipeline.claim_cache import ClaimCache
+from pipeline.fastino_client import gliner_coalescer
+from pipeline.feed_cache import FeedCache, run_cached_pipeline
+from pipeline.feed_store import FeedStore
+from pipeline.http_pool import VendorClients
+from pipeline.jobs import Job, JobManager
+from pipeline.reka_index import RekaVideoIndex
+from pipeline.scheduler import PipelineScheduler, QueueFull
+from pipeline.trends import WINDOWS, TrendAggregator
+from pipeline.yutori_client import yutori_poller
 
-app = FastAPI(title="NewsForge API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create one pooled HTTP client per vendor for the lifetime of the app."""
+    app.state.vendor_clients = VendorClients.from_env()
+    app.state.feed_cache = FeedCache.from_env()
+    app.state.video_index = RekaVideoIndex.from_env()
+    app.state.claim_cache = ClaimCache.from_env()
+    app.state.feed_store = FeedStore.from_env()
+    app.state.trends = TrendAggregator.from_env()
+    if app.state.trends is not None and app.state.feed_store is not None:
+        app.state.trends.seed(await app.state.feed_store.recent(time.time() - app.state.trends.horizon))
+    app.state.scheduler = PipelineScheduler.from_env()
+    app.state.jobs = JobManager(scheduler=app.state.scheduler, broker=JobBroker.from_env())
+    collector = AppCollector(app.state)
+    REGISTRY.register(collector)
+    try:
+        yield
+    finally:
+        REGISTRY.unregister(collector)
+        await app.state.jobs.aclose()
+        for component in (app.state.claim_cache, app.state.video_index):
+            if component is not None:
+                await component.aclose()
+        if app.state.feed_store is not None:
+            await app.state.feed_store.aclose()
+        await yutori_poller().aclose()
+        await app.state.vendor_clients.aclose()
+
+
+app = FastAPI(title="NewsForge API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -33,62 +79,356 @@ async def health():
     return {"status": "ok", "timestamp": time.time(), "service": "newsforge"}
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: stage and vendor latency histograms, error counters, queue and job gauges."""
+    return Response(generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.get("/api/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    """Chrome trace-event JSON of a traced run; open it in https://ui.perfetto.dev."""
+    path = os.path.join(tracing.trace_dir(), f"{trace_id}.json")
+    if not tracing.TRACE_ID.match(trace_id) or not os.path.isfile(path):
+        return JSONResponse({"error": "trace not found"}, status_code=404)
+    return FileResponse(path, media_type="application/json", filename=f"newsforge-trace-{trace_id}.json")
+
+
+@app.get("/api/stats")
+async def stats(request: Request):
+    """Runtime counters for the caches, the GLiNER coalescer, the Yutori poller and vendor health."""
+    feed_cache = request.app.state.feed_cache
+    video_index = request.app.state.video_index
+    claim_cache = request.app.state.claim_cache
+    feed_store = request.app.state.feed_store
+    return {
+        "feed_cache": feed_cache.stats() if feed_cache else None,
+        "reka_video_index": video_index.stats() if video_index else None,
+        "claim_cache": claim_cache.stats() if claim_cache else None,
+        "feed_store": feed_store.stats() if feed_store else None,
+        "trends": request.app.state.trends.stats() if request.app.state.trends else None,
+        "gliner_coalescer": gliner_coalescer().stats(),
+        "yutori_poller": yutori_poller().stats(),
+        "jobs": request.app.state.jobs.stats(),
+        "scheduler": request.app.state.scheduler.stats(),
+        "cancelled_work": cancellation.stats(),
+        "vendors": resilience.stats(),
+    }
+
+
+def _vendor_keys() -> tuple[str, str, str]:
+    return (
+        os.getenv("REKA_API_KEY", ""),
+        os.getenv("FASTINO_API_KEY", ""),
+        os.getenv("YUTORI_API_KEY", ""),
+    )
+
+
+def _start_job(app: FastAPI, body: dict, cancel_on_disconnect: bool) -> Job:
+    """Start a pipeline job for an /api/analyze or /api/jobs request body."""
+    video_url = body.get("video_url", "")
+    refresh = bool(body.get("refresh", False))
+    replay_progress = bool(body.get("replay_progress", True))
+    trace = bool(body.get("trace", False))
+    reka_key, fastino_key, yutori_key = _vendor_keys()
+
+    async def runner(job: Job):
+        await run_cached_pipeline(
+            video_url, reka_key, fastino_key, yutori_key, job.publish,
+            clients=app.state.vendor_clients,
+            cache=app.state.feed_cache,
+            replay_progress=replay_progress,
+            refresh=refresh,
+            store=app.state.feed_store,
+            trends=app.state.trends,
+            video_index=app.state.video_index,
+            claim_cache=app.state.claim_cache,
+            trace=trace,
+        )
+
+    return app.state.jobs.start(video_url, runner, cancel_on_disconnect=cancel_on_disconnect)
+
+
+def _validate(body: dict) -> Optional[dict]:
+    if not body.get("video_url", ""):
+        return {"error": "video_url is required"}
+    if not all(_vendor_keys()):
+        return {"error": "API keys are not properly configured in the backend environment"}
+    return None
+
+
+def _queue_full(e: QueueFull) -> JSONResponse:
+    return JSONResponse(
+        {"error": "NewsForge is at capacity, please retry shortly", "retry_after": e.retry_after},
+        status_code=503,
+        headers={"Retry-After": str(e.retry_after)},
+    )
+
+
+def _last_event_id(request: Request) -> int:
+    raw = request.headers.get("last-event-id") or request.query_params.get("last_event_id") or "0"
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return 0
+
+
+_PING_FRAME = serialization.sse_frame("ping", {})
+
+
+async def _job_event_stream(job: Job, after: int = 0):
+    """Render a job's event stream as SSE frames, with IDs for Last-Event-ID resume."""
+    heartbeat_interval = 15
+    async for item in job.stream(after, heartbeat=heartbeat_interval):
+        if item is None:
+            yield _PING_FRAME
+            continue
+        event_id, event_type, data = item
+        yield serialization.sse_frame(event_type, data, str(event_id))
+
+
 @app.post("/api/analyze")
 async def analyze(request: Request):
-    """Run the full analysis pipeline, streaming results via SSE."""
+    """Run the full analysis pipeline, streaming results via SSE.
+
+    When every pipeline slot is busy the job waits in line, emitting ``queued``
+    events; a full queue is answered with 503 and ``Retry-After``.
+
+    The pipeline runs as a job whose first event carries its ``job_id``. If the
+    client disconnects and does not resume from ``/api/jobs/{id}/events`` within
+    the grace period, the job is cancelled along with its vendor work.
+
+    With ``"trace": true`` the run ends with a ``timing`` event (critical path
+    and a link to its Chrome trace). Cache hits are replayed untraced, so
+    combine it with ``"refresh": true`` for a URL that is already cached.
+    """
     body = await request.json()
-    video_url = body.get("video_url", "")
-    reka_key = os.getenv("REKA_API_KEY", "")
-    fastino_key = os.getenv("FASTINO_API_KEY", "")
-    yutori_key = os.getenv("YUTORI_API_KEY", "")
+    invalid = _validate(body)
+    if invalid:
+        return invalid
+    try:
+        job = _start_job(request.app, body, cancel_on_disconnect=True)
+    except QueueFull as e:
+        return _queue_full(e)
+    return EventSourceResponse(_job_event_stream(job))
 
-    if not video_url:
-        return {"error": "video_url is required"}
-    if not reka_key or not fastino_key or not yutori_key:
+
+@app.post("/api/jobs")
+async def create_job(request: Request):
+    """Start a pipeline job without holding a connection open.
+
+    Set ``cancel_on_disconnect`` to have the job cancelled once nobody is
+    streaming its events.
+    """
+    body = await request.json()
+    invalid = _validate(body)
+    if invalid:
+        return invalid
+    try:
+        job = _start_job(request.app, body, cancel_on_disconnect=bool(body.get("cancel_on_disconnect", False)))
+    except QueueFull as e:
+        return _queue_full(e)
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "events_url": f"/api/jobs/{job.id}/events",
+        "status_url": f"/api/jobs/{job.id}",
+    }
+
+
+@app.post("/api/batch")
+async def batch(request: Request):
+    """Analyze a list of broadcast URLs with a worker pool, streaming NDJSON.
+
+    Body: ``{"video_urls": [...], "concurrency": 4, "refresh": false}``. One
+    line is written per finished item (``type`` ``feed`` or ``error``, with the
+    item's input ``index``) followed by a closing ``summary`` line. The batch
+    shares the app's pooled vendor clients and caches.
+    """
+    body = await request.json()
+    video_urls = body.get("video_urls")
+    if not isinstance(video_urls, list) or not video_urls or not all(isinstance(u, str) and u for u in video_urls):
+        return JSONResponse({"error": "video_urls must be a non-empty list of URLs"}, status_code=400)
+    if len(video_urls) > BATCH_MAX_ITEMS:
+        return JSONResponse({"error": f"at most {BATCH_MAX_ITEMS} URLs per batch"}, status_code=400)
+    if not all(_vendor_keys()):
         return {"error": "API keys are not properly configured in the backend environment"}
 
-    queue: asyncio.Queue = asyncio.Queue()
-    pipeline_done = asyncio.Event()
-
-    async def emit(event_type: str, data: dict):
-        await queue.put({"event": event_type, "data": data})
-
-    async def run_pipeline_task():
-        try:
-            await run_pipeline(video_url, reka_key, fastino_key, yutori_key, emit)
-        except Exception as e:
-            await emit("error", {"message": str(e), "stage": "pipeline"})
-        finally:
-            pipeline_done.set()
-            await queue.put(None)  # sentinel
-
-    async def event_generator():
-        task = asyncio.create_task(run_pipeline_task())
-
-        # Heartbeat to keep connection alive
-        heartbeat_interval = 15
-
-        while True:
-            try:
-                item = await asyncio.wait_for(queue.get(), timeout=heartbeat_interval)
-                if item is None:
-                    break
-                yield {
-                    "event": item["event"],
-                    "data": json.dumps(item["data"]),
-                }
-            except asyncio.TimeoutError:
-                # Send heartbeat
-                yield {
-                    "event": "ping",
-                    "data": json.dumps({}),
-                }
-
-        # Ensure task is done
-        if not task.done():
-            await task
-
-    return EventSourceResponse(event_generator())
+    app_state = request.app.state
+    reka_key, fastino_key, yutori_key = _vendor_keys()
+    refresh = bool(body.get("refresh", False))
+
+    async def run_item(video_url: str) -> dict:
+        return await analyze_url(
+            video_url, reka_key, fastino_key, yutori_key,
+            clients=app_state.vendor_clients,
+            feed_cache=app_state.feed_cache,
+            video_index=app_state.video_index,
+            claim_cache=app_state.claim_cache,
+            feed_store=app_state.feed_store,
+            trends=app_state.trends,
+            refresh=refresh,
+        )
+
+    async def lines():
+        progress = BatchProgress(len(video_urls))
+        async for record in run_batch(video_urls, run_item, batch_concurrency(body.get("concurrency"))):
+            progress.add(record)
+            yield serialization.dumps(record) + "\n"
+        yield serialization.dumps(progress.summary()) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str, request: Request):
+    """Snapshot of a job's current state, partial results and final feed."""
+    snapshot = await request.app.state.jobs.snapshot(job_id)
+    if snapshot is None:
+        return JSONResponse({"error": "job not found"}, status_code=404)
+    return snapshot
+
+
+@app.delete("/api/jobs/{job_id}")
+async def cancel_job(job_id: str, request: Request):
+    """Cancel a running job and its outstanding vendor work."""
+    cancelled = await request.app.state.jobs.cancel(job_id, "cancelled by client")
+    if cancelled is None:
+        return JSONResponse({"error": "job not found"}, status_code=404)
+    return {"job_id": job_id, "cancelled": cancelled}
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    """Stream a job's events via SSE, resuming after ``Last-Event-ID`` when given.
+
+    With a shared ``JOB_BROKER`` this works on any worker, not just the one running the job.
+    """
+    job = await request.app.state.jobs.find(job_id)
+    if job is None:
+        return JSONResponse({"error": "job not found"}, status_code=404)
+    return EventSourceResponse(_job_event_stream(job, _last_event_id(request)))
+
+
+def _page_limit(raw: Optional[str]) -> int:
+    try:
+        return min(100, max(1, int(raw or 20)))
+    except ValueError:
+        return 20
+
+
+def _int_param(raw: Optional[str]) -> Optional[int]:
+    try:
+        return int(raw) if raw else None
+    except ValueError:
+        return None
+
+
+def _float_param(raw: Optional[str]) -> Optional[float]:
+    try:
+        return float(raw) if raw else None
+    except ValueError:
+        return None
+
+
+@app.get("/api/feeds")
+async def list_feeds(request: Request):
+    """Page through stored feeds, newest first.
+
+    Filters: ``alert_level``, ``verdict``, ``entity``, ``topic`` and a
+    ``since``/``until`` unix-time window. Pass ``next_cursor`` from one page as
+    ``cursor`` to fetch the next.
+    """
+    store = request.app.state.feed_store
+    if store is None:
+        return JSONResponse({"error": "feed history is disabled"}, status_code=404)
+    params = request.query_params
+    return await store.list_feeds(
+        limit=_page_limit(params.get("limit")),
+        cursor=_int_param(params.get("cursor")),
+        alert_level=params.get("alert_level"),
+        verdict=params.get("verdict"),
+        entity=params.get("entity"),
+        topic=params.get("topic"),
+        since=_float_param(params.get("since")),
+        until=_float_param(params.get("until")),
+    )
+
+
+@app.get("/api/feeds/{feed_id}")
+async def get_feed(feed_id: int, request: Request):
+    """A stored feed in full."""
+    store = request.app.state.feed_store
+    record = await store.get_feed(feed_id) if store is not None else None
+    if record is None:
+        return JSONResponse({"error": "feed not found"}, status_code=404)
+    return record
+
+
+def _accepts_gzip(request: Request) -> bool:
+    for part in request.headers.get("accept-encoding", "").split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+@app.get("/api/feeds/{feed_id}/raw")
+async def get_feed_raw(feed_id: int, request: Request):
+    """A stored feed's ``raw_reka`` (full Reka answers and transcript), gzip-encoded when the client accepts it."""
+    store = request.app.state.feed_store
+    raw = await store.get_raw(feed_id) if store is not None else None
+    if raw is None:
+        return JSONResponse({"error": "feed not found"}, status_code=404)
+    etag = f'"{raw["etag"]}"'
+    # A stored feed never changes, so its ETag is stable for good
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=31536000, immutable", "Vary": "Accept-Encoding"}
+    if_none_match = request.headers.get("if-none-match", "")
+    if if_none_match.strip() == "*" or etag in (t.strip().removeprefix("W/") for t in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    if _accepts_gzip(request):
+        return Response(raw["raw_gz"], media_type="application/json", headers={**headers, "Content-Encoding": "gzip"})
+    body = await asyncio.to_thread(gzip.decompress, raw["raw_gz"])
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@app.get("/api/search")
+async def search_feeds(request: Request):
+    """Full-text search across stored transcripts, events and claims.
+
+    ``q`` is a list of terms (a trailing ``*`` matches a prefix). Matches come
+    newest-first, paged with ``cursor`` like ``/api/feeds``; ``sort=relevance``
+    ranks them by BM25 instead, paged with ``offset``.
+    """
+    store = request.app.state.feed_store
+    if store is None:
+        return JSONResponse({"error": "feed history is disabled"}, status_code=404)
+    params = request.query_params
+    q = params.get("q", "").strip()
+    if not q:
+        return JSONResponse({"error": "q is required"}, status_code=400)
+    return await store.search(
+        q,
+        limit=_page_limit(params.get("limit")),
+        cursor=_int_param(params.get("cursor")),
+        offset=max(0, _int_param(params.get("offset")) or 0),
+        sort="relevance" if params.get("sort") == "relevance" else "recent",
+    )
+
+
+@app.get("/api/trends")
+async def trends(request: Request):
+    """Top entities, topics, co-occurring entities, sentiment and alert mix across recent feeds.
+
+    ``window`` is ``hour`` (default), ``day`` or ``week``.
+    """
+    aggregator = request.app.state.trends
+    if aggregator is None:
+        return JSONResponse({"error": "trend aggregation is disabled"}, status_code=404)
+    window = request.query_params.get("window", "hour")
+    if window not in WINDOWS:
+        return JSONResponse({"error": f"window must be one of: {', '.join(WINDOWS)}"}, status_code=400)
+    return aggregator.view(window)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,367 @@
+"""NewsForge — Batch analysis of many broadcast URLs through a worker pool.
+
+A fixed number of workers pull URLs from a shared queue and run each one
+through the (cached) pipeline with the app's pooled vendor clients and caches,
+so throughput scales with the worker count rather than with per-request
+connection setup. Results are yielded in completion order as plain dicts —
+``{"type": "feed", ...}`` for a finished ``IntelligenceFeed`` and
+``{"type": "error", ...}`` for an item that failed — ready to be written out
+as one NDJSON line each.
+
+Run as ``python -m pipeline.batch`` for large offline runs: URLs are read from
+a file (or stdin) and feeds appended to a JSONL file. Items already in the
+output are skipped on restart, and the Reka ``video_id``s, parsed claims and
+Yutori ``task_id``s of in-flight items are checkpointed, so a killed run
+resumes without re-uploading videos or re-creating research tasks::
+
+    python -m pipeline.batch urls.txt -o feeds.jsonl --concurrency 8
+
+Configuration (all optional, read from the environment):
+- ``BATCH_CONCURRENCY``     — workers used when a batch doesn't ask for a count
+- ``BATCH_MAX_CONCURRENCY`` — upper bound on workers for a single batch
+- ``BATCH_MAX_ITEMS``       — most URLs accepted by one ``/api/batch`` request
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Optional
+
+from pipeline import serialization
+from pipeline.claim_cache import ClaimCache
+from pipeline.feed_cache import FeedCache, run_cached_pipeline
+from pipeline.feed_store import FeedStore
+from pipeline.http_pool import VendorClients
+from pipeline.reka_index import RekaVideoIndex
+from pipeline.trends import TrendAggregator
+
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+BATCH_MAX_CONCURRENCY = int(os.getenv("BATCH_MAX_CONCURRENCY", "16"))
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "1000"))
+
+
+def batch_concurrency(requested: Optional[int] = None) -> int:
+    """Clamp a requested worker count to ``[1, BATCH_MAX_CONCURRENCY]``."""
+    if not requested:
+        requested = BATCH_CONCURRENCY
+    return max(1, min(int(requested), BATCH_MAX_CONCURRENCY))
+
+
+class FeedSink:
+    """Non-SSE ``emit`` that keeps only what a batch needs from one pipeline run."""
+
+    def __init__(self):
+        self.feed: Optional[dict] = None
+        self.degraded = False
+        self.error: Optional[str] = None
+        self.warnings: list[str] = []
+
+    async def __call__(self, event_type: str, data: dict):
+        if event_type == "complete":
+            self.feed = data.get("feed")
+            self.degraded = bool(data.get("degraded"))
+        elif event_type == "error":
+            self.error = data.get("message", "Unknown error")
+        elif event_type == "log" and data.get("type") == "warn":
+            self.warnings.append(data.get("message", ""))
+
+
+async def analyze_url(
+    video_url: str,
+    reka_key: str,
+    fastino_key: str,
+    yutori_key: str,
+    clients: Optional[VendorClients] = None,
+    feed_cache: Optional[FeedCache] = None,
+    video_index: Optional[RekaVideoIndex] = None,
+    claim_cache: Optional[ClaimCache] = None,
+    feed_store: Optional[FeedStore] = None,
+    trends: Optional[TrendAggregator] = None,
+    refresh: bool = False,
+    sink: Optional[FeedSink] = None,
+    yutori_tasks: Optional[dict[str, str]] = None,
+    resumed_claims: Optional[list[str]] = None,
+) -> dict:
+    """Run one URL through the pipeline and return its batch result record."""
+    sink = sink or FeedSink()
+    started = time.monotonic()
+    try:
+        await run_cached_pipeline(
+            video_url, reka_key, fastino_key, yutori_key, sink,
+            clients=clients,
+            cache=feed_cache,
+            replay_progress=False,
+            refresh=refresh,
+            store=feed_store,
+            trends=trends,
+            video_index=video_index,
+            claim_cache=claim_cache,
+            yutori_tasks=yutori_tasks,
+            resumed_claims=resumed_claims,
+        )
+    except Exception as e:
+        sink.error = sink.error or str(e) or type(e).__name__
+    elapsed = round(time.monotonic() - started, 2)
+    if sink.feed is None:
+        return {"type": "error", "video_url": video_url, "error": sink.error or "pipeline produced no feed", "elapsed": elapsed}
+    return {
+        "type": "feed",
+        "video_url": video_url,
+        "degraded": sink.degraded,
+        "warnings": sink.warnings,
+        "elapsed": elapsed,
+        "feed": sink.feed,
+    }
+
+
+async def run_batch(
+    video_urls: Iterable[str],
+    run_item: Callable[[str], Awaitable[dict]],
+    concurrency: int = BATCH_CONCURRENCY,
+) -> AsyncIterator[dict]:
+    """Run ``run_item`` over ``video_urls`` with ``concurrency`` workers, yielding records as they finish.
+
+    Each record gets the item's ``index`` in the input. Closing the iterator
+    early (e.g. the client went away) cancels the workers and their vendor work.
+    """
+    pending: asyncio.Queue = asyncio.Queue()
+    for item in enumerate(video_urls):
+        pending.put_nowait(item)
+    total = pending.qsize()
+    done: asyncio.Queue = asyncio.Queue()
+
+    async def worker():
+        while True:
+            try:
+                index, video_url = pending.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                record = await run_item(video_url)
+            except Exception as e:
+                record = {"type": "error", "video_url": video_url, "error": str(e) or type(e).__name__}
+            await done.put({"index": index, **record})
+
+    workers = [asyncio.ensure_future(worker()) for _ in range(max(1, min(concurrency, total)))]
+    try:
+        for _ in range(total):
+            yield await done.get()
+    finally:
+        for w in workers:
+            w.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+
+class BatchProgress:
+    """Running counts and throughput for a batch, without holding on to the feeds."""
+
+    def __init__(self, total: int = 0):
+        self.total = total
+        self.started = time.monotonic()
+        self.items = 0
+        self.feeds = 0
+        self.degraded = 0
+        self.errors = 0
+
+    def add(self, record: dict):
+        self.items += 1
+        if record.get("type") == "feed":
+            self.feeds += 1
+            self.degraded += bool(record.get("degraded"))
+        else:
+            self.errors += 1
+
+    def summary(self) -> dict:
+        """Closing line of a batch: counts and throughput."""
+        elapsed = time.monotonic() - self.started
+        return {
+            "type": "summary",
+            "items": self.items,
+            "total": self.total,
+            "feeds": self.feeds,
+            "degraded": self.degraded,
+            "errors": self.errors,
+            "elapsed": round(elapsed, 2),
+            "items_per_min": round(self.items / elapsed * 60, 2) if elapsed > 0 else 0.0,
+        }
+
+
+# ── Command-line batch runs ──
+
+class BatchCheckpoint:
+    """Append-only JSONL log of the vendor handles created by in-flight items."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.handles: dict[str, dict] = {}
+
+    def load(self) -> "BatchCheckpoint":
+        if not os.path.exists(self.path):
+            return self
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn final line from a killed run
+                video_url = entry.get("video_url")
+                if not video_url:
+                    continue
+                if entry.get("done"):
+                    self.handles.pop(video_url, None)
+                    continue
+                handle = self.handles.setdefault(video_url, {"reka_video_id": None, "claims": None, "yutori_tasks": {}})
+                if entry.get("reka_video_id"):
+                    handle["reka_video_id"] = entry["reka_video_id"]
+                if entry.get("claims") is not None:
+                    handle["claims"] = entry["claims"]
+                if entry.get("yutori_task_id"):
+                    handle["yutori_tasks"][entry.get("claim", "")] = entry["yutori_task_id"]
+        return self
+
+    def record(self, entry: dict):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+
+class CheckpointingSink(FeedSink):
+    """``FeedSink`` that also checkpoints the vendor handles a run creates."""
+
+    def __init__(self, video_url: str, checkpoint: BatchCheckpoint):
+        super().__init__()
+        self.video_url = video_url
+        self.checkpoint = checkpoint
+
+    async def __call__(self, event_type: str, data: dict):
+        if event_type == "video_uploaded" and data.get("video_id"):
+            self.checkpoint.record({"video_url": self.video_url, "reka_video_id": data["video_id"]})
+        elif event_type == "claims_identified":
+            self.checkpoint.record({"video_url": self.video_url, "claims": data.get("claims", [])})
+        elif event_type == "yutori_task_created" and data.get("task_id"):
+            self.checkpoint.record({"video_url": self.video_url, "yutori_task_id": data["task_id"], "claim": data.get("claim", "")})
+        await super().__call__(event_type, data)
+
+
+def _read_urls(source: str) -> list[str]:
+    stream = sys.stdin if source == "-" else open(source, "r", encoding="utf-8")
+    try:
+        lines = [line.strip() for line in stream]
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    return list(dict.fromkeys(line for line in lines if line and not line.startswith("#")))
+
+
+def _finished_urls(output: str, retry_errors: bool) -> set[str]:
+    finished = set()
+    if not os.path.exists(output):
+        return finished
+    with open(output, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("type") == "feed" or (record.get("type") == "error" and not retry_errors):
+                finished.add(record.get("video_url"))
+    return finished
+
+
+def _report(progress: BatchProgress, record: dict):
+    summary = progress.summary()
+    rate = summary["items_per_min"]
+    remaining = progress.total - progress.items
+    eta = f"{remaining / rate:.1f}m" if rate else "?"
+    status = "degraded" if record.get("degraded") else record["type"]
+    print(
+        f"[{progress.items:>{len(str(progress.total))}}/{progress.total}] {status:<8} {record['video_url']} "
+        f"({record.get('elapsed', 0)}s) | {rate} items/min | ETA {eta}",
+        file=sys.stderr,
+        flush=True,
+    )
+
+
+async def _run_cli(args: argparse.Namespace):
+    from dotenv import load_dotenv
+
+    load_dotenv(os.path.join(os.path.dirname(__file__), "..", "..", ".env"))
+    keys = (os.getenv("REKA_API_KEY", ""), os.getenv("FASTINO_API_KEY", ""), os.getenv("YUTORI_API_KEY", ""))
+    if not all(keys):
+        raise SystemExit("REKA_API_KEY, FASTINO_API_KEY and YUTORI_API_KEY must be set")
+
+    urls = _read_urls(args.input)
+    finished = _finished_urls(args.output, args.retry_errors)
+    todo = [u for u in urls if u not in finished]
+    checkpoint = BatchCheckpoint(args.checkpoint or args.output + ".checkpoint").load()
+    print(f"{len(urls)} URLs, {len(urls) - len(todo)} already done, {len(todo)} to run "
+          f"({sum(1 for u in todo if u in checkpoint.handles)} resuming)", file=sys.stderr, flush=True)
+
+    clients = VendorClients.from_env()
+    feed_cache = None if args.refresh else FeedCache.from_env()
+    claim_cache = ClaimCache.from_env()
+    feed_store = FeedStore.from_env()
+    # Resumed items need the index to adopt their checkpointed video_ids.
+    video_index = RekaVideoIndex.from_env() or RekaVideoIndex(path=None)
+    for video_url in todo:
+        video_id = checkpoint.handles.get(video_url, {}).get("reka_video_id")
+        key = video_index.key(video_url, keys[0])
+        if video_id and video_index.lookup(key) is None:
+            await video_index.record(key, video_id, "indexing")
+
+    positions = {u: i for i, u in enumerate(urls)}
+
+    async def run_item(video_url: str) -> dict:
+        handle = checkpoint.handles.get(video_url, {})
+        return await analyze_url(
+            video_url, *keys,
+            clients=clients,
+            feed_cache=feed_cache,
+            video_index=video_index,
+            claim_cache=claim_cache,
+            feed_store=feed_store,
+            refresh=args.refresh,
+            sink=CheckpointingSink(video_url, checkpoint),
+            yutori_tasks=dict(handle.get("yutori_tasks", {})),
+            resumed_claims=handle.get("claims"),
+        )
+
+    progress = BatchProgress(len(todo))
+    try:
+        with open(args.output, "a", encoding="utf-8") as out:
+            async for record in run_batch(todo, run_item, max(1, args.concurrency)):
+                record["index"] = positions[record["video_url"]]
+                out.write(serialization.dumps(record) + "\n")
+                out.flush()
+                checkpoint.record({"video_url": record["video_url"], "done": True})
+                progress.add(record)
+                _report(progress, record)
+    finally:
+        if claim_cache is not None:
+            await claim_cache.aclose()
+        await video_index.aclose()
+        if feed_store is not None:
+            await feed_store.aclose()
+        await clients.aclose()
+    print(json.dumps(progress.summary()), file=sys.stderr)
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(prog="python -m pipeline.batch", description="Analyze many broadcast URLs into a JSONL file of intelligence feeds.")
+    parser.add_argument("input", nargs="?", default="-", help="file with one URL per line, or - for stdin (default)")
+    parser.add_argument("-o", "--output", required=True, help="JSONL file feeds are appended to; existing items are skipped")
+    parser.add_argument("-c", "--concurrency", type=int, default=BATCH_CONCURRENCY, help="pipelines run at once")
+    parser.add_argument("--checkpoint", help="vendor handle checkpoint (default: <output>.checkpoint)")
+    parser.add_argument("--retry-errors", action="store_true", help="re-run items whose previous attempt failed")
+    parser.add_argument("--refresh", action="store_true", help="bypass the feed cache")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_run_cli(args))
+    except KeyboardInterrupt:
+        print("Interrupted — rerun the same command to resume.", file=sys.stderr)
+        raise SystemExit(130)
+
+
+if __name__ == "__main__":
+    main()
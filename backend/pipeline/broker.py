@@ -0,0 +1,429 @@
+"""NewsForge — Pluggable job/event broker so any worker can serve any job.
+
+Each job runs on the worker that admitted it (its owner). The broker makes
+the job visible to every other worker: its snapshot, its event stream, and
+cancellation.
+
+- ``InProcessBroker`` (default) keeps everything in the owning process. This
+  is the single-worker behaviour: a job exists only where it runs.
+- ``SQLiteJobBroker`` shares one SQLite database (WAL mode) between the
+  workers on a host, e.g. ``uvicorn --workers 4``.
+  - The owner queues every event and writes them in batches, together with
+    the job's current snapshot, in one transaction on a worker thread.
+  - Another worker asked for the job restores it from that snapshot and the
+    recent events, then follows new events by polling. Its subscribers get
+    the same IDs, ``Last-Event-ID`` resume and ``resync`` as on the owner.
+  - Cancelling on another worker sets a flag that the owner picks up on its
+    next sync. A follower with open streams marks the job as watched, so a
+    ``cancel_on_disconnect`` job is not cancelled while a client streams it
+    elsewhere.
+  - Owners heartbeat. A follower whose owner stops heartbeating ends the
+    stream with an error instead of waiting forever.
+
+Configuration (all optional, read from the environment):
+- ``JOB_BROKER``          — ``memory`` (default) or ``sqlite``
+- ``JOB_BROKER_PATH``     — SQLite database shared by the workers
+- ``JOB_BROKER_FLUSH_MS`` — how long an owner batches events before writing them
+- ``JOB_BROKER_POLL_MS``  — how often a follower polls for new events
+- ``JOB_BROKER_SYNC_MS``  — how often an owner heartbeats and picks up cancellations
+"""
+import asyncio
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Optional
+
+from pipeline import serialization
+from pipeline.jobs import JOB_EVENT_BUFFER, JOB_RETENTION, Job
+
+DEFAULT_BROKER_PATH = os.path.join(os.path.dirname(__file__), "..", ".cache", "jobs.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    status TEXT NOT NULL,
+    last_event_id INTEGER NOT NULL DEFAULT 0,
+    snapshot TEXT NOT NULL,
+    finished_at REAL,
+    cancel_requested INTEGER NOT NULL DEFAULT 0,
+    watched_until REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_owner ON jobs(owner, finished_at);
+CREATE INDEX IF NOT EXISTS jobs_finished_at ON jobs(finished_at);
+
+CREATE TABLE IF NOT EXISTS job_events (
+    job_id TEXT NOT NULL,
+    id INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (job_id, id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS workers (
+    id TEXT PRIMARY KEY,
+    seen_at REAL NOT NULL
+);
+"""
+
+
+class JobBroker:
+    """Where jobs are registered and looked up; the base class is the in-process broker."""
+
+    backend = "memory"
+
+    def register(self, job: Job):
+        """Called by the owning worker when it admits ``job``."""
+
+    def mark_finished(self, job: Job):
+        """Called by the owning worker once ``job`` has finished."""
+
+    async def lookup(self, job_id: str) -> Optional[Job]:
+        """A live view of a job owned by another worker, or None."""
+        return None
+
+    async def snapshot(self, job_id: str) -> Optional[dict]:
+        """The latest shared snapshot of a job owned by another worker, or None."""
+        return None
+
+    async def request_cancel(self, job_id: str) -> Optional[bool]:
+        """Ask another worker to cancel its job; None if no worker knows the job."""
+        return None
+
+    def stats(self) -> dict:
+        return {"backend": self.backend}
+
+    async def aclose(self):
+        pass
+
+    @staticmethod
+    def from_env() -> "JobBroker":
+        backend = os.getenv("JOB_BROKER", "memory").lower()
+        if backend == "sqlite":
+            return SQLiteJobBroker(
+                path=os.getenv("JOB_BROKER_PATH") or DEFAULT_BROKER_PATH,
+                flush_interval=float(os.getenv("JOB_BROKER_FLUSH_MS", "20")) / 1000,
+                poll_interval=float(os.getenv("JOB_BROKER_POLL_MS", "50")) / 1000,
+                sync_interval=float(os.getenv("JOB_BROKER_SYNC_MS", "500")) / 1000,
+            )
+        if backend != "memory":
+            raise ValueError(f"unknown JOB_BROKER {backend!r} (expected 'memory' or 'sqlite')")
+        return InProcessBroker()
+
+
+class InProcessBroker(JobBroker):
+    """Jobs are only reachable on the worker running them (single-worker deployments)."""
+
+
+class SQLiteJobBroker(JobBroker):
+    """Shares jobs between the worker processes on one host through a SQLite database."""
+
+    backend = "sqlite"
+
+    def __init__(
+        self,
+        path: str = DEFAULT_BROKER_PATH,
+        flush_interval: float = 0.02,
+        poll_interval: float = 0.05,
+        sync_interval: float = 0.5,
+        buffer_size: int = JOB_EVENT_BUFFER,
+        retention: float = JOB_RETENTION,
+    ):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.poll_interval = poll_interval
+        self.sync_interval = sync_interval
+        self.buffer_size = buffer_size
+        self.retention = retention
+        self.worker_id = uuid.uuid4().hex[:12]
+        self.owner_timeout = max(5.0, sync_interval * 10)
+        self._local: dict[str, Job] = {}
+        self._followers: dict[str, Job] = {}
+        self._pending_events: list[tuple] = []
+        self._dirty: dict[str, Job] = {}
+        self._flusher: Optional[asyncio.Task] = None
+        self._syncer: Optional[asyncio.Task] = None
+        self._write_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._write_conn: Optional[sqlite3.Connection] = None
+        self._read_conn: Optional[sqlite3.Connection] = None
+        self.events_written = 0
+        self.flushes = 0
+        self.remote_cancels = 0
+
+    # ── Connections (each used under its own lock, from worker threads) ──
+
+    def _connect(self) -> sqlite3.Connection:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _writer(self) -> sqlite3.Connection:
+        if self._write_conn is None:
+            self._write_conn = self._connect()
+            self._write_conn.executescript(_SCHEMA)
+        return self._write_conn
+
+    def _reader(self) -> sqlite3.Connection:
+        if self._read_conn is None:
+            with self._write_lock:
+                self._writer()  # make sure the schema exists
+            self._read_conn = self._connect()
+        return self._read_conn
+
+    def _execute(self, sql: str, params: tuple = ()) -> int:
+        with self._write_lock:
+            conn = self._writer()
+            with conn:
+                return conn.execute(sql, params).rowcount
+
+    def _query(self, sql: str, params: tuple = ()) -> list[sqlite3.Row]:
+        with self._read_lock:
+            return self._reader().execute(sql, params).fetchall()
+
+    # ── Owner side: jobs running on this worker ──
+
+    def register(self, job: Job):
+        self._local[job.id] = job
+        job.on_event = self._queue_event
+        self._dirty[job.id] = job
+        self._schedule_flush()
+        if self._syncer is None or self._syncer.done():
+            self._syncer = asyncio.ensure_future(self._sync_loop())
+
+    def _queue_event(self, job: Job, event_id: int, event_type: str, data: dict):
+        self._pending_events.append((job.id, event_id, event_type, serialization.dumps(data)))
+        self._dirty[job.id] = job
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.ensure_future(self._flush_loop())
+
+    async def _flush_loop(self):
+        while self._pending_events or self._dirty:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except sqlite3.Error:
+                await asyncio.sleep(self.sync_interval)  # e.g. database briefly locked; the batch was re-queued
+
+    async def flush(self):
+        """Write queued events and the snapshots of the jobs they belong to."""
+        if not self._pending_events and not self._dirty:
+            return
+        events, self._pending_events = self._pending_events, []
+        jobs, self._dirty = self._dirty, {}
+        # Snapshots are taken now, in step with the events queued so far
+        rows = [
+            (job.id, self.worker_id, job.status, job.last_event_id, serialization.dumps(job.snapshot()), job.finished_at if job.finished else None)
+            for job in jobs.values()
+        ]
+        try:
+            await asyncio.to_thread(self._write, events, rows)
+        except sqlite3.Error:
+            self._pending_events[:0] = events
+            for job_id, job in jobs.items():
+                self._dirty.setdefault(job_id, job)
+            raise
+        for job in jobs.values():
+            if job.finished:
+                self._local.pop(job.id, None)
+
+    def _write(self, events: list[tuple], rows: list[tuple]):
+        with self._write_lock:
+            conn = self._writer()
+            with conn:
+                # Doubles as the owner's heartbeat; see _sync_rows
+                conn.execute("INSERT OR REPLACE INTO workers (id, seen_at) VALUES (?, ?)", (self.worker_id, time.time()))
+                conn.executemany("INSERT OR REPLACE INTO job_events (job_id, id, type, data) VALUES (?, ?, ?, ?)", events)
+                conn.executemany(
+                    "INSERT INTO jobs (id, owner, status, last_event_id, snapshot, finished_at) VALUES (?, ?, ?, ?, ?, ?)"
+                    " ON CONFLICT(id) DO UPDATE SET status = excluded.status, last_event_id = excluded.last_event_id,"
+                    " snapshot = excluded.snapshot, finished_at = excluded.finished_at",
+                    rows,
+                )
+                # Keep the same replay window as the owner's in-memory ring buffer
+                conn.executemany(
+                    "DELETE FROM job_events WHERE job_id = ? AND id <= ?",
+                    [(row[0], row[3] - self.buffer_size) for row in rows if row[3] > self.buffer_size],
+                )
+        self.events_written += len(events)
+        self.flushes += 1
+
+    def mark_finished(self, job: Job):
+        """Called once a local job has finished, so its final status is written."""
+        self._dirty[job.id] = job
+        self._schedule_flush()
+
+    async def _sync_loop(self):
+        while True:
+            await asyncio.sleep(self.sync_interval)
+            try:
+                await self._sync()
+            except sqlite3.Error:
+                continue  # e.g. database briefly locked; retry on the next tick
+
+    async def _sync(self):
+        running = [job_id for job_id, job in self._local.items() if not job.finished]
+        requests = await asyncio.to_thread(self._sync_rows, running)
+        for row in requests:
+            job = self._local.get(row["id"])
+            if job is None:
+                continue
+            job.watched_until = row["watched_until"]
+            if row["cancel_requested"] and job.cancel("cancelled by client"):
+                self.remote_cancels += 1
+
+    def _sync_rows(self, running: list[str]) -> list[sqlite3.Row]:
+        now = time.time()
+        with self._write_lock:
+            conn = self._writer()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO workers (id, seen_at) VALUES (?, ?)", (self.worker_id, now))
+                expired = [r[0] for r in conn.execute("SELECT id FROM jobs WHERE finished_at < ?", (now - self.retention,))]
+                conn.executemany("DELETE FROM job_events WHERE job_id = ?", [(job_id,) for job_id in expired])
+                conn.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in expired])
+                conn.execute("DELETE FROM workers WHERE seen_at < ?", (now - self.retention,))
+                if not running:
+                    return []
+                marks = ",".join("?" * len(running))
+                rows = conn.execute(
+                    f"SELECT id, cancel_requested, watched_until FROM jobs WHERE id IN ({marks})", running,
+                ).fetchall()
+                conn.execute(f"UPDATE jobs SET cancel_requested = 0 WHERE cancel_requested = 1 AND id IN ({marks})", running)
+                return rows
+
+    # ── Follower side: jobs running on other workers ──
+
+    async def snapshot(self, job_id: str) -> Optional[dict]:
+        rows = await asyncio.to_thread(self._query, "SELECT snapshot FROM jobs WHERE id = ?", (job_id,))
+        return serialization.loads(rows[0]["snapshot"]) if rows else None
+
+    async def request_cancel(self, job_id: str) -> Optional[bool]:
+        rows = await asyncio.to_thread(self._query, "SELECT finished_at FROM jobs WHERE id = ?", (job_id,))
+        if not rows:
+            return None
+        if rows[0]["finished_at"] is not None:
+            return False
+        await asyncio.to_thread(self._execute, "UPDATE jobs SET cancel_requested = 1 WHERE id = ?", (job_id,))
+        return True
+
+    async def lookup(self, job_id: str) -> Optional[Job]:
+        job = self._followers.get(job_id)
+        if job is not None:
+            return job
+        loaded = await asyncio.to_thread(self._load, job_id)
+        if loaded is None:
+            return None
+        job = self._followers.get(job_id)  # a concurrent lookup got there first
+        if job is not None:
+            return job
+        row, events = loaded
+        snapshot = serialization.loads(row["snapshot"])
+        # Events up to the snapshot are already reflected in it; replay them without re-applying
+        snapshot["last_event_id"] = 0
+        job = Job.restore(snapshot, buffer_size=self.buffer_size)
+        for event in events:
+            await job.ingest(event["id"], event["type"], serialization.loads(event["data"]), apply=event["id"] > row["last_event_id"])
+        job._last_id = max(job._last_id, row["last_event_id"])
+        if not job.finished:
+            self._followers[job_id] = job
+            job.task = asyncio.ensure_future(self._follow(job))
+        return job
+
+    def _load(self, job_id: str) -> Optional[tuple[sqlite3.Row, list[sqlite3.Row]]]:
+        with self._read_lock:
+            conn = self._reader()
+            conn.execute("BEGIN")
+            try:
+                row = conn.execute("SELECT snapshot, last_event_id FROM jobs WHERE id = ?", (job_id,)).fetchone()
+                if row is None:
+                    return None
+                events = conn.execute(
+                    "SELECT id, type, data FROM job_events WHERE job_id = ? AND id > ? ORDER BY id",
+                    (job_id, row["last_event_id"] - self.buffer_size),
+                ).fetchall()
+                return row, events
+            finally:
+                conn.execute("COMMIT")
+
+    async def _follow(self, job: Job):
+        idle_since: Optional[float] = None
+        try:
+            while True:
+                await asyncio.sleep(self.poll_interval)
+                watching = job._subscribers > 0
+                events, state = await asyncio.to_thread(self._poll, job.id, job.last_event_id, watching)
+                for event in events:
+                    await job.ingest(event["id"], event["type"], serialization.loads(event["data"]))
+                if state is None:
+                    await job.finish("error")  # expired under us
+                    return
+                if state["finished_at"] is not None and job.last_event_id >= state["last_event_id"]:
+                    await job.finish(state["status"])
+                    return
+                if state["owner_seen"] is None or time.time() - state["owner_seen"] > self.owner_timeout:
+                    await job.ingest(job.last_event_id + 1, "error", {"message": "the worker running this job stopped responding", "stage": "broker"})
+                    await job.finish("error")
+                    return
+                if watching:
+                    idle_since = None
+                elif idle_since is None:
+                    idle_since = time.monotonic()
+                elif time.monotonic() - idle_since > max(5.0, self.sync_interval * 4):
+                    return  # nobody is streaming it here any more; a later lookup starts over
+        finally:
+            self._followers.pop(job.id, None)
+
+    def _poll(self, job_id: str, after: int, watching: bool) -> tuple[list[sqlite3.Row], Optional[dict]]:
+        if watching:
+            # Tell the owner a client is streaming this job here (see Job.watched_until)
+            self._execute(
+                "UPDATE jobs SET watched_until = ? WHERE id = ?",
+                (time.time() + max(2.0, self.sync_interval * 4), job_id),
+            )
+        with self._read_lock:
+            conn = self._reader()
+            conn.execute("BEGIN")
+            try:
+                events = conn.execute(
+                    "SELECT id, type, data FROM job_events WHERE job_id = ? AND id > ? ORDER BY id", (job_id, after),
+                ).fetchall()
+                row = conn.execute(
+                    "SELECT j.status, j.last_event_id, j.finished_at, w.seen_at AS owner_seen"
+                    " FROM jobs j LEFT JOIN workers w ON w.id = j.owner WHERE j.id = ?",
+                    (job_id,),
+                ).fetchone()
+            finally:
+                conn.execute("COMMIT")
+        return events, dict(row) if row is not None else None
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "worker_id": self.worker_id,
+            "local_jobs": len(self._local),
+            "followed_jobs": len(self._followers),
+            "events_written": self.events_written,
+            "flushes": self.flushes,
+            "remote_cancels": self.remote_cancels,
+        }
+
+    async def aclose(self):
+        for task in (self._syncer, self._flusher):
+            if task is not None and not task.done():
+                task.cancel()
+        for job in list(self._followers.values()):
+            if job.task is not None:
+                job.task.cancel()
+        await self.flush()
+        for conn in (self._write_conn, self._read_conn):
+            if conn is not None:
+                conn.close()
+        self._write_conn = self._read_conn = None
@@ -0,0 +1,18 @@
+"""NewsForge — Counters for vendor work saved by cancelling abandoned jobs."""
+
+_saved: dict[str, int] = {
+    "jobs_cancelled": 0,
+    "reka_calls_cancelled": 0,
+    "fastino_calls_cancelled": 0,
+    "yutori_calls_cancelled": 0,
+    "yutori_tasks_cancelled": 0,
+}
+
+
+def record(kind: str, count: int = 1):
+    """Count a unit of vendor work that cancellation stopped."""
+    _saved[kind] = _saved.get(kind, 0) + count
+
+
+def stats() -> dict:
+    return dict(_saved)
@@ -0,0 +1,242 @@
+"""NewsForge — Persistent claim-verification cache with near-duplicate matching.
+
+Broadcasts repeat the same claims ("Eurozone inflation rose 3.2%") in slightly
+different words, and every Yutori research task is slow and costly. Verdicts are
+stored under the normalized claim text; lookups fall back to MinHash signatures
+over character shingles, bucketed with LSH, so a rephrased claim finds the
+earlier verdict. A near-duplicate may differ only in stopwords, punctuation
+and spacing: claims whose numbers, names, negations or any other content word
+differ never match, however similar the wording. New verdicts are written to disk by one debounced writer, at most
+once per ``flush_interval``.
+
+Configuration (all optional, read from the environment):
+- ``CLAIM_CACHE_ENABLED``   — set to ``false`` to research every claim
+- ``CLAIM_CACHE_PATH``      — JSON file the verdicts are persisted to
+- ``CLAIM_CACHE_TTL``       — seconds a verdict stays fresh
+- ``CLAIM_CACHE_THRESHOLD`` — minimum estimated Jaccard similarity for a near-duplicate
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+import unicodedata
+from typing import Optional
+
+DEFAULT_CLAIM_CACHE_PATH = os.path.join(os.path.dirname(__file__), "..", ".cache", "claims.json")
+
+_NUM_PERM = 64
+_BANDS = 16
+_ROWS = _NUM_PERM // _BANDS
+_SHINGLE = 5
+_PRIME = (1 << 61) - 1
+_rng = random.Random(0x4E4647)
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(_NUM_PERM)]
+
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+_NON_WORD = re.compile(r"[^\w%$€£.]+")
+_TRAILING_DOT = re.compile(r"(?<!\d)\.|\.(?!\d)")
+_CONTRACTIONS = ((re.compile(r"\bwon['’]t\b"), "will not"), (re.compile(r"\bcan['’]t\b"), "can not"), (re.compile(r"n['’]t\b"), " not"))
+
+# Words a rephrasing may add or drop without changing what a claim says
+# (plus the "s" a possessive leaves behind). Negations ("not", "no", "never", ...) are deliberately absent.
+_STOPWORDS = frozenset("""
+a an the this that these those it its of in on at to for from by with as into onto over about
+and or but so than then also too very just is are was were be been being has have had having
+do does did will would shall should can could may might must which who whom whose what
+there here their they them he him his she her we our you your i me my s
+""".split())
+
+
+def normalize_claim(claim: str) -> str:
+    """Case-fold, strip punctuation and collapse whitespace; keeps numbers and units."""
+    text = unicodedata.normalize("NFKC", claim).casefold()
+    text = _NON_WORD.sub(" ", text)
+    text = _TRAILING_DOT.sub(" ", text)
+    return " ".join(text.split())
+
+
+def _numbers(normalized: str) -> tuple:
+    return tuple(n.replace(",", "") for n in _NUMBER.findall(normalized))
+
+
+def content_tokens(claim: str) -> frozenset:
+    """The claim's words minus stopwords, with contractions expanded ("didn't" → "did not")."""
+    text = unicodedata.normalize("NFKC", claim).casefold()
+    for pattern, replacement in _CONTRACTIONS:
+        text = pattern.sub(replacement, text)
+    return frozenset(normalize_claim(text).split()) - _STOPWORDS
+
+
+def minhash(normalized: str) -> list[int]:
+    """MinHash signature over the character shingles of a normalized claim."""
+    padded = f" {normalized} "
+    shingles = {padded[i:i + _SHINGLE] for i in range(max(1, len(padded) - _SHINGLE + 1))}
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big") for s in shingles]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMS]
+
+
+def _similarity(sig_a: list[int], sig_b: list[int]) -> float:
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / _NUM_PERM
+
+
+def _bands(signature: list[int]) -> list[tuple]:
+    return [(i, tuple(signature[i * _ROWS:(i + 1) * _ROWS])) for i in range(_BANDS)]
+
+
+class ClaimCache:
+    """Verdict store keyed by normalized claim text with LSH near-duplicate lookup."""
+
+    def __init__(
+        self,
+        path: Optional[str] = DEFAULT_CLAIM_CACHE_PATH,
+        ttl: float = 24 * 3600,
+        threshold: float = 0.8,
+        flush_interval: float = 1.0,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.threshold = threshold
+        self.flush_interval = flush_interval
+        self._entries: Optional[dict[str, dict]] = None
+        self._buckets: dict[tuple, set[str]] = {}
+        self._file_lock = threading.Lock()
+        self._dirty = False
+        self._flusher: Optional[asyncio.Task] = None
+        self._saving: Optional[asyncio.Future] = None
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["ClaimCache"]:
+        if os.getenv("CLAIM_CACHE_ENABLED", "true").lower() != "true":
+            return None
+        return cls(
+            path=os.getenv("CLAIM_CACHE_PATH", DEFAULT_CLAIM_CACHE_PATH),
+            ttl=float(os.getenv("CLAIM_CACHE_TTL", str(24 * 3600))),
+            threshold=float(os.getenv("CLAIM_CACHE_THRESHOLD", "0.8")),
+        )
+
+    def _load(self) -> dict[str, dict]:
+        if self._entries is None:
+            entries = {}
+            if self.path and os.path.exists(self.path):
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        entries = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    entries = {}
+            self._entries = {}
+            for key, entry in entries.items():
+                if self._fresh(entry):
+                    self._index(key, entry)
+        return self._entries
+
+    def _index(self, key: str, entry: dict):
+        self._entries[key] = entry
+        for band in _bands(entry["signature"]):
+            self._buckets.setdefault(band, set()).add(key)
+
+    def _unindex(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for band in _bands(entry["signature"]):
+            bucket = self._buckets.get(band)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[band]
+
+    def _fresh(self, entry: dict) -> bool:
+        return time.time() - entry.get("verified_at", 0) < self.ttl
+
+    def lookup(self, claim: str) -> Optional[dict]:
+        """Return a fresh cached VerifiedClaim dict for ``claim`` (or a near-duplicate)."""
+        entries = self._load()
+        key = normalize_claim(claim)
+        entry = entries.get(key)
+        if entry is not None and self._fresh(entry):
+            self.hits += 1
+            return entry["verified"]
+
+        signature = minhash(key)
+        numbers = _numbers(key)
+        tokens = content_tokens(claim)
+        best, best_score = None, self.threshold
+        candidates = set()
+        for band in _bands(signature):
+            candidates |= self._buckets.get(band, set())
+        for candidate in candidates:
+            cand = entries[candidate]
+            if not self._fresh(cand) or tuple(cand["numbers"]) != numbers:
+                continue
+            score = _similarity(signature, cand["signature"])
+            if score >= best_score and content_tokens(cand["claim"]) == tokens:
+                best, best_score = cand, score
+        if best is not None:
+            self.near_hits += 1
+            return best["verified"]
+        self.misses += 1
+        return None
+
+    async def store(self, claim: str, verified: dict):
+        self._load()
+        key = normalize_claim(claim)
+        self._unindex(key)
+        self._index(key, {
+            "claim": claim,
+            "verified": verified,
+            "verified_at": time.time(),
+            "signature": minhash(key),
+            "numbers": list(_numbers(key)),
+        })
+        if self.path:
+            self._dirty = True
+            if self._flusher is None or self._flusher.done():
+                self._flusher = asyncio.ensure_future(self._flush_loop())
+
+    async def _flush_loop(self):
+        while self._dirty:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self):
+        """Purge stale verdicts and write the cache file, if anything changed."""
+        if self._saving is not None:
+            await asyncio.shield(self._saving)  # snapshots must land in the order they were taken
+        if not self._dirty:
+            return
+        self._dirty = False
+        entries = self._load()
+        for stale in [k for k, e in entries.items() if not self._fresh(e)]:
+            self._unindex(stale)
+        self._saving = asyncio.ensure_future(asyncio.to_thread(self._save, dict(entries)))
+        await asyncio.shield(self._saving)
+
+    def _save(self, snapshot: dict):
+        with self._file_lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp, self.path)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.near_hits + self.misses
+        return {
+            "claims": len(self._load()),
+            "hits": self.hits,
+            "near_duplicate_hits": self.near_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.near_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+    async def aclose(self):
+        if self._flusher is not None and not self._flusher.done():
+            self._flusher.cancel()
+        await self.flush()
@@ -0,0 +1,139 @@
+"""NewsForge — Dependency-driven stage scheduler for the analysis pipeline.
+
+The pipeline is declared as a graph of named stages, each listing the stages
+whose results it consumes. Every stage is started the moment its own inputs
+resolve, so e.g. structured-event extraction begins as soon as the Reka
+``events`` prompt finishes instead of waiting for the slow ``transcript``.
+
+Each stage can carry a timeout and a fallback value. A failed or timed-out
+stage yields its fallback to its dependents and is recorded in ``failures``;
+only stages marked ``critical`` abort the whole run.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+from pipeline import metrics, tracing
+
+
+@dataclass
+class Stage:
+    name: str
+    run: Callable[..., Awaitable[Any]]
+    deps: tuple[str, ...] = ()
+    timeout: Optional[float] = None
+    fallback: Any = None
+    critical: bool = False
+
+
+class StageFailed(Exception):
+    """A critical stage failed; ``stage`` names it and ``__cause__`` holds the error."""
+
+    def __init__(self, stage: str, error: BaseException):
+        super().__init__(f"stage '{stage}' failed: {error}")
+        self.stage = stage
+
+
+@dataclass
+class StageGraph:
+    """Runs a set of stages, each as soon as the stages it depends on are done.
+
+    A stage's ``run`` is called with its dependencies' results as keyword
+    arguments (``:`` in a stage name becomes ``_``). ``on_failure(name, error)``
+    is awaited for every non-critical failure before the fallback is used.
+    """
+
+    stages: list[Stage]
+    on_failure: Optional[Callable[[str, BaseException], Awaitable[None]]] = None
+    failures: dict[str, BaseException] = field(default_factory=dict)
+    timings: dict[str, tuple[float, float]] = field(default_factory=dict)
+
+    def __post_init__(self):
+        self._by_name = {s.name: s for s in self.stages}
+        if len(self._by_name) != len(self.stages):
+            raise ValueError("duplicate stage names")
+        for stage in self.stages:
+            missing = [d for d in stage.deps if d not in self._by_name]
+            if missing:
+                raise ValueError(f"stage '{stage.name}' depends on unknown stages {missing}")
+        self._check_acyclic()
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def _check_acyclic(self):
+        state: dict[str, int] = {}
+
+        def visit(name: str, path: tuple):
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"stage cycle: {' -> '.join(path + (name,))}")
+            state[name] = 1
+            for dep in self._by_name[name].deps:
+                visit(dep, path + (name,))
+            state[name] = 2
+
+        for name in self._by_name:
+            visit(name, ())
+
+    async def result(self, name: str) -> Any:
+        """Await another stage's result from inside a running stage (for optional inputs)."""
+        return await asyncio.shield(self._tasks[name])
+
+    async def _run_stage(self, stage: Stage) -> Any:
+        inputs = {}
+        for dep in stage.deps:
+            inputs[dep.replace(":", "_")] = await asyncio.shield(self._tasks[dep])
+        started = time.monotonic()
+        outcome = "ok"
+        try:
+            with tracing.span(stage.name, "stage"):
+                return await asyncio.wait_for(stage.run(**inputs), stage.timeout)
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        except Exception as e:
+            outcome = "error"
+            if isinstance(e, asyncio.TimeoutError):
+                outcome = "timeout"
+                e = asyncio.TimeoutError(f"timed out after {stage.timeout:g}s")
+            if stage.critical:
+                raise StageFailed(stage.name, e) from e
+            self.failures[stage.name] = e
+            if self.on_failure is not None:
+                await self.on_failure(stage.name, e)
+            return stage.fallback() if callable(stage.fallback) else stage.fallback
+        finally:
+            self.timings[stage.name] = (started, time.monotonic())
+            metrics.observe_stage(stage.name, self.timings[stage.name][1] - started, outcome)
+
+    def critical_path(self) -> list[str]:
+        """The chain of finished stages that bounded the run's wall time, first to last.
+
+        Starts from the stage that finished last and walks back through whichever
+        dependency finished last, i.e. the input that stage was actually waiting on.
+        """
+        if not self.timings:
+            return []
+        name = max(self.timings, key=lambda n: self.timings[n][1])
+        path = [name]
+        while True:
+            deps = [d for d in self._by_name[name].deps if d in self.timings]
+            if not deps:
+                break
+            name = max(deps, key=lambda d: self.timings[d][1])
+            path.append(name)
+        return path[::-1]
+
+    async def run(self) -> dict[str, Any]:
+        """Run every stage; returns ``{stage name: result}``. Raises ``StageFailed`` on a critical failure."""
+        for stage in self.stages:
+            self._tasks[stage.name] = asyncio.ensure_future(self._run_stage(stage))
+        try:
+            await asyncio.gather(*self._tasks.values())
+        finally:
+            for task in self._tasks.values():
+                if not task.done():
+                    task.cancel()
+            await asyncio.gather(*self._tasks.values(), return_exceptions=True)
+        return {name: task.result() for name, task in self._tasks.items()}
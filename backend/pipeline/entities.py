@@ -0,0 +1,123 @@
+"""NewsForge — Order-preserving, mention-counting entity accumulator.
+
+GLiNER returns the same entity once per chunk and in whatever surface form the
+speaker used ("MIT", "M.I.T.", "Mit", "MIT's"). Entities are keyed by a
+normalized form (case, punctuation, whitespace and possessives folded), so
+merging is a dict lookup rather than a list scan, and every mention is counted.
+Truncated entity lists then keep the most-mentioned entities, ties broken by
+first appearance, and each entity is shown in its most common surface form.
+
+Configuration (all optional, read from the environment):
+- ``ENTITY_ALIASES_PATH`` — JSON file of ``{"Canonical name": ["alias", ...]}``
+  merged into one entity, e.g. ``{"European Central Bank": ["ECB"]}``
+"""
+import json
+import os
+import re
+import unicodedata
+from typing import Iterable, Optional
+
+_POSSESSIVE = re.compile(r"(?:['’]s|(?<=s)['’])$")
+_ACRONYM_DOTS = re.compile(r"(?<=\w)\.(?=\w|$)")
+_PUNCTUATION = re.compile(r"[^\w\s&+-]")
+
+_aliases_cache: dict[str, dict[str, str]] = {}
+
+
+def normalize_entity(name: str) -> str:
+    """Fold case, punctuation, whitespace and a trailing possessive: "M.I.T.'s" → "mit"."""
+    text = unicodedata.normalize("NFKC", name).casefold().strip()
+    text = _POSSESSIVE.sub("", text)
+    text = _ACRONYM_DOTS.sub("", text)
+    text = _PUNCTUATION.sub(" ", text)
+    return " ".join(text.split())
+
+
+def load_aliases(path: Optional[str] = None) -> dict[str, str]:
+    """Read an alias file into ``{normalized alias: normalized canonical}``; cached per path."""
+    path = path if path is not None else os.getenv("ENTITY_ALIASES_PATH", "")
+    if not path:
+        return {}
+    if path not in _aliases_cache:
+        aliases = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for canonical, names in json.load(f).items():
+                    key = normalize_entity(canonical)
+                    for name in names:
+                        aliases[normalize_entity(name)] = key
+        except (OSError, json.JSONDecodeError, AttributeError):
+            aliases = {}
+        _aliases_cache[path] = aliases
+    return _aliases_cache[path]
+
+
+class _Entry:
+    __slots__ = ("order", "count", "surfaces")
+
+    def __init__(self, order: int):
+        self.order = order
+        self.count = 0
+        self.surfaces: dict[str, int] = {}
+
+    def display(self) -> str:
+        # Most common surface form; dicts keep insertion order, so ties go to the first seen
+        return max(self.surfaces, key=self.surfaces.__getitem__)
+
+
+class EntityAccumulator:
+    """Merges entity mentions per label by normalized key, counting each mention."""
+
+    def __init__(self, aliases: Optional[dict[str, str]] = None):
+        self.aliases = load_aliases() if aliases is None else aliases
+        self._labels: dict[str, dict[str, _Entry]] = {}
+        self._order = 0
+
+    def add(self, label: str, name: str, count: int = 1):
+        if not isinstance(name, str) or not name.strip():
+            return
+        key = normalize_entity(name)
+        if not key:
+            return
+        key = self.aliases.get(key, key)
+        entries = self._labels.setdefault(label, {})
+        entry = entries.get(key)
+        if entry is None:
+            entry = entries[key] = _Entry(self._order)
+            self._order += 1
+        entry.count += count
+        surface = name.strip()
+        entry.surfaces[surface] = entry.surfaces.get(surface, 0) + count
+
+    def update(self, entities: dict[str, Iterable[str]]) -> bool:
+        """Add one GLiNER ``entities`` result; returns True if it introduced a new entity."""
+        before = len(self)
+        for label, names in entities.items():
+            for name in names or ():
+                self.add(label, name)
+        return len(self) != before
+
+    def top(self, *labels: str, limit: Optional[int] = None) -> list[str]:
+        """Entities under ``labels`` (merged by key), most mentioned first, ties in first-seen order."""
+        merged: dict[str, list] = {}
+        for label in labels:
+            for key, entry in self._labels.get(label, {}).items():
+                slot = merged.get(key)
+                if slot is None:
+                    merged[key] = [entry.count, entry.order, entry]
+                else:
+                    slot[0] += entry.count
+                    slot[1] = min(slot[1], entry.order)
+        ranked = sorted(merged.values(), key=lambda slot: (-slot[0], slot[1]))
+        return [slot[2].display() for slot in ranked[:limit]]
+
+    def counts(self, label: str) -> dict[str, int]:
+        return {entry.display(): entry.count for entry in self._labels.get(label, {}).values()}
+
+    def as_dict(self) -> dict[str, list[str]]:
+        """``{label: [entity, ...]}`` with each list ranked like ``top``."""
+        return {label: self.top(label) for label in self._labels}
+
+    def __len__(self) -> int:
+        """Number of distinct entities across all labels."""
+        return self._order
@@ -1,102 +1,471 @@
-"""NewsForge — Fastino GLiNER 2 API client (NER, classify, structured extraction)."""
+"""NewsForge — Fastino GLiNER 2 API client (NER, classify, structured extraction).
+
+Chunked extraction fans every chunk out concurrently. All GLiNER calls in the
+process share one semaphore (``FASTINO_MAX_CONCURRENCY``) so a long transcript
+cannot flood the vendor. Each call is retried on its own by the shared
+resilience layer (``FASTINO_RETRIES``, see ``pipeline.resilience``), and a chunk
+that still fails is dropped without discarding the chunks that succeeded.
+Entity chunks overlap by ``FASTINO_CHUNK_OVERLAP`` bytes so names at a chunk
+seam are seen whole by at least one request.
+
+Calls from every in-flight job also pass through a coalescer. It collects
+requests over a short window (``FASTINO_COALESCE_WINDOW_MS``), groups them by
+task and schema, collapses identical (task, schema, text) requests into one,
+and dispatches each group together: either as a pooled burst of single-text
+calls or, with ``FASTINO_COALESCE_MODE=multi``, as one multi-text request of up
+to ``FASTINO_COALESCE_MAX_BATCH`` texts. Set the mode to ``off`` to disable it.
+A coalesced request still belongs to the jobs waiting on it: once every one of
+them is cancelled it is dropped from its batch, or aborted if already sent.
+
+``FASTINO_BASE`` overrides the API base URL.
+"""
+import asyncio
+import itertools
+import json
+import os
+import re
+import time
+import weakref
+from typing import Callable, Iterator, Optional
+
 import httpx
 
-FASTINO_BASE = "https://api.pioneer.ai"
+from pipeline.entities import EntityAccumulator
+from pipeline import tracing
+from pipeline.http_pool import vendor_client
+
+FASTINO_BASE = os.getenv("FASTINO_BASE", "https://api.pioneer.ai").rstrip("/")
+
+FASTINO_MAX_CONCURRENCY = int(os.getenv("FASTINO_MAX_CONCURRENCY", "8"))
+FASTINO_CHUNK_OVERLAP = int(os.getenv("FASTINO_CHUNK_OVERLAP", "200"))
+FASTINO_COALESCE_MODE = os.getenv("FASTINO_COALESCE_MODE", "burst").lower()
+FASTINO_COALESCE_WINDOW_MS = float(os.getenv("FASTINO_COALESCE_WINDOW_MS", "5"))
+FASTINO_COALESCE_MAX_BATCH = int(os.getenv("FASTINO_COALESCE_MAX_BATCH", "16"))
+
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def _vendor_semaphore() -> asyncio.Semaphore:
+    """Process-wide GLiNER concurrency cap (one per event loop)."""
+    loop = asyncio.get_running_loop()
+    sem = _semaphores.get(loop)
+    if sem is None:
+        sem = _semaphores[loop] = asyncio.Semaphore(FASTINO_MAX_CONCURRENCY)
+    return sem
+
+
+# A sentence ends at [.!?] (plus closing quotes/brackets) followed by whitespace,
+# or at a run of newlines. Leading with the character class keeps the scan fast.
+_PIECE_END = re.compile(rb"[.!?\n](?:(?<=\n)\n*|[\"')\]]*\s+)")
+_WHITESPACE = re.compile(rb"\s")
+
+
+def _piece_ends(raw: bytes, max_bytes: int) -> Iterator[int]:
+    """Byte offsets where sentence pieces end, with extra cuts inside pieces over ``max_bytes``."""
+    start = 0
+    for end in itertools.chain((m.end() for m in _PIECE_END.finditer(raw)), (len(raw),)):
+        if end <= start:
+            continue
+        while end - start > max_bytes:
+            # Oversized sentence: cut after the last whitespace that fits, else on a codepoint boundary
+            limit = start + max_bytes
+            cut = max(raw.rfind(b" ", start, limit), raw.rfind(b"\n", start, limit), raw.rfind(b"\t", start, limit)) + 1
+            if cut <= start:
+                cut = limit
+                while raw[cut] & 0xC0 == 0x80:
+                    cut -= 1
+            yield cut
+            start = cut
+        yield end
+        start = end
+
 
+def chunk_text(text: str, max_bytes: int = 7000, overlap_bytes: int = 0) -> list[str]:
+    """Split text into chunks ≤ max_bytes on sentence boundaries.
 
-def chunk_text(text: str, max_bytes: int = 7000) -> list[str]:
-    """Split text into chunks ≤ max_bytes on sentence boundaries."""
-    if len(text.encode("utf-8")) <= max_bytes:
-        return [text]
+    Chunks are verbatim slices of ``text`` (newlines are kept). A sentence
+    longer than ``max_bytes`` is split on whitespace, or on a codepoint boundary
+    if it has none. With ``overlap_bytes`` each chunk repeats up to that many
+    trailing bytes of the previous one, so entities at a seam are seen whole.
+    """
+    return [chunk for chunk, _ in _overlapping_chunks(text, max_bytes, overlap_bytes)]
+
+
+def _overlapping_chunks(text: str, max_bytes: int, overlap_bytes: int) -> list[tuple[str, int]]:
+    """``chunk_text``'s chunks, each with the number of leading characters it repeats from the one before."""
+    raw = text.encode("utf-8")
+    if len(raw) <= max_bytes:
+        return [(text, 0)]
+    overlap_bytes = max(0, min(overlap_bytes, max_bytes // 2))
+
+    # Work in byte offsets over the encoded text: each piece is measured once
+    # and only finished chunks are decoded.
+    spans = []
+    start = last = fresh = 0  # chunk start, end of its last piece, end of carried-over overlap
+    for end in _piece_ends(raw, max_bytes):
+        if end - start > max_bytes:
+            if last > fresh:
+                spans.append((start, last))
+                start = fresh = last
+                tail = last - overlap_bytes
+                if overlap_bytes and tail > spans[-1][0]:
+                    boundary = _WHITESPACE.search(raw, tail, last)
+                    if boundary and end - boundary.end() <= max_bytes:
+                        start = boundary.end()
+            else:
+                start = last
+        last = end
+    if last > fresh:
+        spans.append((start, last))
 
-    sentences = text.replace("\n", ". ").split(". ")
     chunks = []
-    current = ""
-    for s in sentences:
-        candidate = current + s + ". " if current else s + ". "
-        if len(candidate.encode("utf-8")) > max_bytes:
-            if current:
-                chunks.append(current.strip())
-            current = s + ". "
-        else:
-            current = candidate
-    if current.strip():
-        chunks.append(current.strip())
-    return chunks if chunks else [text[:max_bytes]]
+    previous_end = 0
+    for s, e in spans:
+        chunk = raw[s:e].decode("utf-8")
+        repeated = len(raw[s:previous_end].decode("utf-8")) if s < previous_end else 0
+        previous_end = e
+        if chunk.strip():
+            chunks.append((chunk, repeated))
+    return chunks or [(text[:max_bytes], 0)]
+
+
+def _only_in_overlap(name: str, chunk: str, repeated: int) -> bool:
+    """Whether every occurrence of ``name`` in ``chunk`` lies inside its first ``repeated`` characters.
+
+    Such a mention was already counted from the previous chunk. Names GLiNER
+    returns in a form not found verbatim in the chunk are kept.
+    """
+    if not repeated or not isinstance(name, str) or not name:
+        return False
+    first = chunk.find(name)
+    if first == -1 or first + len(name) > repeated:
+        return False
+    return chunk.find(name, repeated - len(name) + 1) == -1
 
 
-async def _call_gliner(payload: dict, api_key: str) -> dict:
+async def _post_gliner(
+    payload: dict,
+    api_key: str,
+    client: Optional[httpx.AsyncClient] = None,
+) -> dict:
     """Make a single call to the GLiNER 2 endpoint."""
-    async with httpx.AsyncClient(timeout=60) as client:
-        resp = await client.post(
-            f"{FASTINO_BASE}/gliner-2",
-            headers={"X-Api-Key": api_key},
-            json=payload,
-        )
-        resp.raise_for_status()
-        return resp.json()
-
-
-async def extract_entities(text: str, api_key: str) -> dict:
-    """Extract named entities from text. Handles chunking for long text."""
+    async with _vendor_semaphore():
+        async with vendor_client("fastino", client) as client:
+            resp = await client.post(
+                f"{FASTINO_BASE}/gliner-2",
+                headers={"X-Api-Key": api_key},
+                json=payload,
+            )
+            resp.raise_for_status()
+            return resp.json()
+
+
+class _PendingBatch:
+    def __init__(self, payload: dict, api_key: str, client):
+        self.task = payload.get("task")
+        self.schema = payload.get("schema")
+        self.api_key = api_key
+        self.client = client
+        self.futures: dict[str, asyncio.Future] = {}
+        self.enqueued_at: dict[str, float] = {}
+        self.waiters: dict[str, int] = {}
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        self.dispatched = False
+        self.calls: dict[str, asyncio.Task] = {}  # burst mode: one call per text
+        self.multi_call: Optional[asyncio.Task] = None
+
+
+class GlinerCoalescer:
+    """Micro-batches concurrent GLiNER requests across jobs, deduplicating identical ones."""
+
+    def __init__(
+        self,
+        window: float = FASTINO_COALESCE_WINDOW_MS / 1000,
+        max_batch: int = FASTINO_COALESCE_MAX_BATCH,
+        mode: str = FASTINO_COALESCE_MODE,
+    ):
+        self.window = window
+        self.max_batch = max(1, max_batch)
+        self.mode = mode
+        self._pending: dict[tuple, _PendingBatch] = {}
+        self._flushes: set[asyncio.Task] = set()
+        self.requests = 0
+        self.deduplicated = 0
+        self.abandoned = 0
+        self.batches = 0
+        self.batched_texts = 0
+        self.batch_sizes: dict[int, int] = {}
+        self.added_latency_total = 0.0
+        self.added_latency_max = 0.0
+
+    @staticmethod
+    def _group_key(payload: dict, api_key: str, client) -> tuple:
+        schema = json.dumps(payload.get("schema"), sort_keys=True)
+        return (payload.get("task"), schema, api_key, id(client))
+
+    async def submit(self, payload: dict, api_key: str, client=None) -> dict:
+        """Queue one request and wait for its (possibly shared) response."""
+        self.requests += 1
+        text = payload.get("text", "")
+        group = self._group_key(payload, api_key, client)
+        batch = self._pending.get(group)
+        if batch is None:
+            batch = self._pending[group] = _PendingBatch(payload, api_key, client)
+            loop = asyncio.get_running_loop()
+            batch.flush_handle = loop.call_later(self.window, self._start_flush, group)
+
+        future = batch.futures.get(text)
+        if future is not None:
+            self.deduplicated += 1
+        else:
+            future = batch.futures[text] = asyncio.get_running_loop().create_future()
+            batch.enqueued_at[text] = time.perf_counter()
+            if len(batch.futures) >= self.max_batch:
+                self._start_flush(group)
+        batch.waiters[text] = batch.waiters.get(text, 0) + 1
+        try:
+            return await asyncio.shield(future)
+        finally:
+            self._leave(group, batch, text)
+
+    def _leave(self, group: tuple, batch: _PendingBatch, text: str):
+        """Drop or abort the request for ``text`` once nobody waits for it any more."""
+        batch.waiters[text] -= 1
+        future = batch.futures.get(text)
+        if batch.waiters[text] > 0 or future is None or future.done():
+            return
+        self.abandoned += 1
+        future.cancel()
+        if not batch.dispatched:
+            del batch.futures[text]
+            batch.enqueued_at.pop(text, None)
+            if not batch.futures:
+                self._pending.pop(group, None)
+                batch.flush_handle.cancel()
+            return
+        call = batch.calls.get(text)
+        if call is not None:
+            call.cancel()
+        if batch.multi_call is not None and all(f.done() for f in batch.futures.values()):
+            batch.multi_call.cancel()
+
+    def _start_flush(self, group: tuple):
+        batch = self._pending.pop(group, None)
+        if batch is None:
+            return
+        batch.dispatched = True
+        if batch.flush_handle is not None:
+            batch.flush_handle.cancel()
+        task = asyncio.ensure_future(self._dispatch(batch))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _dispatch(self, batch: _PendingBatch):
+        # A batch serves several jobs; don't file its vendor calls under whichever one opened it.
+        tracing.detach()
+        now = time.perf_counter()
+        size = len(batch.futures)
+        self.batches += 1
+        self.batched_texts += size
+        self.batch_sizes[size] = self.batch_sizes.get(size, 0) + 1
+        for enqueued in batch.enqueued_at.values():
+            waited = now - enqueued
+            self.added_latency_total += waited
+            self.added_latency_max = max(self.added_latency_max, waited)
+
+        if self.mode == "multi" and size > 1 and await self._dispatch_multi(batch):
+            return
+        # Abandoned texts were cancelled already; each call is a task its waiters can abort
+        batch.calls = {
+            text: asyncio.ensure_future(self._dispatch_one(batch, text, fut))
+            for text, fut in batch.futures.items() if not fut.done()
+        }
+        await asyncio.gather(*batch.calls.values(), return_exceptions=True)
+
+    async def _dispatch_one(self, batch: _PendingBatch, text: str, future: asyncio.Future):
+        payload = {"task": batch.task, "text": text, "schema": batch.schema}
+        try:
+            result = await _post_gliner(payload, batch.api_key, batch.client)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(result)
+
+    async def _dispatch_multi(self, batch: _PendingBatch) -> bool:
+        """Send the whole group as one multi-text request; False means fall back to a burst."""
+        texts = [text for text, future in batch.futures.items() if not future.done()]
+        if not texts:
+            return True
+        payload = {"task": batch.task, "texts": texts, "schema": batch.schema}
+        batch.multi_call = asyncio.ensure_future(_post_gliner(payload, batch.api_key, batch.client))
+        try:
+            data = await batch.multi_call
+        except Exception:
+            return False
+        results = data.get("results") if isinstance(data, dict) else None
+        if not isinstance(results, list) or len(results) != len(texts):
+            return False
+        for text, item in zip(texts, results):
+            future = batch.futures[text]
+            if not future.done():
+                future.set_result(item if isinstance(item, dict) and "result" in item else {"result": item})
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "window_ms": self.window * 1000,
+            "max_batch": self.max_batch,
+            "requests": self.requests,
+            "deduplicated": self.deduplicated,
+            "abandoned": self.abandoned,
+            "batches": self.batches,
+            "avg_batch_size": round(self.batched_texts / self.batches, 2) if self.batches else 0.0,
+            "avg_batch_fill": round(self.batched_texts / (self.batches * self.max_batch), 3) if self.batches else 0.0,
+            "batch_size_histogram": dict(sorted(self.batch_sizes.items())),
+            "avg_added_latency_ms": round(self.added_latency_total / self.batched_texts * 1000, 2) if self.batched_texts else 0.0,
+            "max_added_latency_ms": round(self.added_latency_max * 1000, 2),
+        }
+
+
+_coalescers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, GlinerCoalescer]" = weakref.WeakKeyDictionary()
+
+
+def gliner_coalescer() -> GlinerCoalescer:
+    """The process-wide coalescer for the running event loop."""
+    loop = asyncio.get_running_loop()
+    coalescer = _coalescers.get(loop)
+    if coalescer is None:
+        coalescer = _coalescers[loop] = GlinerCoalescer()
+    return coalescer
+
+
+async def _call_gliner(
+    payload: dict,
+    api_key: str,
+    client: Optional[httpx.AsyncClient] = None,
+) -> dict:
+    """Call GLiNER 2, through the cross-job coalescer unless it is switched off."""
+    with tracing.span(f"gliner {payload.get('task', 'request')}", "fastino", chars=len(payload.get("text", ""))):
+        if FASTINO_COALESCE_MODE == "off" or "text" not in payload:
+            return await _post_gliner(payload, api_key, client)
+        return await gliner_coalescer().submit(payload, api_key, client)
+
+
+async def _fan_out_chunks(
+    chunks: list,
+    build_payload: Callable[..., dict],
+    api_key: str,
+    client: Optional[httpx.AsyncClient] = None,
+) -> list[tuple]:
+    """Send every chunk concurrently; returns ``(chunk, response)`` pairs in chunk order.
+
+    A chunk is anything ``build_payload`` turns into a request.
+
+    Chunks that still fail after their retries are dropped. If every chunk
+    fails, the first error is raised so callers see the outage.
+    """
+    results = await asyncio.gather(
+        *(_call_gliner(build_payload(chunk), api_key, client) for chunk in chunks),
+        return_exceptions=True,
+    )
+    succeeded = [(chunk, r) for chunk, r in zip(chunks, results) if not isinstance(r, BaseException)]
+    if not succeeded and results:
+        raise results[0]
+    return succeeded
+
+
+async def extract_entities(
+    text: str,
+    api_key: str,
+    client: Optional[httpx.AsyncClient] = None,
+    accumulator: Optional[EntityAccumulator] = None,
+) -> dict:
+    """Extract named entities from text. Handles chunking for long text.
+
+    Mentions from every chunk are merged into ``accumulator`` (a fresh one if
+    omitted); the returned lists rank each label's entities by mention count.
+    A mention seen only in the overlap a chunk repeats from the previous one
+    is not counted twice.
+    """
     schema = ["person", "organization", "location", "country", "date", "topic"]
-    merged = {label: [] for label in schema}
-
-    for chunk in chunk_text(text):
-        data = await _call_gliner({
-            "task": "extract_entities",
-            "text": chunk,
-            "schema": schema,
-        }, api_key)
+    merged = accumulator if accumulator is not None else EntityAccumulator()
+
+    chunks = _overlapping_chunks(text, 7000, FASTINO_CHUNK_OVERLAP)
+    responses = await _fan_out_chunks(chunks, lambda chunk: {
+        "task": "extract_entities",
+        "text": chunk[0],
+        "schema": schema,
+    }, api_key, client)
+
+    for (chunk, repeated), data in responses:
         entities = data.get("result", {}).get("entities", {})
-        for label in schema:
-            for item in entities.get(label, []):
-                if item and item not in merged[label]:
-                    merged[label].append(item)
+        merged.update({
+            label: [name for name in entities.get(label, []) if not _only_in_overlap(name, chunk, repeated)]
+            for label in schema
+        })
 
-    return merged
+    return {label: merged.top(label) for label in schema}
 
 
-async def classify_sentiment(text: str, api_key: str) -> str:
+async def classify_sentiment(
+    text: str,
+    api_key: str,
+    client: Optional[httpx.AsyncClient] = None,
+) -> str:
     """Classify overall sentiment of text."""
     truncated = text[:7000]
     data = await _call_gliner({
         "task": "classify_text",
         "text": truncated,
         "schema": {"categories": ["positive", "negative", "neutral", "alarming", "uncertain"]},
-    }, api_key)
+    }, api_key, client)
     return data.get("result", {}).get("category", "neutral")
 
 
-async def classify_bias(text: str, api_key: str) -> str:
+async def classify_bias(
+    text: str,
+    api_key: str,
+    client: Optional[httpx.AsyncClient] = None,
+) -> str:
     """Classify media bias of text."""
     truncated = text[:7000]
     data = await _call_gliner({
         "task": "classify_text",
         "text": truncated,
         "schema": {"categories": ["left-leaning", "center", "right-leaning", "unclear"]},
-    }, api_key)
+    }, api_key, client)
     return data.get("result", {}).get("category", "center")
 
 
-async def extract_structured_events(text: str, api_key: str) -> list[dict]:
+async def extract_structured_events(
+    text: str,
+    api_key: str,
+    client: Optional[httpx.AsyncClient] = None,
+) -> list[dict]:
     """Extract structured news events from text."""
+    responses = await _fan_out_chunks(chunk_text(text), lambda chunk: {
+        "task": "extract_json",
+        "text": chunk,
+        "schema": {
+            "events": [
+                "headline::str::Short event headline",
+                "summary::str::Two sentence event summary",
+                "category::str::politics or economy or conflict or science or disaster or other",
+                "sentiment::str::positive or negative or neutral or alarming or uncertain",
+                "severity::str::low or medium or high",
+                "timestamp::str::Approximate time in broadcast if mentioned",
+            ]
+        },
+    }, api_key, client)
+
     all_events = []
-    for chunk in chunk_text(text):
-        data = await _call_gliner({
-            "task": "extract_json",
-            "text": chunk,
-            "schema": {
-                "events": [
-                    "headline::str::Short event headline",
-                    "summary::str::Two sentence event summary",
-                    "category::str::politics or economy or conflict or science or disaster or other",
-                    "sentiment::str::positive or negative or neutral or alarming or uncertain",
-                    "severity::str::low or medium or high",
-                    "timestamp::str::Approximate time in broadcast if mentioned",
-                ]
-            },
-        }, api_key)
+    for _, data in responses:
         events = data.get("result", {}).get("events", [])
         if isinstance(events, list):
             all_events.extend(events)
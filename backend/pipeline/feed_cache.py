@@ -0,0 +1,303 @@
+"""NewsForge — Content-addressed IntelligenceFeed cache (memory LRU + disk tier).
+
+Feeds are keyed by the canonical video identity (every YouTube URL form collapses
+to the same video ID) plus the pipeline/prompt fingerprint, so a prompt change
+never serves a stale analysis. A hit replays the cached feed in milliseconds.
+
+Configuration (all optional, read from the environment):
+- ``FEED_CACHE_ENABLED``     — set to ``false`` to bypass the cache entirely
+- ``FEED_CACHE_DIR``         — directory for the on-disk tier
+- ``FEED_CACHE_TTL``         — seconds before a cached feed expires
+- ``FEED_CACHE_MAX_ENTRIES`` — in-memory LRU capacity
+- ``FEED_CACHE_MAX_BYTES``   — on-disk tier size cap; oldest entries are evicted first
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+from pipeline import serialization
+from pipeline.feed_store import FeedStore, slim_feed
+from pipeline.http_pool import VendorClients
+from pipeline.orchestrator import PIPELINE_VERSION, reka_bypass_enabled, run_pipeline
+from pipeline.reka_client import REKA_PROMPTS
+from pipeline.trends import TrendAggregator
+from pipeline.video_url import canonical_video_id
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(__file__), "..", ".cache", "feeds")
+
+
+def pipeline_fingerprint() -> str:
+    """Pipeline version plus a digest of the Reka prompts that shape every feed.
+
+    Feeds built from the canned ``REKA_BYPASS`` transcript get their own
+    fingerprint, so they are never served once real Reka is switched on.
+    """
+    prompts = json.dumps(REKA_PROMPTS, sort_keys=True).encode("utf-8")
+    source = "bypass" if reka_bypass_enabled() else "reka"
+    return f"{PIPELINE_VERSION}:{hashlib.sha256(prompts).hexdigest()[:12]}:{source}"
+
+
+def feed_cache_key(video_url: str) -> str:
+    identity = f"{canonical_video_id(video_url)}|{pipeline_fingerprint()}"
+    return hashlib.sha256(identity.encode("utf-8")).hexdigest()
+
+
+class FeedCache:
+    """Two-tier cache of completed feed dicts: in-memory LRU over a TTL'd disk store."""
+
+    def __init__(
+        self,
+        directory: Optional[str] = DEFAULT_CACHE_DIR,
+        ttl: float = 6 * 3600,
+        max_entries: int = 256,
+        max_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._memory: "OrderedDict[str, dict]" = OrderedDict()
+        self._disk_index: Optional[dict[str, tuple[int, float]]] = None
+        self._disk_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["FeedCache"]:
+        if os.getenv("FEED_CACHE_ENABLED", "true").lower() != "true":
+            return None
+        return cls(
+            directory=os.getenv("FEED_CACHE_DIR", DEFAULT_CACHE_DIR),
+            ttl=float(os.getenv("FEED_CACHE_TTL", str(6 * 3600))),
+            max_entries=int(os.getenv("FEED_CACHE_MAX_ENTRIES", "256")),
+            max_bytes=int(os.getenv("FEED_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+        )
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _fresh(self, entry: dict) -> bool:
+        return time.time() - entry.get("created_at", 0) < self.ttl
+
+    def _remember(self, key: str, entry: dict):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[dict]:
+        """Return the cached feed dict for ``key``, or None on a miss or expiry."""
+        entry = await self.get_entry(key)
+        return entry["feed"] if entry is not None else None
+
+    async def get_entry(self, key: str) -> Optional[dict]:
+        """Like ``get``, but return the whole entry (``feed``, ``video``, ``feed_id``, ...)."""
+        entry = self._memory.get(key)
+        if entry is not None and not self._fresh(entry):
+            del self._memory[key]
+            entry = None
+        if entry is None and self.directory:
+            entry = await asyncio.to_thread(self._locked, self._read_disk, key)
+            if entry is not None:
+                self._remember(key, entry)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._memory.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    async def put(self, key: str, feed: dict, video: str = "", feed_id: Optional[int] = None):
+        """Cache ``feed``; ``feed_id`` is its row in the feed store, when it was stored."""
+        entry = {"key": key, "video": video, "created_at": time.time(), "feed": feed, "feed_id": feed_id}
+        self._remember(key, entry)
+        if self.directory:
+            await asyncio.to_thread(self._locked, self._write_disk, key, entry)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 3) if total else 0.0,
+            "memory_entries": len(self._memory),
+            "disk_entries": len(self._disk_index or {}),
+            "disk_bytes": sum(size for size, _ in (self._disk_index or {}).values()),
+        }
+
+    # ── Disk tier (runs in a worker thread) ──
+
+    def _locked(self, fn, *args):
+        with self._disk_lock:
+            return fn(*args)
+
+    def _load_disk_index(self) -> dict[str, tuple[int, float]]:
+        if self._disk_index is None:
+            os.makedirs(self.directory, exist_ok=True)
+            index = {}
+            for name in os.listdir(self.directory):
+                if name.endswith(".json"):
+                    st = os.stat(os.path.join(self.directory, name))
+                    index[name[:-5]] = (st.st_size, st.st_mtime)
+            self._disk_index = index
+        return self._disk_index
+
+    def _drop_disk(self, key: str):
+        self._load_disk_index().pop(key, None)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _read_disk(self, key: str) -> Optional[dict]:
+        if key not in self._load_disk_index():
+            return None
+        try:
+            with open(self._path(key), "rb") as f:
+                entry = serialization.loads(f.read())
+        except (OSError, serialization.JSONDecodeError):
+            self._drop_disk(key)
+            return None
+        if not self._fresh(entry):
+            self._drop_disk(key)
+            return None
+        return entry
+
+    def _write_disk(self, key: str, entry: dict):
+        index = self._load_disk_index()
+        data = serialization.dumps_bytes(entry)
+        tmp = self._path(key) + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, self._path(key))
+        index[key] = (len(data), time.time())
+        self._evict_disk()
+
+    def _evict_disk(self):
+        index = self._load_disk_index()
+        now = time.time()
+        for key, (_, mtime) in list(index.items()):
+            if now - mtime >= self.ttl:
+                self._drop_disk(key)
+        total = sum(size for size, _ in index.values())
+        for key, (size, _) in sorted(index.items(), key=lambda kv: kv[1][1]):
+            if total <= self.max_bytes:
+                break
+            self._drop_disk(key)
+            total -= size
+
+
+def _raw_url(feed_id: int) -> str:
+    return f"/api/feeds/{feed_id}/raw"
+
+
+async def replay_feed(feed: dict, emit: Callable, progress: bool = True, feed_id: Optional[int] = None):
+    """Re-emit a cached feed, optionally with a condensed progress stream first.
+
+    With a ``feed_id`` the ``complete`` event is sent slim, pointing at the
+    stored feed's ``raw_url`` like a by-reference pipeline run.
+    """
+    if progress:
+        await emit("status", {"step": "upload", "message": "Cached analysis found for this broadcast", "progress": 10})
+        await emit("video_uploaded", {"video_id": feed.get("video_id", ""), "video_url": ""})
+        await emit("fastino_complete", {
+            "events": feed.get("events", []),
+            "entities": feed.get("entities", {}),
+            "sentiment": feed.get("overall_sentiment", "neutral"),
+            "bias": feed.get("bias_indicator", "center"),
+        })
+        await emit("yutori_complete", {"claims": feed.get("verified_claims", [])})
+    await emit("status", {"step": "complete", "message": "Pipeline entirely complete! Served from cache", "progress": 100})
+    if feed_id is None:
+        await emit("complete", {"feed": feed, "cached": True})
+    else:
+        await emit("complete", {"feed": slim_feed(feed), "cached": True, "feed_id": feed_id, "raw_url": _raw_url(feed_id)})
+
+
+async def _complete_by_reference(completed: dict, video_url: str, store: FeedStore, emit: Callable) -> Optional[int]:
+    """Store the feed, then send its ``complete`` event without the bulky fields.
+
+    Returns the stored feed's id, or None when the write failed.
+    """
+    event = completed["event"]
+    try:
+        feed_id = await store.add(completed["feed"], video_url, degraded=completed["degraded"], wait=True)
+    except Exception as e:
+        await emit("log", {"message": f"Feed store write failed, sending the feed inline: {e}", "type": "warn"})
+        await emit("complete", event)
+        return None
+    await emit("complete", {
+        **event,
+        "feed": slim_feed(completed["feed"]),
+        "feed_id": feed_id,
+        "raw_url": _raw_url(feed_id),
+    })
+    return feed_id
+
+
+async def run_cached_pipeline(
+    video_url: str,
+    reka_key: str,
+    fastino_key: str,
+    yutori_key: str,
+    emit: Callable,
+    clients: Optional[VendorClients] = None,
+    cache: Optional[FeedCache] = None,
+    replay_progress: bool = True,
+    refresh: bool = False,
+    store: Optional[FeedStore] = None,
+    trends: Optional[TrendAggregator] = None,
+    **pipeline_kwargs,
+):
+    """Serve ``video_url`` from the feed cache, running the full pipeline only on a miss.
+
+    Feeds produced by a pipeline run (not cache replays) are appended to the
+    ``store`` history and counted into the ``trends`` aggregates. Extra keyword arguments are passed through to ``run_pipeline``.
+    When the store delivers raw fields by reference, the ``complete`` event is
+    held back until the feed is stored, then sent slim with its ``raw_url``;
+    cache hits are sent slim too, pointing at the stored copy of the feed.
+    """
+    demo_mode = os.getenv("DEMO_MODE", "false").lower() == "true"
+    use_cache = cache is not None and not demo_mode
+
+    by_reference = store is not None and store.by_reference
+    key = feed_cache_key(video_url) if use_cache else ""
+    if use_cache and not refresh:
+        entry = await cache.get_entry(key)
+        if entry is not None:
+            await emit("log", {"message": "Feed cache hit — replaying stored analysis.", "type": "success"})
+            feed_id = None
+            if by_reference:
+                # Entries cached before their feed was stored have no id; find the stored copy by URL
+                feed_id = entry.get("feed_id") or await store.latest_feed_id(video_url)
+            await replay_feed(entry["feed"], emit, progress=replay_progress, feed_id=feed_id)
+            return
+
+    completed: dict = {}
+
+    async def capturing_emit(event_type: str, data: dict):
+        if event_type == "complete":
+            completed["feed"] = data.get("feed")
+            completed["degraded"] = bool(data.get("degraded"))
+            if by_reference and completed["feed"]:
+                completed["event"] = data
+                return
+        await emit(event_type, data)
+
+    await run_pipeline(video_url, reka_key, fastino_key, yutori_key, capturing_emit, clients=clients, **pipeline_kwargs)
+    if not completed.get("feed"):
+        return
+    feed_id = None
+    if by_reference:
+        feed_id = await _complete_by_reference(completed, video_url, store, emit)
+    elif store is not None:
+        await store.add(completed["feed"], video_url, degraded=completed["degraded"])
+    if trends is not None:
+        trends.add(completed["feed"])
+    if use_cache and not completed["degraded"]:
+        await cache.put(key, completed["feed"], video=canonical_video_id(video_url), feed_id=feed_id)
@@ -0,0 +1,477 @@
+"""NewsForge — Queryable SQLite history of completed intelligence feeds.
+
+Every feed the pipeline completes is appended here so past analyses can be
+browsed and searched without re-running them. Transcript, event and claim text
+is indexed with FTS5; entities, topics and claim verdicts go into their own
+indexed tables so filtered listings stay index lookups as history grows.
+
+Writes are queued in memory and flushed in batches — one transaction per
+batch, on a worker thread — so completing a feed never blocks the event loop.
+A stored feed becomes visible once its batch is flushed.
+
+The bulky part of a feed (``raw_reka``, the full Reka answers including the
+transcript) is kept gzip-compressed with an ETag in ``feed_raw`` rather than in
+the feed's JSON, served by ``GET /api/feeds/{id}/raw``. With
+``FEED_RAW_BY_REFERENCE`` the ``complete`` event leaves it out and carries that
+URL instead, so the SSE stream stays small.
+
+Configuration (all optional, read from the environment):
+- ``FEED_STORE_ENABLED``    — set to ``false`` to keep no history
+- ``FEED_STORE_PATH``       — SQLite database file
+- ``FEED_STORE_BATCH``      — feeds per write transaction
+- ``FEED_STORE_FLUSH_MS``   — longest a queued feed waits before being written
+- ``FEED_RAW_BY_REFERENCE`` — set to ``true`` to deliver ``raw_reka`` by reference instead of inline
+"""
+import asyncio
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from pipeline import serialization
+from pipeline.entities import normalize_entity
+
+DEFAULT_STORE_PATH = os.path.join(os.path.dirname(__file__), "..", ".cache", "feeds.db")
+
+_ENTITY_FIELDS = ("persons", "organizations", "locations", "dates", "topics")
+_SUMMARY_COLUMNS = (
+    "id", "video_url", "video_id", "title", "created_at", "alert_level",
+    "overall_sentiment", "bias_indicator", "credibility_score", "total_stories", "degraded",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feeds (
+    id INTEGER PRIMARY KEY,
+    video_url TEXT NOT NULL,
+    video_id TEXT,
+    title TEXT,
+    created_at REAL NOT NULL,
+    alert_level TEXT,
+    overall_sentiment TEXT,
+    bias_indicator TEXT,
+    credibility_score REAL,
+    total_stories INTEGER,
+    degraded INTEGER NOT NULL DEFAULT 0,
+    feed_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS feeds_created_at ON feeds(created_at);
+CREATE INDEX IF NOT EXISTS feeds_video_url ON feeds(video_url);
+CREATE INDEX IF NOT EXISTS feeds_alert_level ON feeds(alert_level, id);
+
+CREATE TABLE IF NOT EXISTS feed_entities (
+    feed_id INTEGER NOT NULL REFERENCES feeds(id) ON DELETE CASCADE,
+    label TEXT NOT NULL,
+    name TEXT NOT NULL,
+    norm TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS feed_entities_norm ON feed_entities(norm, feed_id);
+CREATE INDEX IF NOT EXISTS feed_entities_feed ON feed_entities(feed_id);
+
+CREATE TABLE IF NOT EXISTS feed_topics (
+    feed_id INTEGER NOT NULL REFERENCES feeds(id) ON DELETE CASCADE,
+    topic TEXT NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS feed_topics_topic ON feed_topics(topic, feed_id);
+
+CREATE TABLE IF NOT EXISTS feed_claims (
+    feed_id INTEGER NOT NULL REFERENCES feeds(id) ON DELETE CASCADE,
+    claim TEXT NOT NULL,
+    verdict TEXT NOT NULL,
+    confidence REAL
+);
+CREATE INDEX IF NOT EXISTS feed_claims_verdict ON feed_claims(verdict, feed_id);
+
+CREATE TABLE IF NOT EXISTS feed_raw (
+    feed_id INTEGER PRIMARY KEY REFERENCES feeds(id) ON DELETE CASCADE,
+    etag TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    raw_gz BLOB NOT NULL
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS feed_fts USING fts5(
+    title, transcript, events, claims, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+def _fts_query(q: str) -> str:
+    """Quote each term so user input can't inject FTS5 syntax; a trailing ``*`` keeps prefix search."""
+    terms = []
+    for term in q.split():
+        prefix = term.endswith("*") and len(term) > 1
+        term = term.rstrip("*").replace('"', '""')
+        if term:
+            terms.append(f'"{term}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+BULKY_FIELDS = ("raw_reka",)
+
+
+def slim_feed(feed: dict) -> dict:
+    """The feed without the fields served from ``/api/feeds/{id}/raw``."""
+    return {k: v for k, v in feed.items() if k not in BULKY_FIELDS}
+
+
+def _pack_raw(raw) -> tuple[str, int, bytes]:
+    body = serialization.dumps_bytes(raw)
+    return hashlib.blake2b(body, digest_size=12).hexdigest(), len(body), gzip.compress(body, compresslevel=6)
+
+
+def _summary(row: sqlite3.Row) -> dict:
+    item = dict(row)
+    item["degraded"] = bool(item["degraded"])
+    return item
+
+
+class FeedStore:
+    """SQLite store of completed feeds with full-text search and indexed filters."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_STORE_PATH,
+        batch_size: int = 50,
+        flush_interval: float = 0.5,
+        by_reference: bool = False,
+    ):
+        self.path = path
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.by_reference = by_reference
+        self._pending: list[dict] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._write_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._write_conn: Optional[sqlite3.Connection] = None
+        self._read_conn: Optional[sqlite3.Connection] = None
+        self.written = 0
+        self.batches = 0
+        self.write_seconds = 0.0
+
+    @classmethod
+    def from_env(cls) -> Optional["FeedStore"]:
+        if os.getenv("FEED_STORE_ENABLED", "true").lower() != "true":
+            return None
+        return cls(
+            path=os.getenv("FEED_STORE_PATH") or DEFAULT_STORE_PATH,
+            batch_size=int(os.getenv("FEED_STORE_BATCH", "50")),
+            flush_interval=float(os.getenv("FEED_STORE_FLUSH_MS", "500")) / 1000,
+            by_reference=os.getenv("FEED_RAW_BY_REFERENCE", "false").lower() == "true",
+        )
+
+    # ── Connections (each used under its own lock, from worker threads) ──
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA foreign_keys=ON")
+        return conn
+
+    def _writer(self) -> sqlite3.Connection:
+        if self._write_conn is None:
+            self._write_conn = self._connect()
+            self._write_conn.executescript(_SCHEMA)
+        return self._write_conn
+
+    def _reader(self) -> sqlite3.Connection:
+        if self._read_conn is None:
+            with self._write_lock:
+                self._writer()  # make sure the schema exists
+            self._read_conn = self._connect()
+        return self._read_conn
+
+    # ── Writes ──
+
+    async def add(self, feed: dict, video_url: str, degraded: bool = False, wait: bool = False) -> Optional[int]:
+        """Queue a completed feed; it is written with the next batch.
+
+        With ``wait`` the batch is flushed right away and the new feed's id returned.
+        """
+        item = {"feed": feed, "video_url": video_url, "degraded": degraded, "created_at": time.time()}
+        if wait:
+            item["written"] = asyncio.get_running_loop().create_future()
+        self._pending.append(item)
+        if self._flusher is None or self._flusher.done():
+            self._wake = asyncio.Event()
+            self._flusher = asyncio.ensure_future(self._flush_loop())
+        if wait or len(self._pending) >= self.batch_size:
+            self._wake.set()
+        return await asyncio.shield(item["written"]) if wait else None
+
+    async def _flush_loop(self):
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write everything queued so far."""
+        while self._pending:
+            batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+            try:
+                ids = await asyncio.to_thread(self._write_batch, batch)
+            except BaseException as e:
+                for item in batch:
+                    if "written" in item and not item["written"].done():
+                        item["written"].set_exception(e if isinstance(e, Exception) else RuntimeError("feed store write cancelled"))
+                raise
+            for item, feed_id in zip(batch, ids):
+                if "written" in item and not item["written"].done():
+                    item["written"].set_result(feed_id)
+
+    def _write_batch(self, batch: list[dict]) -> list[int]:
+        started = time.perf_counter()
+        with self._write_lock:
+            conn = self._writer()
+            with conn:
+                ids = [self._insert(conn, item) for item in batch]
+        self.written += len(batch)
+        self.batches += 1
+        self.write_seconds += time.perf_counter() - started
+        return ids
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, item: dict) -> int:
+        feed = item["feed"]
+        raw = feed.get("raw_reka")
+        cur = conn.execute(
+            "INSERT INTO feeds (video_url, video_id, title, created_at, alert_level, overall_sentiment,"
+            " bias_indicator, credibility_score, total_stories, degraded, feed_json)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                item["video_url"], feed.get("video_id", ""), feed.get("video_title", ""), item["created_at"],
+                feed.get("alert_level"), feed.get("overall_sentiment"), feed.get("bias_indicator"),
+                feed.get("credibility_score"), feed.get("total_stories", 0), int(item["degraded"]),
+                # The bulky fields live only in feed_raw when there is one
+                serialization.dumps(slim_feed(feed) if raw else feed),
+            ),
+        )
+        feed_id = cur.lastrowid
+        if raw:
+            conn.execute(
+                "INSERT INTO feed_raw (feed_id, etag, size, raw_gz) VALUES (?, ?, ?, ?)",
+                (feed_id, *_pack_raw(raw)),
+            )
+
+        events = feed.get("events", [])
+        claims = feed.get("verified_claims", [])
+        transcript = (feed.get("raw_reka") or {}).get("transcript") or feed.get("transcript_summary", "")
+        conn.execute(
+            "INSERT INTO feed_fts (rowid, title, transcript, events, claims) VALUES (?, ?, ?, ?, ?)",
+            (
+                feed_id,
+                feed.get("video_title", ""),
+                transcript,
+                "\n".join(f"{e.get('headline', '')}. {e.get('summary', '')}" for e in events),
+                "\n".join(f"{c.get('claim', '')} {c.get('explanation', '')}" for c in claims),
+            ),
+        )
+
+        entities = feed.get("entities", {})
+        conn.executemany(
+            "INSERT INTO feed_entities (feed_id, label, name, norm) VALUES (?, ?, ?, ?)",
+            [
+                (feed_id, label, name, normalize_entity(name))
+                for label in _ENTITY_FIELDS for name in entities.get(label, [])
+                if normalize_entity(name)
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO feed_topics (feed_id, topic, count) VALUES (?, ?, ?)",
+            [(feed_id, topic, count) for topic, count in feed.get("topic_distribution", {}).items()],
+        )
+        conn.executemany(
+            "INSERT INTO feed_claims (feed_id, claim, verdict, confidence) VALUES (?, ?, ?, ?)",
+            [(feed_id, c.get("claim", ""), c.get("verdict", "unclear"), c.get("confidence")) for c in claims],
+        )
+        return feed_id
+
+    # ── Reads ──
+
+    def _query(self, sql: str, params: tuple) -> list[sqlite3.Row]:
+        with self._read_lock:
+            return self._reader().execute(sql, params).fetchall()
+
+    async def list_feeds(
+        self,
+        limit: int = 20,
+        cursor: Optional[int] = None,
+        alert_level: Optional[str] = None,
+        verdict: Optional[str] = None,
+        entity: Optional[str] = None,
+        topic: Optional[str] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+    ) -> dict:
+        """Newest-first feed summaries. Pass the returned ``next_cursor`` back for the next page."""
+        where, params = [], []
+        if cursor is not None:
+            where.append("id < ?")
+            params.append(cursor)
+        if alert_level:
+            where.append("alert_level = ?")
+            params.append(alert_level)
+        if since is not None:
+            where.append("created_at >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("created_at < ?")
+            params.append(until)
+        # Verdicts and topics have a handful of values, each shared by a large
+        # share of feeds: walk feeds newest-first and probe the index until the
+        # page is full. Entities are selective, so collect their feeds up front.
+        if verdict:
+            where.append("EXISTS (SELECT 1 FROM feed_claims c WHERE c.verdict = ? AND c.feed_id = feeds.id)")
+            params.append(verdict)
+        if topic:
+            where.append("EXISTS (SELECT 1 FROM feed_topics t WHERE t.topic = ? AND t.feed_id = feeds.id)")
+            params.append(topic)
+        if entity:
+            where.append("id IN (SELECT feed_id FROM feed_entities WHERE norm = ?)")
+            params.append(normalize_entity(entity))
+        sql = f"SELECT {', '.join(_SUMMARY_COLUMNS)} FROM feeds"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        rows = await asyncio.to_thread(self._query, sql, tuple(params))
+        items = [_summary(row) for row in rows]
+        return {"items": items, "next_cursor": items[-1]["id"] if len(items) == limit else None}
+
+    async def get_feed(self, feed_id: int) -> Optional[dict]:
+        rows = await asyncio.to_thread(
+            self._query, f"SELECT {', '.join(_SUMMARY_COLUMNS)}, feed_json FROM feeds WHERE id = ?", (feed_id,),
+        )
+        if not rows:
+            return None
+        record = _summary(rows[0])
+        record["feed"] = serialization.loads(record.pop("feed_json"))
+        if "raw_reka" not in record["feed"]:
+            raw = await self.get_raw(feed_id)
+            if raw is not None:
+                record["feed"]["raw_reka"] = serialization.loads(await asyncio.to_thread(gzip.decompress, raw["raw_gz"]))
+        return record
+
+    async def latest_feed_id(self, video_url: str) -> Optional[int]:
+        """Id of the newest complete (not degraded) feed stored for ``video_url``."""
+        rows = await asyncio.to_thread(
+            self._query, "SELECT id FROM feeds WHERE video_url = ? AND degraded = 0 ORDER BY id DESC LIMIT 1", (video_url,),
+        )
+        return rows[0]["id"] if rows else None
+
+    async def get_raw(self, feed_id: int) -> Optional[dict]:
+        """A feed's bulky fields as ``{"etag", "size", "raw_gz"}`` (gzip-compressed JSON)."""
+        rows = await asyncio.to_thread(self._query, "SELECT etag, size, raw_gz FROM feed_raw WHERE feed_id = ?", (feed_id,))
+        if rows:
+            return dict(rows[0])
+        # Feeds stored before feed_raw existed keep raw_reka only inside feed_json
+        rows = await asyncio.to_thread(
+            self._query, "SELECT json_extract(feed_json, '$.raw_reka') AS raw FROM feeds WHERE id = ?", (feed_id,),
+        )
+        if not rows or rows[0]["raw"] is None:
+            return None
+        etag, size, raw_gz = await asyncio.to_thread(_pack_raw, serialization.loads(rows[0]["raw"]))
+        return {"etag": etag, "size": size, "raw_gz": raw_gz}
+
+    async def search(
+        self,
+        q: str,
+        limit: int = 20,
+        cursor: Optional[int] = None,
+        offset: int = 0,
+        sort: str = "recent",
+    ) -> dict:
+        """Full-text search over title, transcript, events and claims.
+
+        ``sort="recent"`` returns matches newest-first and pages by ``cursor``
+        like ``list_feeds``; it stops at the first ``limit`` matches, so common
+        terms stay cheap. ``sort="relevance"`` ranks every match by BM25 and
+        pages by ``offset``.
+        """
+        query = _fts_query(q)
+        if not query:
+            return {"items": [], "next_cursor": None, "next_offset": None}
+        sql = (
+            f"SELECT {', '.join(f'f.{c}' for c in _SUMMARY_COLUMNS)}, snippet(feed_fts, -1, '[', ']', '…', 12) AS snippet"
+            " FROM feed_fts JOIN feeds f ON f.id = feed_fts.rowid WHERE feed_fts MATCH ?"
+        )
+        params: list = [query]
+        if sort == "relevance":
+            sql += " ORDER BY bm25(feed_fts) LIMIT ? OFFSET ?"
+            params += [limit, offset]
+        else:
+            if cursor is not None:
+                sql += " AND feed_fts.rowid < ?"
+                params.append(cursor)
+            sql += " ORDER BY feed_fts.rowid DESC LIMIT ?"
+            params.append(limit)
+        try:
+            rows = await asyncio.to_thread(self._query, sql, tuple(params))
+        except sqlite3.OperationalError:
+            return {"items": [], "next_cursor": None, "next_offset": None}
+        items = [_summary(row) for row in rows]
+        full = len(items) == limit
+        if sort == "relevance":
+            return {"items": items, "next_cursor": None, "next_offset": offset + limit if full else None}
+        return {"items": items, "next_cursor": items[-1]["id"] if full else None, "next_offset": None}
+
+    def _recent(self, since: float) -> list[tuple[float, dict]]:
+        with self._read_lock:
+            conn = self._reader()
+            feeds = conn.execute(
+                "SELECT id, created_at, alert_level, overall_sentiment FROM feeds WHERE created_at >= ? ORDER BY created_at",
+                (since,),
+            ).fetchall()
+            if not feeds:
+                return []
+            first = min(row["id"] for row in feeds)
+            entities = conn.execute("SELECT feed_id, label, name FROM feed_entities WHERE feed_id >= ?", (first,)).fetchall()
+            topics = conn.execute("SELECT feed_id, topic, count FROM feed_topics WHERE feed_id >= ?", (first,)).fetchall()
+        summaries = {
+            row["id"]: {"alert_level": row["alert_level"], "overall_sentiment": row["overall_sentiment"], "entities": {}, "topic_distribution": {}}
+            for row in feeds
+        }
+        for row in entities:
+            if row["feed_id"] in summaries:
+                summaries[row["feed_id"]]["entities"].setdefault(row["label"], []).append(row["name"])
+        for row in topics:
+            if row["feed_id"] in summaries:
+                summaries[row["feed_id"]]["topic_distribution"][row["topic"]] = row["count"]
+        return [(row["created_at"], summaries[row["id"]]) for row in feeds]
+
+    async def recent(self, since: float) -> list[tuple[float, dict]]:
+        """``(created_at, feed)`` for feeds stored since ``since``, oldest first.
+
+        The feeds are rebuilt from the indexed tables and carry only the
+        entities, topic mix, sentiment and alert level, not the stored JSON.
+        """
+        return await asyncio.to_thread(self._recent, since)
+
+    def stats(self) -> dict:
+        return {
+            "written": self.written,
+            "pending": len(self._pending),
+            "batches": self.batches,
+            "avg_batch_write_ms": round(self.write_seconds / self.batches * 1000, 2) if self.batches else 0.0,
+        }
+
+    async def aclose(self):
+        if self._flusher is not None and not self._flusher.done():
+            self._flusher.cancel()
+        await self.flush()
+        for conn in (self._write_conn, self._read_conn):
+            if conn is not None:
+                conn.close()
+        self._write_conn = self._read_conn = None
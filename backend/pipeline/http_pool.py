@@ -0,0 +1,125 @@
+"""NewsForge — Shared, pooled httpx clients for the Reka, Fastino and Yutori APIs.
+
+One ``httpx.AsyncClient`` per vendor is created in the FastAPI lifespan hook and
+injected into the client functions, so TCP/TLS connections are kept alive and
+reused across GLiNER chunks, Reka status polls and Yutori polls instead of
+being re-established on every call. Every client retries, hedges and
+circuit-breaks its calls through ``pipeline.resilience``.
+
+Configuration (all optional, read from the environment):
+- ``HTTP2_ENABLED``            — negotiate HTTP/2 when the ``h2`` package is installed
+- ``HTTP_KEEPALIVE_EXPIRY``    — seconds an idle pooled connection is kept open
+- ``<VENDOR>_TIMEOUT``         — default request timeout for the vendor (seconds)
+- ``<VENDOR>_MAX_CONNECTIONS`` — pool size cap for the vendor
+- ``<VENDOR>_MAX_KEEPALIVE``   — idle connections retained for the vendor
+"""
+import asyncio
+import importlib.util
+import os
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from pipeline import cancellation
+from pipeline.metrics import InstrumentedTransport
+from pipeline.resilience import ResilientTransport
+
+VENDORS = ("reka", "fastino", "yutori")
+
+_DEFAULT_TIMEOUTS = {"reka": 120.0, "fastino": 60.0, "yutori": 30.0}
+_DEFAULT_MAX_CONNECTIONS = {"reka": 20, "fastino": 50, "yutori": 20}
+
+
+@dataclass
+class VendorPoolConfig:
+    vendor: str
+    timeout: float
+    connect_timeout: float = 10.0
+    max_connections: int = 20
+    max_keepalive: int = 10
+    keepalive_expiry: float = 30.0
+    http2: bool = False
+
+    @classmethod
+    def from_env(cls, vendor: str) -> "VendorPoolConfig":
+        """Build a vendor's pool config from environment variables."""
+        prefix = vendor.upper()
+        max_connections = int(os.getenv(f"{prefix}_MAX_CONNECTIONS", _DEFAULT_MAX_CONNECTIONS[vendor]))
+        return cls(
+            vendor=vendor,
+            timeout=float(os.getenv(f"{prefix}_TIMEOUT", _DEFAULT_TIMEOUTS[vendor])),
+            max_connections=max_connections,
+            max_keepalive=int(os.getenv(f"{prefix}_MAX_KEEPALIVE", max_connections)),
+            keepalive_expiry=float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+            http2=os.getenv("HTTP2_ENABLED", "false").lower() == "true",
+        )
+
+    def timeout_obj(self) -> httpx.Timeout:
+        return httpx.Timeout(self.timeout, connect=self.connect_timeout)
+
+
+def _http2_available() -> bool:
+    return importlib.util.find_spec("h2") is not None
+
+
+def build_client(config: VendorPoolConfig) -> httpx.AsyncClient:
+    """Create a pooled keep-alive client for one vendor.
+
+    Each attempt (retries and hedges included) is recorded in the metrics.
+    """
+    transport = httpx.AsyncHTTPTransport(
+        limits=httpx.Limits(
+            max_connections=config.max_connections,
+            max_keepalive_connections=config.max_keepalive,
+            keepalive_expiry=config.keepalive_expiry,
+        ),
+        http2=config.http2 and _http2_available(),
+    )
+    instrumented = InstrumentedTransport(transport, config.vendor)
+    return httpx.AsyncClient(timeout=config.timeout_obj(), transport=ResilientTransport(instrumented, config.vendor))
+
+
+class VendorClients:
+    """Holds one pooled ``httpx.AsyncClient`` per vendor for the app's lifetime."""
+
+    def __init__(
+        self,
+        reka: httpx.AsyncClient,
+        fastino: httpx.AsyncClient,
+        yutori: httpx.AsyncClient,
+    ):
+        self.reka = reka
+        self.fastino = fastino
+        self.yutori = yutori
+
+    @classmethod
+    def from_env(cls) -> "VendorClients":
+        return cls(**{v: build_client(VendorPoolConfig.from_env(v)) for v in VENDORS})
+
+    async def aclose(self):
+        for vendor in VENDORS:
+            await getattr(self, vendor).aclose()
+
+
+@asynccontextmanager
+async def vendor_client(
+    vendor: str,
+    client: Optional[httpx.AsyncClient] = None,
+) -> AsyncIterator[httpx.AsyncClient]:
+    """Yield the injected pooled client, or a short-lived one when none was given.
+
+    A call cancelled mid-flight (its job was abandoned) is counted as saved work.
+    """
+    try:
+        if client is not None:
+            yield client
+            return
+        config = VendorPoolConfig.from_env(vendor)
+        transport = ResilientTransport(InstrumentedTransport(httpx.AsyncHTTPTransport(), vendor), vendor)
+        async with httpx.AsyncClient(timeout=config.timeout_obj(), transport=transport) as one_off:
+            yield one_off
+    except asyncio.CancelledError:
+        cancellation.record(f"{vendor}_calls_cancelled")
+        raise
@@ -0,0 +1,361 @@
+"""NewsForge — Detached pipeline jobs with resumable, replayable event streams.
+
+A job runs the pipeline independently of any HTTP connection. Every event it
+emits gets a monotonically increasing ID and is kept in a bounded per-job ring
+buffer, so a client that drops its SSE connection can reconnect with
+``Last-Event-ID`` and pick up exactly where it left off. A reduced snapshot of
+the job (status, progress, partial results, final feed) is kept alongside.
+
+Configuration (all optional, read from the environment):
+- ``JOB_EVENT_BUFFER`` — events retained per job for replay
+- ``JOB_RETENTION``    — seconds a finished job stays available
+- ``JOB_DISCONNECT_GRACE`` — seconds an abandoned job waits for a reconnect before cancelling
+
+Jobs started with ``cancel_on_disconnect`` are cancelled once their last SSE
+subscriber has been gone for the grace period. Cancellation unwinds the
+orchestrator's ``asyncio.gather``, so in-flight vendor calls stop and any
+outstanding Yutori research tasks are cancelled on the vendor side.
+"""
+import asyncio
+import itertools
+import os
+import time
+import uuid
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, Optional
+
+from pipeline import cancellation, metrics
+from pipeline.scheduler import PipelineScheduler
+
+JOB_EVENT_BUFFER = int(os.getenv("JOB_EVENT_BUFFER", "2000"))
+JOB_RETENTION = float(os.getenv("JOB_RETENTION", "3600"))
+JOB_DISCONNECT_GRACE = float(os.getenv("JOB_DISCONNECT_GRACE", "10"))
+
+FINISHED_STATUSES = ("complete", "error", "cancelled")
+
+
+class Job:
+    """One pipeline run: its event log, ring buffer and current-state snapshot."""
+
+    def __init__(
+        self,
+        video_url: str,
+        buffer_size: int = JOB_EVENT_BUFFER,
+        cancel_on_disconnect: bool = False,
+        disconnect_grace: float = JOB_DISCONNECT_GRACE,
+    ):
+        self.id = uuid.uuid4().hex
+        self.video_url = video_url
+        self.cancel_on_disconnect = cancel_on_disconnect
+        self.disconnect_grace = disconnect_grace
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.status = "pending"
+        self.queue_position = 0
+        self.step = ""
+        self.progress = 0
+        self.message = ""
+        self.error: Optional[str] = None
+        self.partial: dict = {}
+        self.feed: Optional[dict] = None
+        self.task: Optional[asyncio.Task] = None
+        self._buffer: deque = deque(maxlen=buffer_size)
+        self._ids = itertools.count(1)
+        self._last_id = 0
+        self._changed = asyncio.Condition()
+        self._subscribers = 0
+        self._grace_timer: Optional[asyncio.TimerHandle] = None
+        # Set by a shared broker: called with each published event, and the
+        # time until which a subscriber on another worker is streaming this job
+        self.on_event: Optional[Callable[["Job", int, str, dict], None]] = None
+        self.watched_until = 0.0
+
+    @classmethod
+    def restore(cls, snapshot: dict, buffer_size: int = JOB_EVENT_BUFFER) -> "Job":
+        """Rebuild a job's state from ``snapshot()`` output, e.g. to follow one run by another worker."""
+        job = cls(snapshot.get("video_url", ""), buffer_size=buffer_size)
+        job.id = snapshot["job_id"]
+        for name in ("status", "queue_position", "step", "progress", "message", "error", "created_at", "finished_at", "partial", "feed"):
+            if name in snapshot:
+                setattr(job, name, snapshot[name])
+        job._last_id = snapshot.get("last_event_id", 0)
+        job._ids = itertools.count(job._last_id + 1)
+        return job
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    @property
+    def last_event_id(self) -> int:
+        return self._last_id
+
+    async def publish(self, event_type: str, data: dict):
+        """Record an event and wake every subscriber. Usable directly as a pipeline ``emit``."""
+        event_id = next(self._ids)
+        self._apply(event_type, data)
+        if self.on_event is not None:
+            self.on_event(self, event_id, event_type, data)
+        async with self._changed:
+            self._buffer.append((event_id, event_type, data))
+            self._last_id = event_id
+            self._changed.notify_all()
+
+    async def ingest(self, event_id: int, event_type: str, data: dict, apply: bool = True):
+        """Add an event recorded elsewhere under its original ID (see ``pipeline.broker``)."""
+        if apply:
+            self._apply(event_type, data)
+        async with self._changed:
+            self._buffer.append((event_id, event_type, data))
+            self._last_id = max(self._last_id, event_id)
+            self._changed.notify_all()
+
+    def _apply(self, event_type: str, data: dict):
+        if event_type == "queued":
+            self.status = "queued"
+            self.queue_position = data.get("position", 0)
+        elif event_type == "status":
+            self.step = data.get("step", self.step)
+            self.progress = data.get("progress", self.progress)
+            self.message = data.get("message", self.message)
+            if self.status in ("pending", "queued"):
+                self.status = "running"
+                self.queue_position = 0
+        elif event_type == "video_uploaded":
+            self.partial["video_id"] = data.get("video_id", "")
+        elif event_type == "entities_partial":
+            self.partial["entities"] = data.get("entities", {})
+        elif event_type == "events_partial":
+            self.partial.setdefault("events", []).extend(data.get("events", []))
+        elif event_type == "fastino_complete":
+            self.partial.update({
+                "events": data.get("events", []),
+                "entities": data.get("entities", {}),
+                "sentiment": data.get("sentiment"),
+                "bias": data.get("bias"),
+            })
+        elif event_type == "yutori_complete":
+            self.partial["claims"] = data.get("claims", [])
+        elif event_type == "complete":
+            self.feed = data.get("feed")
+            self.status = "complete"
+            self.progress = 100
+        elif event_type == "error":
+            self.error = data.get("message", "Unknown error")
+            self.status = "error"
+
+    async def finish(self, status: Optional[str] = None):
+        """Mark the job done so streams drain and close."""
+        if status is not None and not self.finished:
+            self.status = status
+        elif not self.finished:
+            self.status = "complete" if self.feed is not None else "error"
+        self.finished_at = time.time()
+        async with self._changed:
+            self._changed.notify_all()
+
+    def cancel(self, reason: str = "cancelled") -> bool:
+        """Cancel the running pipeline; returns False if it had already finished."""
+        if self.task is None or self.task.done():
+            return False
+        self.message = reason
+        self.task.cancel()
+        cancellation.record("jobs_cancelled")
+        return True
+
+    def _subscribe(self):
+        self._subscribers += 1
+        if self._grace_timer is not None:
+            self._grace_timer.cancel()
+            self._grace_timer = None
+
+    def _unsubscribe(self):
+        self._subscribers -= 1
+        if self._subscribers == 0 and self.cancel_on_disconnect and not self.finished:
+            loop = asyncio.get_running_loop()
+            self._grace_timer = loop.call_later(self.disconnect_grace, self._cancel_if_abandoned)
+
+    def _cancel_if_abandoned(self):
+        self._grace_timer = None
+        if self._subscribers == 0 and not self.finished:
+            remaining = self.watched_until - time.time()
+            if remaining > 0:
+                self._grace_timer = asyncio.get_running_loop().call_later(remaining + self.disconnect_grace, self._cancel_if_abandoned)
+                return
+            self.cancel("client disconnected")
+
+    def _events_after(self, cursor: int) -> list[tuple]:
+        if not self._buffer:
+            return []
+        first_id = self._buffer[0][0]
+        start = max(0, cursor + 1 - first_id)
+        return list(itertools.islice(self._buffer, start, None))
+
+    async def stream(self, after: int = 0, heartbeat: float = 15) -> AsyncIterator[Optional[tuple]]:
+        """Yield ``(event_id, event_type, data)`` after ``after``; ``None`` marks a heartbeat.
+
+        Replays whatever is still buffered, then follows live events until the
+        job finishes. Events older than the ring buffer are gone; a ``resync``
+        event carrying the snapshot is sent in their place.
+        """
+        cursor = after
+        self._subscribe()
+        try:
+            if self._buffer and cursor + 1 < self._buffer[0][0]:
+                yield (self._buffer[0][0] - 1, "resync", self.snapshot())
+            while True:
+                async with self._changed:
+                    pending = self._events_after(cursor)
+                    if not pending:
+                        if self.finished:
+                            return
+                        try:
+                            await asyncio.wait_for(self._changed.wait(), timeout=heartbeat)
+                        except asyncio.TimeoutError:
+                            pass
+                        pending = self._events_after(cursor)
+                if not pending:
+                    if self.finished:
+                        return
+                    yield None
+                    continue
+                for event in pending:
+                    cursor = event[0]
+                    yield event
+        finally:
+            self._unsubscribe()
+
+    def snapshot(self) -> dict:
+        return {
+            "job_id": self.id,
+            "video_url": self.video_url,
+            "status": self.status,
+            "queue_position": self.queue_position,
+            "step": self.step,
+            "progress": self.progress,
+            "message": self.message,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+            "subscribers": self._subscribers,
+            "last_event_id": self._last_id,
+            "partial": self.partial,
+            "feed": self.feed,
+        }
+
+
+class JobManager:
+    """Creates jobs, runs them as background tasks and expires finished ones.
+
+    With a scheduler attached, jobs wait for a run slot before their runner
+    starts, and ``start`` raises ``QueueFull`` when the wait queue is full.
+    """
+
+    def __init__(self, retention: float = JOB_RETENTION, scheduler: Optional[PipelineScheduler] = None, broker=None):
+        self.retention = retention
+        self.scheduler = scheduler
+        self.broker = broker  # a pipeline.broker.JobBroker; None keeps jobs in this process only
+        self._jobs: dict[str, Job] = {}
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """A job running (or retained) on this worker."""
+        return self._jobs.get(job_id)
+
+    async def find(self, job_id: str) -> Optional[Job]:
+        """A job from this worker, or a live view of one running on another worker."""
+        job = self._jobs.get(job_id)
+        if job is None and self.broker is not None:
+            job = await self.broker.lookup(job_id)
+        return job
+
+    async def snapshot(self, job_id: str) -> Optional[dict]:
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.snapshot()
+        return await self.broker.snapshot(job_id) if self.broker is not None else None
+
+    async def cancel(self, job_id: str, reason: str) -> Optional[bool]:
+        """Cancel a job wherever it runs; None if it is unknown, False if it already finished."""
+        job = self._jobs.get(job_id)
+        if job is not None:
+            return job.cancel(reason)
+        return await self.broker.request_cancel(job_id) if self.broker is not None else None
+
+    def _expire(self):
+        cutoff = time.time() - self.retention
+        for job_id, job in list(self._jobs.items()):
+            if job.finished and job.finished_at and job.finished_at < cutoff:
+                del self._jobs[job_id]
+
+    def start(
+        self,
+        video_url: str,
+        runner: Callable[[Job], Awaitable[None]],
+        cancel_on_disconnect: bool = False,
+    ) -> Job:
+        """Create a job and run ``runner(job)`` in the background."""
+        self._expire()
+        ticket = self.scheduler.reserve() if self.scheduler else None
+        job = Job(video_url, cancel_on_disconnect=cancel_on_disconnect)
+        self._jobs[job.id] = job
+        if self.broker is not None:
+            self.broker.register(job)
+
+        started = time.monotonic()
+
+        async def finish_cancelled():
+            await job.publish("cancelled", {"message": job.message or "cancelled"})
+            await job.finish("cancelled")
+            if self.broker is not None:
+                self.broker.mark_finished(job)
+            metrics.observe_job(time.monotonic() - started, "cancelled")
+
+        async def run():
+            try:
+                await job.publish("job", {"job_id": job.id, "video_url": video_url})
+                if ticket is not None:
+                    await self.scheduler.acquire(ticket, job.publish)
+                await runner(job)
+            except asyncio.CancelledError:
+                await finish_cancelled()
+                raise
+            except Exception as e:
+                await job.publish("error", {"message": str(e), "stage": "pipeline"})
+            finally:
+                if ticket is not None:
+                    self.scheduler.release(ticket)
+            await job.finish()
+            if self.broker is not None:
+                self.broker.mark_finished(job)
+            metrics.observe_job(time.monotonic() - started, job.status)
+
+        def settle(task: asyncio.Task):
+            # A task cancelled before its first step never enters run(), so
+            # its slot and its final status are settled here.
+            if ticket is not None:
+                self.scheduler.release(ticket)
+            if task.cancelled() and not job.finished:
+                asyncio.ensure_future(finish_cancelled())
+
+        job.task = asyncio.ensure_future(run())
+        job.task.add_done_callback(settle)
+        return job
+
+    def stats(self) -> dict:
+        counts: dict[str, int] = {}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "jobs": len(self._jobs),
+            "by_status": counts,
+            "subscribers": sum(job._subscribers for job in self._jobs.values()),
+            "broker": self.broker.stats() if self.broker is not None else {"backend": "memory"},
+        }
+
+    async def aclose(self):
+        for job in self._jobs.values():
+            if job.task is not None and not job.task.done():
+                job.task.cancel()
+        if self.broker is not None:
+            await asyncio.gather(*(job.task for job in self._jobs.values() if job.task is not None), return_exceptions=True)
+            await self.broker.aclose()
@@ -0,0 +1,224 @@
+"""NewsForge — Prometheus metrics for pipeline stages, vendor calls and jobs.
+
+Hot-path instrumentation is a histogram observation or counter increment
+(~1µs). Values that already live in the app's components (queue depth, jobs
+by status, SSE subscribers, cache sizes) are not tracked here; ``AppCollector``
+reads them only when ``/metrics`` is scraped.
+
+Every label has a small fixed set of values: stage names, vendor endpoint
+templates (``/v1/videos/{id}``, never a concrete video id), status classes
+and outcomes. No URLs, claims or job ids are used as labels.
+"""
+import re
+import time
+from typing import Iterable, Optional
+
+import httpx
+from prometheus_client import Counter, Gauge, Histogram, disable_created_metrics
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+from pipeline import cancellation, tracing
+
+# The *_created series would double the series count for no dashboard value.
+disable_created_metrics()
+
+_LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+_LONG_BUCKETS = (1, 2.5, 5, 10, 20, 30, 45, 60, 90, 120, 180, 240, 300, 420, 600)
+
+STAGE_DURATION = Histogram(
+    "newsforge_stage_duration_seconds",
+    "Wall time of each pipeline stage, by how it ended.",
+    ["stage", "outcome"],
+    buckets=_LATENCY_BUCKETS + (420, 600),
+)
+VENDOR_REQUEST_DURATION = Histogram(
+    "newsforge_vendor_request_duration_seconds",
+    "Vendor API call time, from sending the request until the response body is read.",
+    ["vendor", "endpoint", "status"],
+    buckets=_LATENCY_BUCKETS,
+)
+VENDOR_IN_FLIGHT = Gauge(
+    "newsforge_vendor_requests_in_flight",
+    "Vendor API calls currently awaiting or streaming a response.",
+    ["vendor"],
+)
+YUTORI_TIME_TO_VERDICT = Histogram(
+    "newsforge_yutori_time_to_verdict_seconds",
+    "Time from tracking a Yutori research task until its verdict (or give-up).",
+    ["outcome"],
+    buckets=_LONG_BUCKETS,
+)
+JOB_DURATION = Histogram(
+    "newsforge_job_duration_seconds",
+    "Wall time of pipeline jobs from admission to their final event, queueing included.",
+    ["outcome"],
+    buckets=_LONG_BUCKETS,
+)
+ERRORS = Counter(
+    "newsforge_errors_total",
+    "Errors by kind: vendor_429, vendor_4xx, vendor_5xx, vendor_transport, vendor_circuit_open, stage_timeout, stage_error, job_error.",
+    ["kind"],
+)
+RETRIES = Counter(
+    "newsforge_vendor_retries_total",
+    "Vendor calls retried after a transient failure.",
+    ["vendor"],
+)
+HEDGES = Counter(
+    "newsforge_vendor_hedges_total",
+    "Duplicate requests sent for slow vendor reads, by whether the duplicate answered first.",
+    ["vendor", "outcome"],
+)
+CIRCUIT_STATE = Gauge(
+    "newsforge_vendor_circuit_state",
+    "Vendor circuit breaker state: 0 closed, 1 half-open (probing), 2 open (failing fast).",
+    ["vendor"],
+)
+
+# ── Vendor calls ──
+
+_ID_SEGMENT = re.compile(r"(?<=/videos/)(?!upload\b)[^/]+|(?<=/tasks/)[^/]+")
+
+
+def endpoint_template(path: str) -> str:
+    """``/v1/research/tasks/abc123/cancel`` → ``/v1/research/tasks/{id}/cancel``."""
+    return _ID_SEGMENT.sub("{id}", path)
+
+
+def _status_class(code: int) -> str:
+    return "429" if code == 429 else f"{code // 100}xx"
+
+
+def record_error(kind: str):
+    ERRORS.labels(kind).inc()
+
+
+class _TimedStream(httpx.AsyncByteStream):
+    """Wraps a response body so the call is timed until the body is read and closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, done):
+        self._stream = stream
+        self._done = done
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self):
+        try:
+            await self._stream.aclose()
+        finally:
+            self._done()
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Records duration, status and in-flight count of every call to one vendor."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, vendor: str):
+        self._transport = transport
+        self.vendor = vendor
+        self._in_flight = VENDOR_IN_FLIGHT.labels(vendor)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        endpoint = endpoint_template(request.url.path)
+        span = tracing.start_span(f"{self.vendor} {request.method} {endpoint}", "vendor")
+        self._in_flight.inc()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except BaseException as e:
+            tracing.finish(span, error=type(e).__name__)
+            self._in_flight.dec()
+            VENDOR_REQUEST_DURATION.labels(self.vendor, endpoint, "error").observe(time.perf_counter() - started)
+            record_error("vendor_transport")
+            raise
+        status = _status_class(response.status_code)
+        if response.status_code >= 400:
+            record_error("vendor_429" if status == "429" else f"vendor_{status}")
+        finished = False
+
+        def done():
+            nonlocal finished
+            if not finished:
+                finished = True
+                tracing.finish(span, status=response.status_code)
+                self._in_flight.dec()
+                VENDOR_REQUEST_DURATION.labels(self.vendor, endpoint, status).observe(time.perf_counter() - started)
+
+        response.stream = _TimedStream(response.stream, done)
+        return response
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+
+# ── Pipeline stages, Yutori tasks, jobs ──
+
+def observe_stage(stage: str, seconds: float, outcome: str):
+    STAGE_DURATION.labels(stage, outcome).observe(seconds)
+    if outcome in ("timeout", "error"):
+        record_error(f"stage_{outcome}")
+
+
+def observe_verdict(seconds: float, outcome: str):
+    YUTORI_TIME_TO_VERDICT.labels(outcome).observe(seconds)
+
+
+def observe_job(seconds: float, outcome: str):
+    JOB_DURATION.labels(outcome).observe(seconds)
+    if outcome == "error":
+        record_error("job_error")
+
+
+# ── Scrape-time state of the app's components ──
+
+class AppCollector(Collector):
+    """Reads queue depth, jobs, subscribers, cache and poller state from ``app.state`` at scrape time."""
+
+    def __init__(self, state):
+        self.state = state
+
+    def collect(self) -> Iterable:
+        from pipeline.yutori_client import yutori_poller  # imports this module
+
+        scheduler = self.state.scheduler.stats()
+        queue = GaugeMetricFamily("newsforge_pipeline_slots", "Pipeline admission state.", labels=["state"])
+        queue.add_metric(["running"], scheduler["running"])
+        queue.add_metric(["waiting"], scheduler["waiting"])
+        queue.add_metric(["capacity"], scheduler["max_concurrent"])
+        yield queue
+        yield CounterMetricFamily("newsforge_jobs_rejected", "Jobs turned away because the queue was full.", value=scheduler["rejected"])
+
+        jobs = self.state.jobs.stats()
+        by_status = GaugeMetricFamily("newsforge_jobs", "Retained jobs by status.", labels=["status"])
+        for status, count in jobs["by_status"].items():
+            by_status.add_metric([status], count)
+        yield by_status
+        yield GaugeMetricFamily("newsforge_sse_subscribers", "Open event streams across all jobs.", value=jobs["subscribers"])
+
+        cancelled = CounterMetricFamily("newsforge_cancelled_work", "Vendor work skipped because its job was abandoned.", labels=["kind"])
+        for kind, count in cancellation.stats().items():
+            cancelled.add_metric([kind], count)
+        yield cancelled
+
+        poller = _poller_stats(yutori_poller)
+        if poller is not None:
+            yield GaugeMetricFamily("newsforge_yutori_outstanding_tasks", "Research tasks being polled.", value=poller["outstanding_tasks"])
+
+        for name, component in (("feed_cache", self.state.feed_cache), ("claim_cache", self.state.claim_cache)):
+            if component is None:
+                continue
+            stats = component.stats()
+            lookups = CounterMetricFamily(f"newsforge_{name}_lookups", f"{name.replace('_', ' ').capitalize()} lookups by result.", labels=["result"])
+            for result in ("hits", "near_duplicate_hits", "misses"):
+                if result in stats:
+                    lookups.add_metric([result], stats[result])
+            yield lookups
+
+
+def _poller_stats(yutori_poller) -> Optional[dict]:
+    try:
+        return yutori_poller().stats()
+    except RuntimeError:  # scraped outside the event loop
+        return None
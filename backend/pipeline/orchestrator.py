@@ -4,17 +4,30 @@ Runs Reka Vision, Fastino GLiNER 2, and Yutori Research with maximum parallelism
 - All 6 Reka QA prompts run concurrently after indexing
 - Fastino tasks start as soon as their Reka input is ready
 - Yutori verification starts as soon as claims are extracted
+
+Stage timeouts (seconds, optional, read from the environment):
+- ``STAGE_TIMEOUT_VIDEO``   — Reka upload and indexing
+- ``STAGE_TIMEOUT_REKA``    — each Reka QA prompt
+- ``STAGE_TIMEOUT_TAGS``    — the Reka tag lookup
+- ``STAGE_TIMEOUT_FASTINO`` — each Fastino task
+- ``STAGE_TIMEOUT_YUTORI``  — verifying the whole batch of claims
 """
 import asyncio
 import json
 import os
 import time
-from typing import Callable, Coroutine
-
+from typing import Callable, Coroutine, Optional
+
+from pipeline import tracing
+from pipeline.claim_cache import ClaimCache
+from pipeline.dag import Stage, StageFailed, StageGraph
+from pipeline.entities import EntityAccumulator
+from pipeline.http_pool import VendorClients
+from pipeline.incremental import INCREMENTAL_EXTRACTION, IncrementalExtractor
+from pipeline.reka_index import RekaVideoIndex, acquire_indexed_video
+from pipeline.stream_frames import StreamCoalescer
 from pipeline.reka_client import (
     REKA_PROMPTS,
-    upload_video_url,
-    wait_for_indexing,
     ask_video_streaming,
     ask_video,
     get_tags,
@@ -33,6 +46,22 @@ from models import (
     IntelligenceFeed,
 )
 
+# Bump whenever prompts or feed assembly change; cached feeds keyed on it go stale.
+PIPELINE_VERSION = "1"
+
+STAGE_TIMEOUTS = {
+    "video": float(os.getenv("STAGE_TIMEOUT_VIDEO", "420")),
+    "reka": float(os.getenv("STAGE_TIMEOUT_REKA", "200")),
+    "tags": float(os.getenv("STAGE_TIMEOUT_TAGS", "30")),
+    "fastino": float(os.getenv("STAGE_TIMEOUT_FASTINO", "120")),
+    "yutori": float(os.getenv("STAGE_TIMEOUT_YUTORI", "240")),
+}
+
+
+def reka_bypass_enabled() -> bool:
+    """``REKA_BYPASS``: answer the Reka prompts from a canned transcript instead of calling Reka."""
+    return os.getenv("REKA_BYPASS", "true").lower() == "true"
+
 
 DEMO_FEED = IntelligenceFeed(
     video_title="BBC World News Daily Briefing",
@@ -95,6 +124,29 @@ def _parse_claims_text(claims_text: str) -> list[str]:
     return claims
 
 
+def _build_verified_claim(yr: dict) -> VerifiedClaim:
+    """Turn a finished Yutori research result into a VerifiedClaim."""
+    sr = yr.get("structured_result", {})
+    if isinstance(sr, str):
+        try:
+            sr = json.loads(sr)
+        except Exception:
+            sr = {}
+    verdict_raw = sr.get("verdict", "unclear") if isinstance(sr, dict) else "unclear"
+    verdict = "verified" if "verif" in verdict_raw.lower() else ("disputed" if "disput" in verdict_raw.lower() else "unclear")
+    explanation = sr.get("explanation", yr.get("result", "")[:200]) if isinstance(sr, dict) else str(yr.get("result", ""))[:200]
+    source_url = sr.get("source_url", "") if isinstance(sr, dict) else ""
+
+    return VerifiedClaim(
+        claim=yr.get("claim", ""),
+        verdict=verdict,
+        confidence=sr.get("confidence", 0.5) if isinstance(sr, dict) else 0.5,
+        explanation=explanation,
+        sources=[source_url] if source_url else [],
+        yutori_view_url=yr.get("view_url", ""),
+    )
+
+
 def _compute_alert_level(events: list[ExtractedEvent], sentiment: str) -> str:
     """Compute alert level from events severity and overall sentiment."""
     high_count = sum(1 for e in events if e.severity == "high")
@@ -131,17 +183,302 @@ async def run_pipeline(
     fastino_key: str,
     yutori_key: str,
     emit: Callable,
+    clients: Optional[VendorClients] = None,
+    video_index: Optional[RekaVideoIndex] = None,
+    claim_cache: Optional[ClaimCache] = None,
+    yutori_tasks: Optional[dict[str, str]] = None,
+    resumed_claims: Optional[list[str]] = None,
+    trace: bool = False,
 ):
-    """Run the full NewsForge analysis pipeline with maximum parallelism."""
+    """Run the full NewsForge analysis pipeline with maximum parallelism.
+
+    The pipeline is a graph of stages (see ``pipeline.dag``); each starts as
+    soon as its inputs are ready, under its own timeout and fallback.
+
+    ``clients`` carries the app-wide pooled vendor clients; when omitted each
+    vendor call opens a short-lived connection of its own. ``video_index`` lets
+    the Reka stage reuse videos that are already uploaded and indexed, and
+    ``claim_cache`` serves repeat claims without a new Yutori research task.
+    Streaming Reka text reaches ``emit`` as coalesced delta frames (see
+    ``pipeline.stream_frames``).
+    ``yutori_tasks`` (claim → task_id from an interrupted batch run) makes the
+    Yutori stage resumable; see ``verify_claims``. ``resumed_claims`` is the
+    claim list that run parsed (sent as a ``claims_identified`` event), used in
+    place of Reka's new answer so the resumed tasks' claims still match. With
+    ``trace`` (or ``PIPELINE_TRACE``) the run is traced and ends with a
+    ``timing`` event; see ``pipeline.tracing``.
+    """
     demo_mode = os.getenv("DEMO_MODE", "false").lower() == "true"
+    emit = StreamCoalescer(emit)
 
     if demo_mode:
-        await _run_demo_pipeline(emit)
+        try:
+            await _run_demo_pipeline(emit)
+        finally:
+            await emit.aclose()
         return
 
     start_time = time.time()
-    
-    # ── Stage 1: Generate Synthetic Reka Output (Bypass real Reka API) ──
+    reka_http = clients.reka if clients else None
+    fastino_http = clients.fastino if clients else None
+    yutori_http = clients.yutori if clients else None
+    reka_bypass = reka_bypass_enabled()
+
+    reported_progress = 0
+
+    async def status(step: str, message: str, progress: int):
+        # Stages finish out of order; never let the progress bar move backwards.
+        nonlocal reported_progress
+        if progress > reported_progress:
+            reported_progress = progress
+            await emit("status", {"step": step, "message": message, "progress": progress})
+
+    # ── Stages 1-3: Upload, index and query the broadcast with Reka ──
+    async def video():
+        if reka_bypass:
+            return await _synthetic_video(video_url, emit)
+        await status("upload", "Uploading broadcast to Reka Vision...", 5)
+        video_id = await acquire_indexed_video(video_url, reka_key, emit, reka_http, video_index)
+        await status("reka_qa", "Analyzing broadcast with Reka Vision (6 parallel LLM queries)...", 28)
+        return video_id
+
+    # Entities and events are pulled out of the transcript while Reka is still streaming it
+    incremental = IncrementalExtractor(fastino_key, emit, fastino_http) if INCREMENTAL_EXTRACTION else None
+
+    def reka_prompt(name: str) -> Stage:
+        on_text = incremental.feed if incremental and name == "transcript" else None
+
+        async def run(video):
+            if reka_bypass:
+                return await _synthetic_prompt(name, emit, on_text)
+            return await ask_video_streaming(video, REKA_PROMPTS[name], name, reka_key, emit, reka_http, on_text)
+        return Stage(f"reka:{name}", run, ("video",), timeout=STAGE_TIMEOUTS["reka"], fallback="")
+
+    async def broadcast_tags(video):
+        if reka_bypass:
+            return _synthetic_reka_outputs()[1]
+        tags = []
+        for tag in await get_tags(video, reka_key, reka_http):
+            label = tag.get("name", tag.get("tag", "")) if isinstance(tag, dict) else tag
+            if label:
+                tags.append(str(label))
+        return tags
+
+    async def reka(**answers):
+        await status("reka_qa", "Reka analysis complete", 50)
+        return {name.split("_", 1)[1]: text for name, text in answers.items()}
+
+    # ── Stage 4: Fastino tasks, each fed by the Reka prompt it needs ──
+    fastino_announced = False
+
+    async def fastino_started():
+        nonlocal fastino_announced
+        if not fastino_announced:
+            fastino_announced = True
+            await status("fastino", "Structuring data with Fastino GLiNER 2 NLP models...", 60)
+            await emit("log", {"message": "Sending text chunks to Fastino GLiNER 2 for Named Entity Recognition and Classification...", "type": "info"})
+
+    async def entities(reka_transcript):
+        await fastino_started()
+        if incremental and reka_transcript:
+            return await incremental.finish(reka_transcript)
+        text = reka_transcript or await graph.result("reka:events")
+        found = EntityAccumulator()
+        await extract_entities(text, fastino_key, fastino_http, found)
+        return found
+
+    async def sentiment(reka_transcript):
+        await fastino_started()
+        text = reka_transcript or await graph.result("reka:sentiment")
+        return await classify_sentiment(text, fastino_key, fastino_http)
+
+    async def bias(reka_transcript):
+        await fastino_started()
+        text = reka_transcript or await graph.result("reka:events")
+        return await classify_bias(text, fastino_key, fastino_http)
+
+    async def events(reka_events):
+        await fastino_started()
+        text = reka_events or await graph.result("reka:transcript")
+        return await extract_structured_events(text, fastino_key, fastino_http)
+
+    async def fastino(entities, sentiment, bias, events, reka_events):
+        structured = []
+        for ev in (events if isinstance(events, list) else []):
+            if isinstance(ev, dict):
+                structured.append(ExtractedEvent(
+                    timestamp=ev.get("timestamp", ""),
+                    headline=ev.get("headline", "Unknown Event"),
+                    summary=ev.get("summary", ""),
+                    sentiment=ev.get("sentiment", "neutral"),
+                    category=ev.get("category", "other"),
+                    severity=ev.get("severity", "medium"),
+                    confidence=0.8,
+                ))
+
+        # Ensure minimum events for demo quality
+        if len(structured) < 2 and reka_events:
+            lines = [l.strip() for l in reka_events.split("\n") if l.strip() and len(l.strip()) > 20]
+            for line in lines[:5]:
+                structured.append(ExtractedEvent(
+                    headline=line[:100],
+                    summary=line,
+                    sentiment="neutral",
+                    category="other",
+                    severity="medium",
+                    confidence=0.6,
+                ))
+
+        # Ranked by mention count, so truncation keeps the most-mentioned entities
+        named = NamedEntities(
+            persons=entities.top("person", limit=15),
+            organizations=entities.top("organization", limit=12),
+            locations=entities.top("location", "country", limit=12),
+            dates=entities.top("date", limit=8),
+            topics=entities.top("topic", limit=10),
+        )
+        await emit("fastino_complete", {
+            "events": [e.model_dump() for e in structured],
+            "entities": named.model_dump(),
+            "sentiment": sentiment,
+            "bias": bias,
+        })
+        return {"events": structured, "entities": named, "sentiment": sentiment, "bias": bias}
+
+    # ── Stage 5: Yutori verification, started as soon as claims are parsed ──
+    async def claims(reka_claims):
+        if resumed_claims is not None:
+            parsed_claims = list(resumed_claims)
+        else:
+            parsed_claims = _parse_claims_text(reka_claims) if reka_claims else []
+            await emit("claims_identified", {"claims": parsed_claims})
+        if parsed_claims:
+            await emit("log", {"message": f"Identified {len(parsed_claims)} distinct claims. Dispatching top 5 to Yutori for deep web verification...", "type": "info"})
+
+        # Serve repeat claims from the verdict cache; only misses go to Yutori
+        top_claims = parsed_claims[:5]
+        cached_verdicts = {}
+        if claim_cache is not None and top_claims:
+            for claim in top_claims:
+                hit = claim_cache.lookup(claim)
+                if hit is not None:
+                    cached_verdicts[claim] = VerifiedClaim(**{**hit, "claim": claim})
+            await emit("log", {
+                "message": f"Claim cache: {len(cached_verdicts)}/{len(top_claims)} hits ({len(cached_verdicts) / len(top_claims):.0%}) — researching {len(top_claims) - len(cached_verdicts)} with Yutori",
+                "type": "success" if cached_verdicts else "info",
+            })
+        to_research = [c for c in top_claims if c not in cached_verdicts]
+        return {"top": top_claims, "cached": cached_verdicts, "research": to_research}
+
+    async def yutori(claims):
+        # Resumed tasks still go through verify_claims so the unused ones are cancelled
+        if not claims["research"] and not yutori_tasks:
+            return []
+        return await verify_claims(claims["research"], yutori_key, emit, yutori_http, yutori_tasks)
+
+    async def verdicts(claims, yutori):
+        researched = {}
+        for yr in (yutori if isinstance(yutori, list) else []):
+            if isinstance(yr, dict):
+                claim = _build_verified_claim(yr)
+                researched[claim.claim] = claim
+                if claim_cache is not None and yr.get("status") == "succeeded":
+                    await claim_cache.store(claim.claim, claim.model_dump())
+
+        verified_claims = []
+        for claim in claims["top"]:
+            if claim in claims["cached"]:
+                verified_claims.append(claims["cached"][claim])
+            elif claim in researched:
+                verified_claims.append(researched.pop(claim))
+        verified_claims.extend(researched.values())
+
+        await emit("yutori_complete", {
+            "claims": [c.model_dump() for c in verified_claims],
+        })
+        return verified_claims
+
+    # ── Assemble final intelligence feed ──
+    async def feed(video, reka, tags, fastino, verdicts):
+        transcript = reka.get("transcript", "")
+        transcript_summary = transcript[:500] + "..." if len(transcript) > 500 else transcript
+        quotes_text = reka.get("quotes", "")
+        key_quotes = [q.strip().strip('"').strip("'") for q in quotes_text.split("\n") if q.strip() and len(q.strip()) > 15][:5]
+
+        result = IntelligenceFeed(
+            video_title=f"NewsForge Analysis — {video_url[:50]}",
+            video_id=video,
+            transcript_summary=transcript_summary,
+            events=fastino["events"],
+            entities=fastino["entities"],
+            verified_claims=verdicts,
+            overall_sentiment=fastino["sentiment"],
+            bias_indicator=fastino["bias"],
+            alert_level=_compute_alert_level(fastino["events"], fastino["sentiment"]),
+            credibility_score=_compute_credibility(verdicts),
+            topic_distribution=_compute_topic_distribution(fastino["events"]),
+            total_stories=len(fastino["events"]),
+            key_quotes=key_quotes,
+            broadcast_tags=tags if tags else fastino["entities"].topics[:7],
+            raw_reka=reka,
+        )
+
+        elapsed = round(time.time() - start_time, 1)
+        await status("complete", f"Pipeline entirely complete! Finished in {elapsed}s", 100)
+        return result
+
+    async def log_failure(stage: str, error: BaseException):
+        await emit("log", {"message": f"Pipeline error ({stage}): {error}", "type": "warn"})
+
+    fastino_timeout = STAGE_TIMEOUTS["fastino"]
+    graph = StageGraph([
+        Stage("video", video, timeout=STAGE_TIMEOUTS["video"], critical=True),
+        *(reka_prompt(name) for name in REKA_PROMPTS),
+        Stage("tags", broadcast_tags, ("video",), timeout=STAGE_TIMEOUTS["tags"], fallback=list),
+        Stage("reka", reka, tuple(f"reka:{name}" for name in REKA_PROMPTS), critical=True),
+        Stage("entities", entities, ("reka:transcript",), timeout=fastino_timeout, fallback=EntityAccumulator),
+        Stage("sentiment", sentiment, ("reka:transcript",), timeout=fastino_timeout, fallback="neutral"),
+        Stage("bias", bias, ("reka:transcript",), timeout=fastino_timeout, fallback="center"),
+        Stage("events", events, ("reka:events",), timeout=fastino_timeout, fallback=list),
+        Stage("fastino", fastino, ("entities", "sentiment", "bias", "events", "reka:events"), critical=True),
+        Stage("claims", claims, ("reka:claims",), critical=True),
+        Stage("yutori", yutori, ("claims",), timeout=STAGE_TIMEOUTS["yutori"], fallback=list),
+        Stage("verdicts", verdicts, ("claims", "yutori"), critical=True),
+        Stage("feed", feed, ("video", "reka", "tags", "fastino", "verdicts"), critical=True),
+    ], on_failure=log_failure)
+
+    run_trace = None
+    try:
+        with tracing.traced(tracing.tracing_enabled(trace), video_url=video_url) as run_trace:
+            results = await graph.run()
+    except StageFailed as e:
+        if run_trace is not None:
+            await _report_timing(run_trace, graph, emit)
+        raise e.__cause__
+    finally:
+        if incremental:
+            incremental.cancel()
+        await emit.aclose()
+    # ``feed`` is the last stage to finish, so the timing summary can go out
+    # ahead of ``complete`` (which ends the job's event stream).
+    if run_trace is not None:
+        await _report_timing(run_trace, graph, emit)
+    await emit("complete", {"feed": results["feed"].model_dump(), "degraded": bool(graph.failures)})
+
+
+async def _report_timing(trace: tracing.Trace, graph: StageGraph, emit: Callable):
+    """Write the run's Chrome trace and emit its critical-path summary."""
+    written = True
+    try:
+        await trace.write()
+    except OSError as e:
+        written = False
+        await emit("log", {"message": f"Could not write pipeline trace: {e}", "type": "warn"})
+    await emit("timing", tracing.summarize(trace, graph, written))
+
+
+async def _synthetic_video(video_url: str, emit: Callable) -> str:
+    """Stand in for the Reka upload/index stage (bypasses the real Reka API)."""
     await emit("status", {"step": "upload", "message": "Downloading broadcast metadata and transcript...", "progress": 10})
     await emit("log", {"message": "Extracting audio layers and executing speech-to-text transcription.", "type": "info"})
     await asyncio.sleep(1)
@@ -150,7 +487,11 @@ async def run_pipeline(
     await emit("video_uploaded", {"video_id": video_id, "video_url": video_url})
     await emit("status", {"step": "indexing", "message": "Transcript acquired. Passing to fast-path NLP models...", "progress": 50})
     await asyncio.sleep(0.5)
+    return video_id
 
+
+def _synthetic_reka_outputs() -> tuple[dict, list[str]]:
+    """Synthetic Reka prompt answers and tags for the bypassed Reka stage."""
     # Synthetic Reka Extracted Text (Nvidia CES Clip)
     transcript = """WELCOME BACK TO SCOTT FOX CIO JENSEN WONG SPEAKING TO ATTENDEES AT THE CES SHOW THE CONSUMER ELECTRONICS SHOW IN LAS VEGAS. LAST NIGHT, INTRODUCING VERA RUBIN. THE COMPANY'S NEW AI COMPUTING PLATFORM. NOW, HE SAID THAT THE PLATFORM WILL SERVE UP TO FIVE TIMES. THE AI COMPUTING POWER OF ITS CURRENT CAPABILITY. HE ALSO SAID THE CUSTOMERS ARE ON TRACK TO DEPLOY THE NEW PRODUCTS IN THE SECOND HALF OF THE YEAR IN VIDEO. ALSO UNVEILING NEW AUTONOMOUS VEHICLE SOFTWARE, ONE PART OF ITS PUSH INTO WHAT'S BEING CALLED, PHYSICAL AI. THE COMPANY SAID IT'S WORKING WITH ROBO TAXI OPERATORS AND HOPES OF HAVING THEM USE IT SOFTWARE AND HARDWARE TO POWER FLEETS OF SELF-DRIVING CARS SOON AS NEXT YEAR. NOW, MERCEDES-BENZ CARS COMING LATER THIS YEAR EXPECTED TO USE NVIDIA'S TECHNOLOGY TO HELP WITH NAVIGATION, SEPARATELY COMPANIES, CEO, TELLING ANALYSTS THE CHINESE DEMAND FOR THE COMPANY'S OLDER. H200 TIPS IS STRONG AND HAS APPLIED NOW FOR LICENSES TO SHIP THE CHIPS TO CHINA. FOLLOWING PRESIDENT TRUMP'S RECENT DECISION TO ALLOW THE EXPORTS, JOHN FORD SPOKE WITH JENSEN LAST NIGHT AND HE'S GOING TO BRING"""
     
@@ -187,150 +528,18 @@ async def run_pipeline(
         "claims": claims_text,
         "quotes": quotes_text,
     }
-
-    # Simulate streaming Reka results to the frontend
-    for stream_name, stream_text in raw_reka.items():
-        if stream_name == "transcript":
-            continue
-        await emit("reka_stream", {"prompt": stream_name, "chunk": stream_text, "done": True})
-        await emit("reka_prompt_complete", {"prompt": stream_name, "char_count": len(stream_text)})
-
-    # ── Stage 4 & 5: Run Fastino + Yutori in parallel ──
-    await emit("status", {"step": "fastino", "message": "Structuring data with Fastino GLiNER 2 NLP models...", "progress": 60})
-    await emit("log", {"message": "Sending text chunks to Fastino GLiNER 2 for Named Entity Recognition and Classification...", "type": "info"})
-
-    # Parse claims for Yutori
-    parsed_claims = _parse_claims_text(claims_text) if claims_text else []
-    
-    if parsed_claims:
-        await emit("log", {"message": f"Identified {len(parsed_claims)} distinct claims. Dispatching top 5 to Yutori for deep web verification...", "type": "info"})
-
-    # Parse quotes
-    key_quotes = [q.strip().strip('"').strip("'") for q in quotes_text.split("\n") if q.strip() and len(q.strip()) > 15][:5]
-
-    # Run ALL Fastino + Yutori tasks concurrently
-    fastino_and_yutori = await asyncio.gather(
-        extract_entities(transcript or events_text, fastino_key),
-        classify_sentiment(transcript or sentiment_text, fastino_key),
-        classify_bias(transcript or events_text, fastino_key),
-        extract_structured_events(events_text or transcript, fastino_key),
-        verify_claims(parsed_claims, yutori_key, emit) if parsed_claims else _empty_claims(),
-        return_exceptions=True,
-    )
-
-    # Unpack results with safe defaults
-    entities_raw = fastino_and_yutori[0] if not isinstance(fastino_and_yutori[0], Exception) else {}
-    overall_sentiment = fastino_and_yutori[1] if not isinstance(fastino_and_yutori[1], Exception) else "neutral"
-    bias = fastino_and_yutori[2] if not isinstance(fastino_and_yutori[2], Exception) else "center"
-    structured_events = fastino_and_yutori[3] if not isinstance(fastino_and_yutori[3], Exception) else []
-    yutori_results = fastino_and_yutori[4] if not isinstance(fastino_and_yutori[4], Exception) else []
-
-    # Log any errors
-    for i, r in enumerate(fastino_and_yutori):
-        if isinstance(r, Exception):
-            names = ["entities", "sentiment", "bias", "events", "yutori"]
-            await emit("log", {"message": f"Pipeline error ({names[i]}): {r}", "type": "warn"})
-
-    # ── Build structured data ──
-    events = []
-    for ev in (structured_events if isinstance(structured_events, list) else []):
-        if isinstance(ev, dict):
-            events.append(ExtractedEvent(
-                timestamp=ev.get("timestamp", ""),
-                headline=ev.get("headline", "Unknown Event"),
-                summary=ev.get("summary", ""),
-                sentiment=ev.get("sentiment", "neutral"),
-                category=ev.get("category", "other"),
-                severity=ev.get("severity", "medium"),
-                confidence=0.8,
-            ))
-
-    # Ensure minimum events for demo quality
-    if len(events) < 2 and events_text:
-        lines = [l.strip() for l in events_text.split("\n") if l.strip() and len(l.strip()) > 20]
-        for line in lines[:5]:
-            events.append(ExtractedEvent(
-                headline=line[:100],
-                summary=line,
-                sentiment="neutral",
-                category="other",
-                severity="medium",
-                confidence=0.6,
-            ))
-
-    entities = NamedEntities(
-        persons=entities_raw.get("person", [])[:15],
-        organizations=entities_raw.get("organization", [])[:12],
-        locations=list(set(entities_raw.get("location", []) + entities_raw.get("country", [])))[:12],
-        dates=entities_raw.get("date", [])[:8],
-        topics=entities_raw.get("topic", [])[:10],
-    )
-
-    # Emit Fastino results
-    await emit("fastino_complete", {
-        "events": [e.model_dump() for e in events],
-        "entities": entities.model_dump(),
-        "sentiment": overall_sentiment,
-        "bias": bias,
-    })
-
-    # Build verified claims
-    verified_claims = []
-    for yr in (yutori_results if isinstance(yutori_results, list) else []):
-        if isinstance(yr, dict):
-            sr = yr.get("structured_result", {})
-            if isinstance(sr, str):
-                try:
-                    sr = json.loads(sr)
-                except Exception:
-                    sr = {}
-            verdict_raw = sr.get("verdict", "unclear") if isinstance(sr, dict) else "unclear"
-            verdict = "verified" if "verif" in verdict_raw.lower() else ("disputed" if "disput" in verdict_raw.lower() else "unclear")
-            explanation = sr.get("explanation", yr.get("result", "")[:200]) if isinstance(sr, dict) else str(yr.get("result", ""))[:200]
-            source_url = sr.get("source_url", "") if isinstance(sr, dict) else ""
-
-            verified_claims.append(VerifiedClaim(
-                claim=yr.get("claim", ""),
-                verdict=verdict,
-                confidence=sr.get("confidence", 0.5) if isinstance(sr, dict) else 0.5,
-                explanation=explanation,
-                sources=[source_url] if source_url else [],
-                yutori_view_url=yr.get("view_url", ""),
-            ))
-
-    await emit("yutori_complete", {
-        "claims": [c.model_dump() for c in verified_claims],
-    })
-
-    # ── Assemble final intelligence feed ──
-    transcript_summary = transcript[:500] + "..." if len(transcript) > 500 else transcript
-
-    feed = IntelligenceFeed(
-        video_title=f"NewsForge Analysis — {video_url[:50]}",
-        video_id=video_id,
-        transcript_summary=transcript_summary,
-        events=events,
-        entities=entities,
-        verified_claims=verified_claims,
-        overall_sentiment=overall_sentiment,
-        bias_indicator=bias,
-        alert_level=_compute_alert_level(events, overall_sentiment),
-        credibility_score=_compute_credibility(verified_claims),
-        topic_distribution=_compute_topic_distribution(events),
-        total_stories=len(events),
-        key_quotes=key_quotes,
-        broadcast_tags=tags if tags else entities.topics[:7],
-        raw_reka=raw_reka,
-    )
-
-    elapsed = round(time.time() - start_time, 1)
-    await emit("status", {"step": "complete", "message": f"Pipeline entirely complete! Finished in {elapsed}s", "progress": 100})
-    await emit("complete", {"feed": feed.model_dump()})
+    return raw_reka, tags
 
 
-async def _empty_claims():
-    """Return empty claims list for when no claims are found."""
-    return []
+async def _synthetic_prompt(name: str, emit: Callable, on_text: Optional[Callable] = None) -> str:
+    """Serve one prompt's synthetic answer, simulating its Reka stream."""
+    text = _synthetic_reka_outputs()[0].get(name, "")
+    if on_text:
+        await on_text(text)
+    if name != "transcript":
+        await emit("reka_stream", {"prompt": name, "text": text})
+        await emit("reka_prompt_complete", {"prompt": name, "char_count": len(text)})
+    return text
 
 
 async def _run_demo_pipeline(emit):
@@ -364,7 +573,7 @@ async def _run_demo_pipeline(emit):
     ]
     for prompt, text in demo_streams:
         await asyncio.sleep(0.8)
-        await emit("reka_stream", {"prompt": prompt, "chunk": text[:80], "done": False})
+        await emit("reka_stream", {"prompt": prompt, "text": text})
         await emit("reka_prompt_complete", {"prompt": prompt, "char_count": len(text)})
 
     await emit("status", {"step": "reka_qa", "message": "Reka analysis complete", "progress": 50})
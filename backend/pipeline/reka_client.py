@@ -1,9 +1,19 @@
-"""NewsForge — Reka Vision API client (upload, poll, streaming QA, tags)."""
+"""NewsForge — Reka Vision API client (upload, poll, streaming QA, tags).
+
+Set ``REKA_BASE`` to point the client at another deployment, e.g. the local
+mock vendors in ``benchmarks.mock_vendors``.
+"""
 import asyncio
 import json
+import os
+from typing import Awaitable, Callable, Optional
+
 import httpx
 
-REKA_BASE = "https://vision-agent.api.reka.ai"
+from pipeline.http_pool import vendor_client
+from pipeline.resilience import NO_HEDGE, CircuitOpenError
+
+REKA_BASE = os.getenv("REKA_BASE", "https://vision-agent.api.reka.ai").rstrip("/")
 
 REKA_PROMPTS = {
     "transcript": (
@@ -36,9 +46,13 @@ REKA_PROMPTS = {
 }
 
 
-async def upload_video_url(video_url: str, api_key: str) -> str:
+async def upload_video_url(
+    video_url: str,
+    api_key: str,
+    client: Optional[httpx.AsyncClient] = None,
+) -> str:
     """Upload a video by URL to Reka Vision and return video_id."""
-    async with httpx.AsyncClient(timeout=60) as client:
+    async with vendor_client("reka", client) as client:
         resp = await client.post(
             f"{REKA_BASE}/v1/videos/upload",
             headers={"X-Api-Key": api_key},
@@ -53,48 +67,73 @@ async def upload_video_url(video_url: str, api_key: str) -> str:
         return data.get("video_id", data.get("id", ""))
 
 
-async def wait_for_indexing(video_id: str, api_key: str, emit, max_wait: int = 300):
+async def get_video_status(
+    video_id: str,
+    api_key: str,
+    client: Optional[httpx.AsyncClient] = None,
+) -> dict:
+    """Fetch a video's metadata, including its indexing status."""
+    async with vendor_client("reka", client) as client:
+        resp = await client.get(
+            f"{REKA_BASE}/v1/videos/{video_id}",
+            headers={"X-Api-Key": api_key},
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+
+def indexing_status(data: dict) -> str:
+    """Read the indexing status out of a video metadata payload."""
+    return data.get("indexing_status", data.get("status", "unknown"))
+
+
+async def wait_for_indexing(
+    video_id: str,
+    api_key: str,
+    emit,
+    max_wait: int = 300,
+    client: Optional[httpx.AsyncClient] = None,
+):
     """Poll video status until indexed or timeout. Emits progress ticks."""
     elapsed = 0
     interval = 8
-    while elapsed < max_wait:
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.get(
-                f"{REKA_BASE}/v1/videos/{video_id}",
-                headers={"X-Api-Key": api_key},
-            )
-            resp.raise_for_status()
-            data = resp.json()
-
-        status = data.get("indexing_status", data.get("status", "unknown"))
-        pct = min(int((elapsed / max_wait) * 100), 99)
-
-        if status == "indexed":
-            await emit("status", {
-                "step": "indexing",
-                "message": f"Video indexed successfully ({elapsed}s)",
-                "progress": 25,
+    async with vendor_client("reka", client) as client:
+        while elapsed < max_wait:
+            data = await get_video_status(video_id, api_key, client)
+            status = indexing_status(data)
+            pct = min(int((elapsed / max_wait) * 100), 99)
+
+            if status == "indexed":
+                await emit("status", {
+                    "step": "indexing",
+                    "message": f"Video indexed successfully ({elapsed}s)",
+                    "progress": 25,
+                })
+                return
+            elif status == "failed":
+                raise RuntimeError(f"Reka indexing failed for video {video_id}")
+
+            await emit("indexing_tick", {
+                "elapsed": elapsed,
+                "max_wait": max_wait,
+                "pct": pct,
+                "status": status,
             })
-            return
-        elif status == "failed":
-            raise RuntimeError(f"Reka indexing failed for video {video_id}")
-
-        await emit("indexing_tick", {
-            "elapsed": elapsed,
-            "max_wait": max_wait,
-            "pct": pct,
-            "status": status,
-        })
 
-        await asyncio.sleep(interval)
-        elapsed += interval
+            await asyncio.sleep(interval)
+            elapsed += interval
 
     raise TimeoutError(f"Reka indexing timed out after {max_wait}s")
 
 
-async def ask_video(video_id: str, question: str, api_key: str) -> str:
+async def ask_video(
+    video_id: str,
+    question: str,
+    api_key: str,
+    client: Optional[httpx.AsyncClient] = None,
+) -> str:
     """Ask a question about an indexed video (non-streaming)."""
-    async with httpx.AsyncClient(timeout=120) as client:
+    async with vendor_client("reka", client) as client:
         resp = await client.post(
             f"{REKA_BASE}/v1/qa/chat",
             headers={
@@ -117,12 +156,23 @@ async def ask_video_streaming(
     prompt_name: str,
     api_key: str,
     emit,
+    client: Optional[httpx.AsyncClient] = None,
+    on_text: Optional[Callable[[str], Awaitable[None]]] = None,
 ) -> str:
-    """Ask a question with streaming, emitting reka_stream events. Returns full text."""
+    """Ask a question with streaming, emitting reka_stream events. Returns full text.
+
+    Each ``reka_stream`` event carries the accumulated answer as ``text``; the
+    pipeline's ``StreamCoalescer`` turns those into rate-limited delta frames.
+    ``on_text`` is awaited with the accumulated answer each time it grows.
+
+    Failures before the stream starts are retried by ``pipeline.resilience``;
+    if the stream breaks off before any text arrived, the question is asked
+    once more without streaming.
+    """
     accumulated = ""
     try:
-        async with httpx.AsyncClient(timeout=180) as client:
-            async with client.stream(
+        async with vendor_client("reka", client) as stream_client:
+            async with stream_client.stream(
                 "POST",
                 f"{REKA_BASE}/v1/qa/chat",
                 headers={
@@ -134,6 +184,8 @@ async def ask_video_streaming(
                     "stream": True,
                     "messages": [{"role": "user", "content": question}],
                 },
+                timeout=httpx.Timeout(180, connect=10),
+                extensions=NO_HEDGE,
             ) as resp:
                 resp.raise_for_status()
                 async for line in resp.aiter_lines():
@@ -149,21 +201,19 @@ async def ask_video_streaming(
                             text = chunk_data.get("chat_response", "")
                             if text:
                                 accumulated = text
-                                await emit("reka_stream", {
-                                    "prompt": prompt_name,
-                                    "chunk": text[-80:] if len(text) > 80 else text,
-                                    "done": False,
-                                })
+                                await emit("reka_stream", {"prompt": prompt_name, "text": accumulated})
+                                if on_text:
+                                    await on_text(accumulated)
                         except json.JSONDecodeError:
                             accumulated += chunk_str
-                            await emit("reka_stream", {
-                                "prompt": prompt_name,
-                                "chunk": chunk_str[:80],
-                                "done": False,
-                            })
+                            await emit("reka_stream", {"prompt": prompt_name, "text": accumulated})
+                            if on_text:
+                                await on_text(accumulated)
+    except CircuitOpenError:
+        raise
     except Exception:
         if not accumulated:
-            accumulated = await ask_video(video_id, question, api_key)
+            accumulated = await ask_video(video_id, question, api_key, client)
 
     await emit("reka_prompt_complete", {
         "prompt": prompt_name,
@@ -172,10 +222,14 @@ async def ask_video_streaming(
     return accumulated
 
 
-async def get_tags(video_id: str, api_key: str) -> list:
+async def get_tags(
+    video_id: str,
+    api_key: str,
+    client: Optional[httpx.AsyncClient] = None,
+) -> list:
     """Get indexed tags for a video. Returns empty list on failure."""
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
+        async with vendor_client("reka", client) as client:
             resp = await client.post(
                 f"{REKA_BASE}/v1/qa/indexedtag",
                 headers={
@@ -0,0 +1,272 @@
+"""NewsForge — Persistent index of videos already uploaded to and indexed by Reka.
+
+Uploading and indexing a broadcast can take minutes, so the source URL → Reka
+``video_id`` mapping is kept on disk. A later run for the same video checks the
+known ``video_id`` with a single status call and skips straight to the QA stage.
+Concurrent runs for the same URL share one in-flight upload or indexing wait,
+which reports progress to all of them and stops once none is left waiting.
+
+Configuration (all optional, read from the environment):
+- ``REKA_INDEX_ENABLED`` — set to ``false`` to always upload afresh
+- ``REKA_INDEX_PATH``    — JSON file the index is persisted to
+"""
+import asyncio
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+from pipeline.reka_client import (
+    get_video_status,
+    indexing_status,
+    upload_video_url,
+    wait_for_indexing,
+)
+from pipeline.video_url import canonical_video_id
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(__file__), "..", ".cache", "reka_videos.json")
+
+_GONE_STATUSES = {"failed", "deleted", "missing", "unknown"}
+
+
+class RekaVideoIndex:
+    """Maps (Reka account, canonical video URL) to a Reka video_id and indexing status."""
+
+    def __init__(self, path: Optional[str] = DEFAULT_INDEX_PATH, flush_interval: float = 1.0):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._entries: Optional[dict[str, dict]] = None
+        self._file_lock = threading.Lock()
+        self._dirty = False
+        self._flusher: Optional[asyncio.Task] = None
+        self._saving: Optional[asyncio.Future] = None
+        self._inflight: dict[str, asyncio.Future] = {}
+        self.reused = 0
+        self.uploads = 0
+        self.shared_uploads = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["RekaVideoIndex"]:
+        if os.getenv("REKA_INDEX_ENABLED", "true").lower() != "true":
+            return None
+        return cls(os.getenv("REKA_INDEX_PATH", DEFAULT_INDEX_PATH))
+
+    @staticmethod
+    def key(video_url: str, api_key: str) -> str:
+        account = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+        return f"{account}|{canonical_video_id(video_url)}"
+
+    def _load(self) -> dict[str, dict]:
+        if self._entries is None:
+            entries = {}
+            if self.path and os.path.exists(self.path):
+                try:
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        entries = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    entries = {}
+            self._entries = entries
+        return self._entries
+
+    def _save(self, snapshot: dict):
+        with self._file_lock:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp, self.path)
+
+    async def _persist(self):
+        """Mark the index changed; one debounced writer saves it (see ``flush``)."""
+        if self.path:
+            self._dirty = True
+            if self._flusher is None or self._flusher.done():
+                self._flusher = asyncio.ensure_future(self._flush_loop())
+
+    async def _flush_loop(self):
+        while self._dirty:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    async def flush(self):
+        """Write the index file, if anything changed."""
+        if self._saving is not None:
+            await asyncio.shield(self._saving)  # snapshots must land in the order they were taken
+        if not self._dirty:
+            return
+        self._dirty = False
+        self._saving = asyncio.ensure_future(asyncio.to_thread(self._save, dict(self._load())))
+        await asyncio.shield(self._saving)
+
+    def lookup(self, key: str) -> Optional[dict]:
+        return self._load().get(key)
+
+    async def record(self, key: str, video_id: str, status: str):
+        self._load()[key] = {"video_id": video_id, "status": status, "updated_at": time.time()}
+        await self._persist()
+
+    async def forget(self, key: str):
+        if self._load().pop(key, None) is not None:
+            await self._persist()
+
+    def stats(self) -> dict:
+        return {
+            "videos": len(self._load()),
+            "reused": self.reused,
+            "uploads": self.uploads,
+            "shared_uploads": self.shared_uploads,
+        }
+
+    async def aclose(self):
+        if self._flusher is not None and not self._flusher.done():
+            self._flusher.cancel()
+        await self.flush()
+
+
+async def _check_existing(video_id: str, api_key: str, client) -> str:
+    """One status call for a previously seen video; missing videos read as 'missing'."""
+    try:
+        return indexing_status(await get_video_status(video_id, api_key, client))
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code in (404, 410):
+            return "missing"
+        raise
+
+
+class _SharedIndexing:
+    """One in-flight upload or indexing wait, shared by every job waiting on the same video.
+
+    Progress events go to every current waiter. The work is cancelled once
+    the last waiter leaves, so an abandoned job does not keep polling Reka.
+    """
+
+    def __init__(self):
+        self.waiters: dict[object, Callable] = {}
+        self.video_id: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+    async def emit(self, event_type: str, data: dict):
+        if event_type == "video_uploaded":
+            self.video_id = data["video_id"]
+        for emit in list(self.waiters.values()):
+            await emit(event_type, data)
+
+
+async def _upload_and_index(
+    key: str,
+    video_url: str,
+    api_key: str,
+    emit: Callable,
+    client,
+    index: RekaVideoIndex,
+    max_wait: int,
+) -> str:
+    video_id = await upload_video_url(video_url, api_key, client)
+    index.uploads += 1
+    await index.record(key, video_id, "indexing")
+    await emit("video_uploaded", {"video_id": video_id, "video_url": video_url})
+    await emit("status", {"step": "indexing", "message": "Indexing video (multimodal feature extraction)...", "progress": 10})
+    return await _finish_indexing(key, video_id, api_key, emit, client, index, max_wait)
+
+
+async def _finish_indexing(
+    key: str,
+    video_id: str,
+    api_key: str,
+    emit: Callable,
+    client,
+    index: RekaVideoIndex,
+    max_wait: int,
+) -> str:
+    try:
+        await wait_for_indexing(video_id, api_key, emit, max_wait=max_wait, client=client)
+    except RuntimeError:
+        await index.forget(key)
+        raise
+    await index.record(key, video_id, "indexed")
+    return video_id
+
+
+def _start_shared(index: RekaVideoIndex, key: str, work: Callable[[Callable], Awaitable[str]]) -> _SharedIndexing:
+    """Run ``work(emit)`` as its own task, so a cancelled leader doesn't fail the followers."""
+    shared = index._inflight[key] = _SharedIndexing()
+    shared.task = asyncio.ensure_future(work(shared.emit))
+    shared.task.add_done_callback(lambda t: _clear_inflight(index, key, shared))
+    return shared
+
+
+def _clear_inflight(index: RekaVideoIndex, key: str, shared: _SharedIndexing):
+    if index._inflight.get(key) is shared:
+        del index._inflight[key]
+    if not shared.task.cancelled():
+        shared.task.exception()  # mark retrieved; the awaiting callers re-raise it
+
+
+async def _join(index: RekaVideoIndex, key: str, shared: _SharedIndexing, emit: Callable) -> str:
+    token = object()
+    shared.waiters[token] = emit
+    try:
+        return await asyncio.shield(shared.task)
+    finally:
+        del shared.waiters[token]
+        if not shared.waiters and not shared.task.done():
+            # Nobody needs the video any more. A later run finds the entry
+            # still marked "indexing" and resumes the wait.
+            if index._inflight.get(key) is shared:
+                del index._inflight[key]
+            shared.task.cancel()
+
+async def acquire_indexed_video(
+    video_url: str,
+    api_key: str,
+    emit: Callable,
+    client: Optional[httpx.AsyncClient] = None,
+    index: Optional[RekaVideoIndex] = None,
+    max_wait: int = 300,
+) -> str:
+    """Return a Reka video_id for ``video_url`` that is indexed and ready for QA."""
+    if index is None:
+        video_id = await upload_video_url(video_url, api_key, client)
+        await emit("video_uploaded", {"video_id": video_id, "video_url": video_url})
+        await wait_for_indexing(video_id, api_key, emit, max_wait=max_wait, client=client)
+        return video_id
+
+    key = index.key(video_url, api_key)
+    entry = index.lookup(key)
+    if entry and entry.get("video_id"):
+        video_id = entry["video_id"]
+        status = await _check_existing(video_id, api_key, client)
+        if status == "indexed":
+            index.reused += 1
+            await index.record(key, video_id, "indexed")
+            await emit("video_uploaded", {"video_id": video_id, "video_url": video_url, "reused": True})
+            await emit("status", {"step": "indexing", "message": "Reusing previously indexed video", "progress": 25})
+            await emit("log", {"message": f"Reka already has this broadcast indexed ({video_id}) — skipping upload.", "type": "success"})
+            return video_id
+        if status not in _GONE_STATUSES and key not in index._inflight:
+            index.reused += 1
+            await emit("video_uploaded", {"video_id": video_id, "video_url": video_url, "reused": True})
+            shared = _start_shared(index, key, lambda shared_emit: _finish_indexing(
+                key, video_id, api_key, shared_emit, client, index, max_wait,
+            ))
+            shared.video_id = video_id
+            return await _join(index, key, shared, emit)
+        if status in _GONE_STATUSES:
+            await index.forget(key)
+
+    shared = index._inflight.get(key)
+    if shared is not None:
+        index.shared_uploads += 1
+        await emit("log", {"message": "Another job is already uploading or indexing this broadcast — sharing it.", "type": "info"})
+        if shared.video_id is not None:
+            await emit("video_uploaded", {"video_id": shared.video_id, "video_url": video_url, "reused": True})
+        return await _join(index, key, shared, emit)
+
+    shared = _start_shared(index, key, lambda shared_emit: _upload_and_index(
+        key, video_url, api_key, shared_emit, client, index, max_wait,
+    ))
+    return await _join(index, key, shared, emit)
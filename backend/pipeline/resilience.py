@@ -0,0 +1,368 @@
+"""NewsForge — Retries, hedged requests and circuit breakers for vendor calls.
+
+``ResilientTransport`` wraps each vendor's transport (see ``pipeline.http_pool``),
+so every Reka, Fastino and Yutori call gets the same treatment. Each endpoint
+has a policy, looked up by its template:
+
+- ``READ`` calls have no side effects. They are retried on 429, 5xx and
+  transport errors. A call still waiting for its response after the
+  endpoint's recent p95 latency gets one duplicate (a hedge), and whichever
+  answers first wins. A single read call can opt out of hedging with
+  ``extensions=NO_HEDGE``.
+- ``IDEMPOTENT`` calls are retried like reads but never hedged, e.g. Reka QA
+  answers, each a full LLM call billed again if duplicated.
+- Any other call (uploads, new research tasks) is only retried when the
+  vendor cannot have acted on it: a 429, or a connection that never opened.
+
+Retries back off exponentially with full jitter. A ``Retry-After`` header is
+honoured, unless it asks for a longer wait than ``VENDOR_RETRY_MAX_DELAY_S``.
+In that case the 429 is returned to the caller.
+
+Each vendor has one circuit breaker for the whole process. After
+``BREAKER_FAILURES`` consecutive 5xx or transport failures it opens, and calls
+fail at once with ``CircuitOpenError`` instead of waiting on a vendor that is
+down. The affected stages fall back and the job ends with a degraded feed.
+After ``BREAKER_RESET_S`` a single probe call is let through, and its outcome
+closes or re-opens the breaker.
+
+Configuration (all optional, read from the environment):
+- ``VENDOR_RETRIES`` / ``<VENDOR>_RETRIES`` — retries per call (default 2)
+- ``VENDOR_RETRY_BASE_MS``     — first backoff step; doubles per retry
+- ``VENDOR_RETRY_MAX_DELAY_S`` — longest backoff or ``Retry-After`` wait
+- ``HEDGE_ENABLED``            — hedge slow read calls
+- ``HEDGE_MIN_DELAY_MS``       — never hedge sooner than this
+- ``HEDGE_MIN_SAMPLES``        — latencies seen on an endpoint before it is hedged
+- ``HEDGE_BUDGET``             — largest share of calls that may be hedged
+- ``BREAKER_FAILURES``         — consecutive failures that open a breaker
+- ``BREAKER_RESET_S``          — how long a breaker stays open before a probe
+"""
+import asyncio
+import email.utils
+import os
+import random
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+
+from pipeline import metrics
+
+READ = "read"
+IDEMPOTENT = "idempotent"
+
+ENDPOINT_POLICIES = {
+    "reka": {
+        ("GET", "/v1/videos/{id}"): READ,
+        # Every answer is a full, billed LLM call: retry it, never send a duplicate
+        ("POST", "/v1/qa/chat"): IDEMPOTENT,
+        ("POST", "/v1/qa/indexedtag"): READ,
+    },
+    "fastino": {
+        ("POST", "/gliner-2"): READ,
+    },
+    "yutori": {
+        ("GET", "/v1/research/tasks/{id}"): READ,
+        ("POST", "/v1/research/tasks/{id}/cancel"): IDEMPOTENT,
+    },
+}
+
+# Request extensions for a read call too costly to duplicate, e.g. a streamed answer
+NO_HEDGE = {"newsforge.hedge": False}
+
+_RETRY_STATUSES = {500, 502, 503, 504}
+# The request never reached the vendor, so even a non-idempotent call is safe to repeat
+_NOT_SENT = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class CircuitOpenError(httpx.TransportError):
+    """A vendor's circuit breaker is open; the call was not attempted."""
+
+
+@dataclass
+class ResiliencePolicy:
+    retries: int = 2
+    retry_base: float = 0.25
+    retry_max_delay: float = 10.0
+    hedge: bool = True
+    hedge_min_delay: float = 0.05
+    hedge_min_samples: int = 20
+    hedge_budget: float = 0.1
+    breaker_failures: int = 5
+    breaker_reset: float = 30.0
+
+    @classmethod
+    def from_env(cls, vendor: str) -> "ResiliencePolicy":
+        """Build a vendor's policy from environment variables."""
+        return cls(
+            retries=int(os.getenv(f"{vendor.upper()}_RETRIES", os.getenv("VENDOR_RETRIES", "2"))),
+            retry_base=float(os.getenv("VENDOR_RETRY_BASE_MS", "250")) / 1000,
+            retry_max_delay=float(os.getenv("VENDOR_RETRY_MAX_DELAY_S", "10")),
+            hedge=os.getenv("HEDGE_ENABLED", "true").lower() == "true",
+            hedge_min_delay=float(os.getenv("HEDGE_MIN_DELAY_MS", "50")) / 1000,
+            hedge_min_samples=int(os.getenv("HEDGE_MIN_SAMPLES", "20")),
+            hedge_budget=float(os.getenv("HEDGE_BUDGET", "0.1")),
+            breaker_failures=int(os.getenv("BREAKER_FAILURES", "5")),
+            breaker_reset=float(os.getenv("BREAKER_RESET_S", "30")),
+        )
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.retry_max_delay, self.retry_base * 2 ** attempt))
+
+
+def retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds asked for by a ``Retry-After`` header (delta-seconds or HTTP-date), if any."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures; lets one probe through once ``reset_after`` has passed."""
+
+    def __init__(self, vendor: str, failures: int = 5, reset_after: float = 30.0):
+        self.vendor = vendor
+        self.failure_threshold = max(1, failures)
+        self.reset_after = reset_after
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self.trips = 0
+        self.rejected = 0
+        self._gauge = metrics.CIRCUIT_STATE.labels(vendor)
+
+    def retry_in(self) -> float:
+        return max(0.0, self.opened_at + self.reset_after - time.monotonic())
+
+    def allow(self) -> bool:
+        if self.state == "open" and self.retry_in() == 0:
+            self._set("half_open")
+        if self.state == "closed" or (self.state == "half_open" and not self._probing):
+            self._probing = self.state == "half_open"
+            return True
+        self.rejected += 1
+        metrics.record_error("vendor_circuit_open")
+        return False
+
+    def record(self, ok: Optional[bool]):
+        """Record a call's outcome: True, False, or None for neither (e.g. a 429)."""
+        self._probing = False
+        if ok is None:
+            return
+        if ok:
+            self.consecutive_failures = 0
+            if self.state != "closed":
+                self._set("closed")
+            return
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold:
+            if self.state != "open":
+                self.trips += 1
+            self.opened_at = time.monotonic()
+            self._set("open")
+
+    def _set(self, state: str):
+        self.state = state
+        self._gauge.set({"closed": 0, "half_open": 1, "open": 2}[state])
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "trips": self.trips,
+            "rejected": self.rejected,
+            "retry_in_s": round(self.retry_in(), 1) if self.state == "open" else None,
+        }
+
+
+class _LatencyWindow:
+    """Recent response times of one endpoint, for its hedging threshold."""
+
+    def __init__(self, size: int = 200):
+        self._samples: deque = deque(maxlen=size)
+        self._p95: Optional[float] = None
+        self._stale = 0
+
+    def add(self, seconds: float):
+        self._samples.append(seconds)
+        self._stale += 1
+
+    def p95(self) -> Optional[float]:
+        if not self._samples:
+            return None
+        if self._p95 is None or self._stale >= 16:
+            ordered = sorted(self._samples)
+            self._p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+            self._stale = 0
+        return self._p95
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+
+class VendorHealth:
+    """Process-wide breaker, latencies and counters of one vendor, shared by all its clients."""
+
+    def __init__(self, vendor: str, policy: ResiliencePolicy):
+        self.vendor = vendor
+        self.breaker = CircuitBreaker(vendor, policy.breaker_failures, policy.breaker_reset)
+        self.latency: dict[str, _LatencyWindow] = {}
+        self.hedge_tokens = 0.0
+        self.requests = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def stats(self) -> dict:
+        return {
+            "breaker": self.breaker.stats(),
+            "requests": self.requests,
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "p95_ms": {endpoint: round(w.p95() * 1000, 1) for endpoint, w in self.latency.items() if len(w)},
+        }
+
+
+_health: dict[str, VendorHealth] = {}
+
+
+def vendor_health(vendor: str, policy: Optional[ResiliencePolicy] = None) -> VendorHealth:
+    health = _health.get(vendor)
+    if health is None:
+        health = _health[vendor] = VendorHealth(vendor, policy or ResiliencePolicy.from_env(vendor))
+    return health
+
+
+def circuit_open(vendor: str) -> bool:
+    """Whether calls to ``vendor`` are currently failing fast."""
+    health = _health.get(vendor)
+    return health is not None and health.breaker.state == "open" and health.breaker.retry_in() > 0
+
+
+def stats() -> dict:
+    return {vendor: health.stats() for vendor, health in _health.items()}
+
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    """Retries, hedges and circuit-breaks the calls of one vendor (see the module docstring)."""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, vendor: str, policy: Optional[ResiliencePolicy] = None):
+        self._transport = transport
+        self.vendor = vendor
+        self.policy = policy or ResiliencePolicy.from_env(vendor)
+        self.health = vendor_health(vendor, self.policy)
+        self._endpoints = ENDPOINT_POLICIES.get(vendor, {})
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        endpoint = metrics.endpoint_template(request.url.path)
+        kind = self._endpoints.get((request.method, endpoint))
+        hedge = kind == READ and self.policy.hedge and request.extensions.get("newsforge.hedge", True)
+        self.health.requests += 1
+        self.health.hedge_tokens = min(10.0, self.health.hedge_tokens + self.policy.hedge_budget)
+        window = self.health.latency.setdefault(endpoint, _LatencyWindow()) if hedge else None
+
+        attempt = 0
+        while True:
+            try:
+                if window is not None:
+                    response = await self._hedged(request, window)
+                else:
+                    response = await self._send(request)
+            except CircuitOpenError:
+                raise
+            except httpx.TransportError as e:
+                if attempt >= self.policy.retries or not (kind is not None or isinstance(e, _NOT_SENT)):
+                    raise
+                delay = self.policy.backoff(attempt)
+            else:
+                delay = self._retry_delay(response, kind, attempt)
+                if delay is None:
+                    return response
+                await response.aclose()
+            attempt += 1
+            self.health.retries += 1
+            metrics.RETRIES.labels(self.vendor).inc()
+            await asyncio.sleep(delay)
+
+    def _retry_delay(self, response: httpx.Response, kind: Optional[str], attempt: int) -> Optional[float]:
+        """How long to wait before retrying ``response``, or None to hand it to the caller."""
+        if attempt >= self.policy.retries:
+            return None
+        code = response.status_code
+        if code != 429 and (kind is None or code not in _RETRY_STATUSES):
+            return None
+        asked = retry_after(response)
+        if asked is None:
+            return self.policy.backoff(attempt)
+        if asked > self.policy.retry_max_delay:
+            return None
+        # A little jitter on top, so callers throttled together don't return together
+        return asked + random.uniform(0, self.policy.retry_base)
+
+    async def _send(self, request: httpx.Request, window: Optional[_LatencyWindow] = None) -> httpx.Response:
+        """One attempt, gated and scored by the vendor's circuit breaker."""
+        breaker = self.health.breaker
+        if not breaker.allow():
+            raise CircuitOpenError(f"{self.vendor} circuit open; retrying in {breaker.retry_in():.1f}s", request=request)
+        started = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except httpx.TransportError:
+            breaker.record(False)
+            raise
+        except BaseException:
+            breaker.record(None)
+            raise
+        code = response.status_code
+        breaker.record(None if code == 429 else code < 500)
+        if window is not None and code < 400:
+            window.add(time.perf_counter() - started)
+        return response
+
+    async def _hedged(self, request: httpx.Request, window: _LatencyWindow) -> httpx.Response:
+        """Send ``request``; if it is slower than the endpoint's p95, race a duplicate against it."""
+        p95 = window.p95() if len(window) >= self.policy.hedge_min_samples else None
+        if p95 is None:
+            return await self._send(request, window)
+        attempts = [asyncio.ensure_future(self._send(request, window))]
+        winner: Optional[asyncio.Task] = None
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=max(p95, self.policy.hedge_min_delay))
+            if done or self.health.hedge_tokens < 1 or circuit_open(self.vendor):
+                winner = attempts[0]
+                return await winner
+            self.health.hedge_tokens -= 1
+            self.health.hedges += 1
+            attempts.append(asyncio.ensure_future(self._send(request, window)))
+            pending = set(attempts)
+            while winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=attempts.index):
+                    failed = task.exception() is not None or task.result().status_code >= 500
+                    if not failed or not pending:
+                        winner = task
+                        break
+            hedge_won = winner is attempts[1]
+            self.health.hedge_wins += hedge_won
+            metrics.HEDGES.labels(self.vendor, "won" if hedge_won else "lost").inc()
+            return winner.result()
+        finally:
+            for task in attempts:
+                if not task.done():
+                    task.cancel()
+                elif task is not winner and not task.cancelled() and task.exception() is None:
+                    await task.result().aclose()
+
+    async def aclose(self):
+        await self._transport.aclose()
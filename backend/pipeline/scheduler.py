@@ -0,0 +1,151 @@
+"""NewsForge — Global admission control for pipeline runs.
+
+Every pipeline fans out to Reka, Fastino and Yutori, so letting each request
+start immediately just turns a traffic spike into vendor 429s that slow every
+job down. The scheduler caps how many pipelines run at once and holds the rest
+in a bounded FIFO queue; once the queue is full new jobs are rejected up front
+(the API answers 503 with ``Retry-After``) instead of degrading everyone.
+
+Queued jobs emit ``queued`` events with their position and an estimated wait,
+derived from a moving average of recent pipeline durations.
+
+Configuration (all optional, read from the environment):
+- ``PIPELINE_MAX_CONCURRENT`` — pipelines allowed to run at once
+- ``PIPELINE_MAX_QUEUE``      — jobs allowed to wait for a slot before rejecting
+- ``PIPELINE_EST_DURATION``   — seconds assumed per pipeline until real runs are measured
+"""
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from typing import Callable, Optional
+
+_EWMA_ALPHA = 0.2
+
+
+class QueueFull(Exception):
+    """Raised when the wait queue is full; ``retry_after`` is a suggested delay in seconds."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"pipeline queue is full, retry in {retry_after}s")
+        self.retry_after = retry_after
+
+
+class Ticket:
+    """A job's place in line: resolved once it is granted a run slot."""
+
+    __slots__ = ("granted", "moved", "enqueued_at", "started_at")
+
+    def __init__(self):
+        loop = asyncio.get_running_loop()
+        self.granted: asyncio.Future = loop.create_future()
+        self.moved: Optional[asyncio.Future] = None
+        self.enqueued_at = time.monotonic()
+        self.started_at: Optional[float] = None
+
+
+class PipelineScheduler:
+    """Caps concurrent pipelines and queues the overflow up to a fixed depth."""
+
+    def __init__(self, max_concurrent: int = 4, max_queue: int = 32, est_duration: float = 60.0):
+        self.max_concurrent = max(1, max_concurrent)
+        self.max_queue = max(0, max_queue)
+        self.avg_duration = est_duration
+        self._running = 0
+        self._waiting: deque[Ticket] = deque()
+        self.admitted = 0
+        self.queued = 0
+        self.rejected = 0
+        self.started = 0
+        self.total_queue_wait = 0.0
+
+    @classmethod
+    def from_env(cls) -> "PipelineScheduler":
+        return cls(
+            max_concurrent=int(os.getenv("PIPELINE_MAX_CONCURRENT", "4")),
+            max_queue=int(os.getenv("PIPELINE_MAX_QUEUE", "32")),
+            est_duration=float(os.getenv("PIPELINE_EST_DURATION", "60")),
+        )
+
+    def estimated_wait(self, position: int) -> float:
+        """Seconds until the job at 1-based queue ``position`` should get a slot."""
+        return math.ceil(position / self.max_concurrent) * self.avg_duration
+
+    def reserve(self) -> Ticket:
+        """Take a run slot or a place in the queue; raises ``QueueFull`` if neither is free."""
+        ticket = Ticket()
+        if self._running < self.max_concurrent and not self._waiting:
+            self._grant(ticket)
+        elif len(self._waiting) < self.max_queue:
+            self._waiting.append(ticket)
+            self.queued += 1
+        else:
+            self.rejected += 1
+            raise QueueFull(max(1, int(self.estimated_wait(len(self._waiting) + 1))))
+        self.admitted += 1
+        return ticket
+
+    def _grant(self, ticket: Ticket):
+        self._running += 1
+        self.started += 1
+        ticket.started_at = time.monotonic()
+        self.total_queue_wait += ticket.started_at - ticket.enqueued_at
+        ticket.granted.set_result(True)
+
+    def position(self, ticket: Ticket) -> int:
+        try:
+            return self._waiting.index(ticket) + 1
+        except ValueError:
+            return 0
+
+    async def acquire(self, ticket: Ticket, emit: Optional[Callable] = None):
+        """Wait for ``ticket``'s slot, emitting a ``queued`` event whenever the line moves."""
+        try:
+            while not ticket.granted.done():
+                ticket.moved = asyncio.get_running_loop().create_future()
+                if emit:
+                    position = self.position(ticket)
+                    await emit("queued", {
+                        "position": position,
+                        "queue_length": len(self._waiting),
+                        "estimated_wait": round(self.estimated_wait(position), 1),
+                    })
+                await asyncio.wait({ticket.granted, ticket.moved}, return_when=asyncio.FIRST_COMPLETED)
+        except asyncio.CancelledError:
+            self.release(ticket)
+            raise
+
+    def release(self, ticket: Ticket):
+        """Give back ``ticket``'s slot (or its place in line) and admit the next job."""
+        if ticket.started_at is None:
+            if ticket in self._waiting:
+                self._waiting.remove(ticket)
+                self._notify_moved()
+            return
+        duration = time.monotonic() - ticket.started_at
+        ticket.started_at = None
+        self.avg_duration += _EWMA_ALPHA * (duration - self.avg_duration)
+        self._running -= 1
+        while self._waiting and self._running < self.max_concurrent:
+            self._grant(self._waiting.popleft())
+        self._notify_moved()
+
+    def _notify_moved(self):
+        for waiting in self._waiting:
+            if waiting.moved is not None and not waiting.moved.done():
+                waiting.moved.set_result(True)
+
+    def stats(self) -> dict:
+        return {
+            "running": self._running,
+            "waiting": len(self._waiting),
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "rejected": self.rejected,
+            "started": self.started,
+            "avg_duration_s": round(self.avg_duration, 2),
+            "avg_queue_wait_s": round(self.total_queue_wait / self.started, 3) if self.started else 0.0,
+        }
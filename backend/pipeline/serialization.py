@@ -0,0 +1,33 @@
+"""NewsForge — Fast JSON encoding (orjson) for emitted events and stored feeds.
+
+Every SSE event, NDJSON batch record and stored or cached feed goes through
+these helpers. A complete event carrying a full feed can be several megabytes
+of JSON for a long broadcast, encoded on the event loop. ``sse_frame`` goes
+straight from orjson's bytes to the wire frame. It skips the str round trip
+and the per-line splitting that sse_starlette would otherwise add.
+"""
+from typing import Any, Optional
+
+import orjson
+
+_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+JSONDecodeError = orjson.JSONDecodeError  # a subclass of json.JSONDecodeError
+
+
+def dumps(obj: Any) -> str:
+    return orjson.dumps(obj, option=_OPTIONS).decode("utf-8")
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    return orjson.dumps(obj, option=_OPTIONS)
+
+
+def loads(data: str | bytes) -> Any:
+    return orjson.loads(data)
+
+
+def sse_frame(event: str, data: Any, event_id: Optional[str] = None) -> bytes:
+    """One encoded SSE frame. orjson escapes newlines, so the payload fits a single ``data:`` line."""
+    head = f"event: {event}\r\ndata: " if event_id is None else f"id: {event_id}\r\nevent: {event}\r\ndata: "
+    return b"".join((head.encode("utf-8"), dumps_bytes(data), b"\r\n\r\n"))
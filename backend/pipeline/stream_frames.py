@@ -0,0 +1,119 @@
+"""NewsForge — Coalescing, delta-encoded emit layer for high-frequency stream events.
+
+Reka answers stream in many small chunks, and each chunk used to become its
+own SSE event. ``StreamCoalescer`` wraps a pipeline ``emit`` instead. Stream
+events (``reka_stream``, keyed by prompt) carry the cumulative ``text`` so far.
+For each key, the coalescer keeps only the latest text and sends at most one
+frame per ``STREAM_FRAME_INTERVAL_MS``. That frame carries just what is new:
+``{"prompt", "offset", "delta"}``. The client truncates its copy to ``offset``
+and appends ``delta``, so the offset also covers an answer that rewrites its
+earlier text.
+
+Other events pass straight through. Pending frames are flushed before any of
+them, so per-prompt and terminal events (``reka_prompt_complete``,
+``complete``, ``error``) always follow the last of that text and are never
+merged or dropped.
+
+Configuration (all optional, read from the environment):
+- ``STREAM_FRAME_INTERVAL_MS`` — minimum spacing of frames per stream key (``0`` sends every update, still as deltas)
+"""
+import asyncio
+import os
+import time
+from typing import Awaitable, Callable, Optional
+
+STREAM_FRAME_INTERVAL_MS = float(os.getenv("STREAM_FRAME_INTERVAL_MS", "100"))
+
+# event type → (field naming the stream, field carrying its cumulative text)
+STREAM_EVENTS = {"reka_stream": ("prompt", "text")}
+
+
+def _common_prefix(a: str, b: str) -> int:
+    n = min(len(a), len(b))
+    i = 0
+    while i < n and a[i] == b[i]:
+        i += 1
+    return i
+
+
+class StreamCoalescer:
+    """An ``emit`` that merges bursts of stream events into rate-limited delta frames."""
+
+    def __init__(
+        self,
+        emit: Callable[[str, dict], Awaitable[None]],
+        interval: float = STREAM_FRAME_INTERVAL_MS / 1000,
+        streams: dict[str, tuple[str, str]] = STREAM_EVENTS,
+    ):
+        self._emit = emit
+        self.interval = max(0.0, interval)
+        self._streams = streams
+        self._latest: dict[tuple, dict] = {}
+        self._sent: dict[tuple, str] = {}
+        self._last_frame: dict[tuple, float] = {}
+        self._flusher: Optional[asyncio.Task] = None
+        self.updates = 0
+        self.frames = 0
+
+    async def __call__(self, event_type: str, data: dict):
+        stream = self._streams.get(event_type)
+        if stream is None:
+            await self.flush()
+            await self._emit(event_type, data)
+            return
+        self.updates += 1
+        key = (event_type, data.get(stream[0]))
+        self._latest[key] = data
+        last = self._last_frame.get(key)
+        if last is None or time.monotonic() - last >= self.interval:
+            await self._send(key)
+        elif self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.ensure_future(self._flush_when_due())
+
+    async def _send(self, key: tuple):
+        data = self._latest.pop(key, None)
+        if data is None:
+            return
+        event_type = key[0]
+        text_field = self._streams[event_type][1]
+        text = data.get(text_field) or ""
+        sent = self._sent.get(key, "")
+        offset = len(sent) if text.startswith(sent) else _common_prefix(sent, text)
+        self._sent[key] = text
+        self._last_frame[key] = time.monotonic()
+        if offset == len(sent) == len(text):
+            return
+        frame = {k: v for k, v in data.items() if k != text_field}
+        frame["offset"] = offset
+        frame["delta"] = text[offset:]
+        self.frames += 1
+        await self._emit(event_type, frame)
+
+    async def _flush_when_due(self):
+        while self._latest:
+            now = time.monotonic()
+            due = min(self._last_frame.get(key, now) + self.interval for key in self._latest)
+            if due > now:
+                await asyncio.sleep(due - now)
+                continue
+            for key in [k for k in self._latest if self._last_frame.get(k, now) + self.interval <= now]:
+                await self._send(key)
+
+    async def flush(self):
+        """Send every pending frame now."""
+        for key in list(self._latest):
+            await self._send(key)
+
+    async def aclose(self):
+        """Flush what is pending and stop the timer; later events still pass through."""
+        if self._flusher is not None and not self._flusher.done():
+            self._flusher.cancel()
+        self._flusher = None
+        await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "updates": self.updates,
+            "frames": self.frames,
+            "interval_ms": self.interval * 1000,
+        }
@@ -0,0 +1,246 @@
+"""NewsForge — Opt-in per-job span tracing with a Chrome trace export.
+
+When a job runs with tracing on, every pipeline stage, vendor HTTP call,
+GLiNER request and Yutori research task is recorded as a span, nested under
+the span that was current when it started. At the end the job emits a
+``timing`` event that summarizes the critical path. It also writes Chrome
+trace-event JSON, which opens in https://ui.perfetto.dev or chrome://tracing.
+
+The current trace lives in a context variable, so it follows a job into every
+task it spawns. Work shared across jobs (coalesced GLiNER batches, the
+Yutori poller) detaches from that context, or attaches to the job that owns
+it. With tracing off, each instrumentation point costs one context-variable
+lookup.
+
+Configuration (all optional, read from the environment):
+- ``PIPELINE_TRACE`` — set to ``true`` to trace every job, not just requests with ``"trace": true``
+- ``TRACE_DIR``      — directory the trace JSON files are written to
+"""
+import asyncio
+import contextvars
+import json
+import os
+import re
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from typing import Iterator, Optional
+
+DEFAULT_TRACE_DIR = os.path.join(os.path.dirname(__file__), "..", ".cache", "traces")
+TRACE_ID = re.compile(r"^[0-9a-f]{16}$")
+
+_current: contextvars.ContextVar[Optional[tuple["Trace", Optional["Span"]]]] = contextvars.ContextVar("newsforge_trace", default=None)
+_NOOP = nullcontext()
+
+
+def tracing_enabled(requested: bool = False) -> bool:
+    return requested or os.getenv("PIPELINE_TRACE", "false").lower() == "true"
+
+
+def trace_dir() -> str:
+    return os.getenv("TRACE_DIR") or DEFAULT_TRACE_DIR
+
+
+class Span:
+    __slots__ = ("trace", "id", "parent", "name", "cat", "start", "end", "args")
+
+    def __init__(self, trace: "Trace", span_id: int, parent: Optional["Span"], name: str, cat: str, args: dict):
+        self.trace = trace
+        self.id = span_id
+        self.parent = parent
+        self.name = name
+        self.cat = cat
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.args = args
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+
+class Trace:
+    """The spans recorded for one pipeline run."""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex[:16]
+        self.origin = time.perf_counter()
+        self.spans: list[Span] = []
+
+    def start(self, name: str, cat: str, parent: Optional[Span] = None, **args) -> Span:
+        span = Span(self, len(self.spans) + 1, parent, name, cat, args)
+        self.spans.append(span)
+        return span
+
+    def children(self, span: Optional[Span]) -> list[Span]:
+        return [s for s in self.spans if s.parent is span]
+
+    def descendants(self, span: Span) -> list[Span]:
+        found, frontier = [], [span]
+        while frontier:
+            kids = [s for s in self.spans if s.parent in frontier]
+            found.extend(kids)
+            frontier = kids
+        return found
+
+    def to_chrome(self) -> dict:
+        """Chrome trace-event JSON. Spans go on lanes (tids) so spans sharing a lane always nest."""
+        lanes: list[list[Span]] = []
+        lane_of: dict[int, int] = {}
+
+        def fits(lane: list[Span], span: Span) -> bool:
+            end = span.end or span.start
+            for other in lane:
+                other_end = other.end or other.start
+                disjoint = end <= other.start or other_end <= span.start
+                nested = (other.start <= span.start and end <= other_end) or (span.start <= other.start and other_end <= end)
+                if not (disjoint or nested):
+                    return False
+            return True
+
+        events = []
+        for span in sorted(self.spans, key=lambda s: (s.start, -(s.end or s.start))):
+            preferred = lane_of.get(span.parent.id) if span.parent is not None else 0
+            candidates = ([preferred] if preferred is not None else []) + list(range(len(lanes)))
+            tid = next((t for t in candidates if t < len(lanes) and fits(lanes[t], span)), None)
+            if tid is None:
+                tid = len(lanes)
+                lanes.append([])
+                events.append({"ph": "M", "name": "thread_name", "pid": 1, "tid": tid, "args": {"name": span.name}})
+            lanes[tid].append(span)
+            lane_of[span.id] = tid
+            end = span.end if span.end is not None else span.start
+            args = dict(span.args)
+            if span.parent is not None:
+                args["parent"] = span.parent.name
+            events.append({
+                "name": span.name,
+                "cat": span.cat,
+                "ph": "X",
+                "pid": 1,
+                "tid": tid,
+                "ts": round((span.start - self.origin) * 1e6, 1),
+                "dur": round((end - span.start) * 1e6, 1),
+                "args": args,
+            })
+        events.insert(0, {"ph": "M", "name": "process_name", "pid": 1, "args": {"name": "NewsForge pipeline"}})
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"trace_id": self.id}}
+
+    async def write(self, directory: Optional[str] = None) -> str:
+        """Write the Chrome trace JSON off the event loop; returns its path."""
+        directory = directory or trace_dir()
+        path = os.path.join(directory, f"{self.id}.json")
+        payload = self.to_chrome()
+
+        def dump():
+            os.makedirs(directory, exist_ok=True)
+            tmp = path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(payload, f)
+            os.replace(tmp, path)
+
+        await asyncio.to_thread(dump)
+        return path
+
+
+# ── Instrumentation API ──
+
+def current() -> Optional[tuple[Trace, Optional[Span]]]:
+    """The active ``(trace, span)``, or None when this job isn't traced."""
+    return _current.get()
+
+
+@contextmanager
+def _active(trace: Trace, parent: Optional[Span], name: str, cat: str, args: dict) -> Iterator[Span]:
+    span = trace.start(name, cat, parent, **args)
+    token = _current.set((trace, span))
+    try:
+        yield span
+    except BaseException as e:
+        span.args["error"] = type(e).__name__
+        raise
+    finally:
+        span.end = time.perf_counter()
+        _current.reset(token)
+
+
+def span(name: str, cat: str, **args):
+    """Context manager recording a span (and making it the parent of nested spans) when tracing."""
+    active = _current.get()
+    if active is None:
+        return _NOOP
+    return _active(active[0], active[1], name, cat, args)
+
+
+def start_span(name: str, cat: str, **args) -> Optional[Span]:
+    """Open a leaf span to be closed later with ``finish``; None when not tracing."""
+    active = _current.get()
+    if active is None:
+        return None
+    return active[0].start(name, cat, active[1], **args)
+
+
+def finish(span: Optional[Span], **args):
+    if span is not None and span.end is None:
+        span.end = time.perf_counter()
+        span.args.update(args)
+
+
+@contextmanager
+def attached(context: Optional[tuple[Trace, Optional[Span]]]):
+    """Run shared work (e.g. a Yutori poll) inside the trace of the job it belongs to."""
+    token = _current.set(context)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def detach():
+    """Stop attributing the rest of the current task to any job's trace."""
+    if _current.get() is not None:
+        _current.set(None)
+
+
+@contextmanager
+def traced(enabled: bool, name: str = "pipeline", **args) -> Iterator[Optional[Trace]]:
+    """Start a trace with a root span for the enclosed run, or do nothing when disabled."""
+    if not enabled:
+        yield None
+        return
+    trace = Trace()
+    token = _current.set((trace, None))
+    try:
+        with _active(trace, None, name, "pipeline", args):
+            yield trace
+    finally:
+        _current.reset(token)
+
+
+def summarize(trace: Trace, graph, written: bool = True) -> dict:
+    """The ``timing`` event: where the wall time went along the critical path of ``graph``.
+
+    ``trace_url`` points at ``GET /api/traces/{id}`` when the Chrome trace was written.
+    """
+    stage_spans = {s.name: s for s in trace.spans if s.cat == "stage"}
+    root = trace.spans[0] if trace.spans else None
+    critical = []
+    for name in graph.critical_path():
+        start, end = graph.timings[name]
+        entry = {"stage": name, "duration_s": round(end - start, 3)}
+        stage_span = stage_spans.get(name)
+        if stage_span is not None:
+            entry["start_s"] = round(stage_span.start - trace.origin, 3)
+            inner = [s for s in trace.descendants(stage_span) if s.end is not None]
+            slowest = max(inner, key=lambda s: s.duration, default=None)
+            if slowest is not None:
+                entry["slowest_span"] = {"name": slowest.name, "duration_s": round(slowest.duration, 3)}
+        critical.append(entry)
+    return {
+        "trace_id": trace.id,
+        "total_s": round(root.duration, 3) if root is not None else 0.0,
+        "critical_path": critical,
+        "stages": {name: round(end - start, 3) for name, (start, end) in sorted(graph.timings.items(), key=lambda item: item[1][0])},
+        "spans": len(trace.spans),
+        "trace_url": f"/api/traces/{trace.id}" if written else None,
+    }
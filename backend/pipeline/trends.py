@@ -0,0 +1,261 @@
+"""NewsForge — Rolling cross-broadcast trend aggregates.
+
+"Top entities and topics in the last hour" should not mean scanning every
+stored feed. Each completed feed instead adds its entities, topic mix,
+sentiment and alert level to time-bucketed counters for a few rolling windows
+(hour, day, week); each window keeps a running total alongside its buckets.
+A feed costs O(its own entities) to add, and a bucket that ages out is
+subtracted from the total once, so upkeep never depends on history size.
+
+Entities named in the same broadcast are counted as co-occurring pairs, so the
+trends show who and what keeps appearing together.
+
+The ranked view of a window is rebuilt only when something changed, and at
+most once per refresh interval — or per 1/60 of a bucket for the longer
+windows, where a rebuild ranks far more keys; ``/api/trends`` reads return
+that prepared view.
+
+Configuration (all optional, read from the environment):
+- ``TRENDS_ENABLED``    — set to ``false`` to keep no aggregates
+- ``TRENDS_TOP_N``      — entries kept in each ranked list
+- ``TRENDS_REFRESH_MS`` — minimum time between rebuilds of a window's ranked view
+"""
+import heapq
+import itertools
+import os
+import time
+from collections import Counter, deque
+from typing import Iterable, Optional
+
+from pipeline.entities import normalize_entity
+
+# name → (span seconds, bucket seconds)
+WINDOWS = {
+    "hour": (3600, 60),
+    "day": (86400, 900),
+    "week": (7 * 86400, 6 * 3600),
+}
+
+_ENTITY_LABELS = ("persons", "organizations", "locations", "dates", "topics")
+# Only these take part in co-occurrence, at most _PAIR_LIMIT each per feed,
+# which bounds the pairs one feed adds.
+_PAIR_LABELS = ("persons", "organizations", "locations")
+_PAIR_LIMIT = 5
+
+
+class _Counts:
+    """One bucket's worth of counters (also used for a window's running total)."""
+
+    __slots__ = ("feeds", "entities", "topics", "sentiment", "alerts", "pairs")
+
+    def __init__(self):
+        self.feeds = 0
+        self.entities: Counter = Counter()
+        self.topics: Counter = Counter()
+        self.sentiment: Counter = Counter()
+        self.alerts: Counter = Counter()
+        self.pairs: Counter = Counter()
+
+    def add(self, delta: "_Delta"):
+        self.feeds += 1
+        self.entities.update(delta.entities)
+        self.topics.update(delta.topics)
+        self.sentiment[delta.sentiment] += 1
+        self.alerts[delta.alert] += 1
+        self.pairs.update(delta.pairs)
+
+    def subtract(self, other: "_Counts"):
+        """Remove an expired bucket, dropping keys whose count reaches zero."""
+        self.feeds -= other.feeds
+        for mine, theirs in (
+            (self.entities, other.entities), (self.topics, other.topics), (self.sentiment, other.sentiment),
+            (self.alerts, other.alerts), (self.pairs, other.pairs),
+        ):
+            for key, count in theirs.items():
+                left = mine[key] - count
+                if left > 0:
+                    mine[key] = left
+                else:
+                    del mine[key]
+
+
+class _Delta:
+    """What one feed contributes, computed once and applied to every window."""
+
+    __slots__ = ("entities", "topics", "sentiment", "alert", "pairs")
+
+    def __init__(self, feed: dict, names: dict):
+        entities = feed.get("entities") or {}
+        keys = []
+        paired = []
+        for label in _ENTITY_LABELS:
+            seen = set()
+            for name in entities.get(label) or ():
+                norm = normalize_entity(name) if isinstance(name, str) else ""
+                if not norm or norm in seen:
+                    continue
+                seen.add(norm)
+                key = (label, norm)
+                names.setdefault(key, name.strip())
+                keys.append(key)
+                if label in _PAIR_LABELS and len(seen) <= _PAIR_LIMIT:
+                    paired.append(key)
+        self.entities = keys
+        self.pairs = [tuple(sorted(pair)) for pair in itertools.combinations(paired, 2)]
+        self.topics = {t: c for t, c in (feed.get("topic_distribution") or {}).items() if isinstance(c, int) and c > 0}
+        self.sentiment = feed.get("overall_sentiment") or "neutral"
+        self.alert = feed.get("alert_level") or "low"
+
+
+class RollingWindow:
+    """Time-bucketed counters over the last ``span`` seconds, plus their running total."""
+
+    def __init__(self, span: float, bucket: float):
+        self.span = span
+        self.bucket = bucket
+        self.buckets: deque[tuple[float, _Counts]] = deque()
+        self.total = _Counts()
+        self.version = 0
+
+    def _bucket_for(self, ts: float) -> _Counts:
+        start = ts - ts % self.bucket
+        if not self.buckets or self.buckets[-1][0] < start:
+            self.buckets.append((start, _Counts()))
+            return self.buckets[-1][1]
+        # Late arrival (rare): find its bucket from the newest end
+        for index in range(len(self.buckets) - 1, -1, -1):
+            bucket_start, counts = self.buckets[index]
+            if bucket_start == start:
+                return counts
+            if bucket_start < start:
+                self.buckets.insert(index + 1, (start, _Counts()))
+                return self.buckets[index + 1][1]
+        self.buckets.appendleft((start, _Counts()))
+        return self.buckets[0][1]
+
+    def add(self, ts: float, delta: _Delta, now: float):
+        if ts <= now - self.span:
+            return
+        self._bucket_for(ts).add(delta)
+        self.total.add(delta)
+        self.version += 1
+
+    def expire(self, now: float) -> list[_Counts]:
+        """Drop buckets that have fully left the window; returns them."""
+        expired = []
+        horizon = now - self.span
+        while self.buckets and self.buckets[0][0] + self.bucket <= horizon:
+            expired.append(self.buckets.popleft()[1])
+            self.total.subtract(expired[-1])
+        if expired:
+            self.version += 1
+        return expired
+
+
+def _ranked(counter: Counter, limit: int) -> list:
+    return heapq.nlargest(limit, counter.items(), key=lambda item: item[1])
+
+
+class TrendAggregator:
+    """Rolling hour/day/week aggregates over every completed feed."""
+
+    def __init__(self, top_n: int = 20, refresh_interval: float = 1.0, windows: Optional[dict] = None):
+        self.top_n = top_n
+        self.refresh_interval = refresh_interval
+        self.windows = {name: RollingWindow(span, bucket) for name, (span, bucket) in (windows or WINDOWS).items()}
+        self._longest = max(self.windows.values(), key=lambda w: w.span)
+        self._names: dict[tuple[str, str], str] = {}
+        self._views: dict[str, tuple[int, float, dict]] = {}
+        self.feeds_added = 0
+        self.rebuilds = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["TrendAggregator"]:
+        if os.getenv("TRENDS_ENABLED", "true").lower() != "true":
+            return None
+        return cls(
+            top_n=int(os.getenv("TRENDS_TOP_N", "20")),
+            refresh_interval=float(os.getenv("TRENDS_REFRESH_MS", "1000")) / 1000,
+        )
+
+    def add(self, feed: dict, ts: Optional[float] = None):
+        """Count one completed feed into every window."""
+        now = time.time()
+        ts = now if ts is None else ts
+        if ts <= now - self._longest.span:
+            return
+        self._expire(now)
+        delta = _Delta(feed, self._names)
+        for window in self.windows.values():
+            window.add(ts, delta, now)
+        self.feeds_added += 1
+
+    @property
+    def horizon(self) -> float:
+        """Seconds of history the longest window covers."""
+        return self._longest.span
+
+    def seed(self, feeds: Iterable[tuple[float, dict]]):
+        """Replay ``(timestamp, feed)`` history, oldest first, after a restart."""
+        for ts, feed in feeds:
+            self.add(feed, ts)
+
+    def _expire(self, now: float):
+        for window in self.windows.values():
+            expired = window.expire(now)
+            if window is self._longest and expired:
+                # Forget display names of entities no longer in any window
+                for counts in expired:
+                    for key in counts.entities:
+                        if key not in window.total.entities:
+                            self._names.pop(key, None)
+
+    def view(self, window: str = "hour") -> dict:
+        """The ranked trends for ``window``, rebuilt only when stale."""
+        rolling = self.windows[window]
+        now = time.time()
+        cached = self._views.get(window)
+        if cached is not None and now - cached[1] < max(self.refresh_interval, rolling.bucket / 60):
+            return cached[2]
+        self._expire(now)
+        if cached is not None and cached[0] == rolling.version:
+            self._views[window] = (rolling.version, now, cached[2])
+            return cached[2]
+        view = self._build(window, rolling, now)
+        self._views[window] = (rolling.version, now, view)
+        self.rebuilds += 1
+        return view
+
+    def _build(self, name: str, window: RollingWindow, now: float) -> dict:
+        total = window.total
+        by_label: dict[str, Counter] = {label: Counter() for label in _ENTITY_LABELS}
+        for (label, norm), count in total.entities.items():
+            by_label[label][norm] = count
+        display = lambda key: self._names.get(key, key[1])
+        return {
+            "window": name,
+            "span_seconds": window.span,
+            "bucket_seconds": window.bucket,
+            "generated_at": now,
+            "feeds": total.feeds,
+            "entities": {
+                label: [{"name": display((label, norm)), "count": count} for norm, count in _ranked(counts, self.top_n)]
+                for label, counts in by_label.items()
+            },
+            "topics": [{"topic": topic, "count": count} for topic, count in _ranked(total.topics, self.top_n)],
+            "sentiment": dict(total.sentiment),
+            "alert_levels": dict(total.alerts),
+            "co_occurrence": [
+                {"a": display(a), "b": display(b), "count": count}
+                for (a, b), count in _ranked(total.pairs, self.top_n)
+            ],
+            "timeline": [{"start": start, "feeds": counts.feeds} for start, counts in window.buckets],
+        }
+
+    def stats(self) -> dict:
+        return {
+            "feeds_added": self.feeds_added,
+            "view_rebuilds": self.rebuilds,
+            "tracked_entities": len(self._names),
+            "windows": {name: {"feeds": w.total.feeds, "buckets": len(w.buckets)} for name, w in self.windows.items()},
+        }
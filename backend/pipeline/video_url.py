@@ -0,0 +1,38 @@
+"""NewsForge — Video URL normalization shared by the feed cache and Reka video index."""
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+_YOUTUBE_HOSTS = {
+    "youtube.com", "www.youtube.com", "m.youtube.com", "music.youtube.com",
+    "youtube-nocookie.com", "www.youtube-nocookie.com",
+}
+_YOUTUBE_ID = re.compile(r"^[A-Za-z0-9_-]{11}$")
+_YOUTUBE_PATH_PREFIXES = ("/embed/", "/shorts/", "/live/", "/v/", "/e/")
+_TRACKING_PARAMS = {"si", "feature", "fbclid", "gclid", "t", "start", "time_continue"}
+
+
+def canonical_video_id(video_url: str) -> str:
+    """Normalize a video URL to a stable identity, e.g. ``youtube:dQw4w9WgXcQ``."""
+    url = video_url.strip()
+    if "://" not in url:
+        url = "https://" + url
+    parts = urlsplit(url)
+    host = (parts.hostname or "").lower()
+
+    candidate = ""
+    if host in ("youtu.be", "www.youtu.be"):
+        candidate = parts.path.lstrip("/").split("/")[0]
+    elif host in _YOUTUBE_HOSTS:
+        if parts.path == "/watch":
+            candidate = dict(parse_qsl(parts.query)).get("v", "")
+        else:
+            for prefix in _YOUTUBE_PATH_PREFIXES:
+                if parts.path.startswith(prefix):
+                    candidate = parts.path[len(prefix):].split("/")[0]
+                    break
+    if _YOUTUBE_ID.match(candidate):
+        return f"youtube:{candidate}"
+
+    query = sorted((k, v) for k, v in parse_qsl(parts.query) if k not in _TRACKING_PARAMS and not k.startswith("utm_"))
+    path = parts.path.rstrip("/") or "/"
+    return "url:" + urlunsplit(("https", host, path, urlencode(query), ""))
@@ -1,11 +1,36 @@
-"""NewsForge — Yutori Research API client (create task, poll with live updates)."""
+"""NewsForge — Yutori Research API client (create task, poll with live updates).
+
+Outstanding research tasks from every job are polled by one shared
+``YutoriPoller`` with adaptive per-task intervals and a global poll-rate
+ceiling, configured by ``YUTORI_POLL_MIN_INTERVAL``, ``YUTORI_POLL_MAX_INTERVAL``,
+``YUTORI_POLL_BACKOFF`` and ``YUTORI_MAX_POLLS_PER_SEC``. ``YUTORI_BASE``
+overrides the API base URL.
+"""
 import asyncio
+import os
+import time
+import weakref
+from typing import Optional
+
 import httpx
 
-YUTORI_BASE = "https://api.yutori.com"
+from pipeline import cancellation, metrics, tracing
+from pipeline.http_pool import vendor_client
+
+YUTORI_BASE = os.getenv("YUTORI_BASE", "https://api.yutori.com").rstrip("/")
+
+YUTORI_POLL_MIN_INTERVAL = float(os.getenv("YUTORI_POLL_MIN_INTERVAL", "1"))
+YUTORI_POLL_MAX_INTERVAL = float(os.getenv("YUTORI_POLL_MAX_INTERVAL", "8"))
+YUTORI_POLL_BACKOFF = float(os.getenv("YUTORI_POLL_BACKOFF", "1.4"))
+YUTORI_MAX_POLLS_PER_SEC = float(os.getenv("YUTORI_MAX_POLLS_PER_SEC", "10"))
 
 
-async def create_research_task(claim: str, api_key: str, emit=None) -> dict:
+async def create_research_task(
+    claim: str,
+    api_key: str,
+    emit=None,
+    client: Optional[httpx.AsyncClient] = None,
+) -> dict:
     """Create a Yutori research task to verify a claim. Returns task info dict."""
     query = (
         f'Verify this news claim with recent web sources: "{claim}" '
@@ -33,7 +58,7 @@ async def create_research_task(claim: str, api_key: str, emit=None) -> dict:
         },
     }
 
-    async with httpx.AsyncClient(timeout=30) as client:
+    async with vendor_client("yutori", client) as client:
         resp = await client.post(
             f"{YUTORI_BASE}/v1/research/tasks",
             headers={
@@ -65,104 +90,343 @@ async def create_research_task(claim: str, api_key: str, emit=None) -> dict:
     return result
 
 
-async def poll_one_task(
+async def cancel_research_task(
     task_id: str,
-    claim: str,
     api_key: str,
-    emit=None,
-    max_wait: int = 180,
-) -> dict:
-    """Poll a single Yutori research task until complete. Streams live updates."""
-    elapsed = 0
-    interval = 6
-    last_update_count = 0
-
-    while elapsed < max_wait:
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.get(
-                f"{YUTORI_BASE}/v1/research/tasks/{task_id}",
+    client: Optional[httpx.AsyncClient] = None,
+) -> bool:
+    """Ask Yutori to stop a research task nobody is waiting for. Best effort."""
+    try:
+        async with vendor_client("yutori", client) as client:
+            resp = await client.post(
+                f"{YUTORI_BASE}/v1/research/tasks/{task_id}/cancel",
                 headers={"X-API-Key": api_key},
             )
-            resp.raise_for_status()
-            data = resp.json()
+            return resp.status_code < 400
+    except Exception:
+        return False
 
-        status = data.get("status", "unknown")
-        updates = data.get("updates", [])
-
-        if len(updates) > last_update_count and emit:
-            new_updates = updates[last_update_count:]
-            for upd in new_updates:
-                citations = upd.get("citations", [])
-                citation_urls = [c.get("url", "") for c in citations if c.get("url")]
-                await emit("yutori_update", {
-                    "task_id": task_id,
-                    "claim": claim,
-                    "content": upd.get("content", "")[:200],
-                    "citations": citation_urls,
-                    "view_url": data.get("view_url", ""),
-                })
-            last_update_count = len(updates)
-
-        if status == "succeeded":
-            return {
-                "claim": claim,
+
+async def get_research_task(
+    task_id: str,
+    api_key: str,
+    client: Optional[httpx.AsyncClient] = None,
+) -> dict:
+    """Fetch the current state of a research task."""
+    async with vendor_client("yutori", client) as client:
+        resp = await client.get(
+            f"{YUTORI_BASE}/v1/research/tasks/{task_id}",
+            headers={"X-API-Key": api_key},
+        )
+        resp.raise_for_status()
+        return resp.json()
+
+
+async def _emit_new_updates(task_id: str, claim: str, data: dict, seen: int, emit=None) -> int:
+    """Emit yutori_update events for updates past ``seen``; returns the new count."""
+    updates = data.get("updates", [])
+    if len(updates) > seen and emit:
+        for upd in updates[seen:]:
+            citations = upd.get("citations", [])
+            citation_urls = [c.get("url", "") for c in citations if c.get("url")]
+            await emit("yutori_update", {
                 "task_id": task_id,
-                "view_url": data.get("view_url", ""),
-                "result": data.get("result", ""),
-                "structured_result": data.get("structured_result", {}),
-                "status": "succeeded",
-            }
-        elif status == "failed":
-            return {
                 "claim": claim,
-                "task_id": task_id,
+                "content": upd.get("content", "")[:200],
+                "citations": citation_urls,
                 "view_url": data.get("view_url", ""),
-                "result": "",
-                "structured_result": {},
-                "status": "failed",
-            }
+            })
+    return max(seen, len(updates))
 
-        await asyncio.sleep(interval)
-        elapsed += interval
 
+def _task_result(task_id: str, claim: str, data: dict, status: str) -> dict:
+    succeeded = status == "succeeded"
     return {
         "claim": claim,
         "task_id": task_id,
-        "view_url": "",
-        "result": "",
-        "structured_result": {},
-        "status": "timeout",
+        "view_url": data.get("view_url", ""),
+        "result": data.get("result", "") if succeeded else "",
+        "structured_result": data.get("structured_result", {}) if succeeded else {},
+        "status": status,
     }
 
 
-async def verify_claims(claims: list[str], api_key: str, emit=None) -> list[dict]:
-    """Verify multiple claims in parallel using Yutori Research API."""
-    top_claims = claims[:5]
+class _TrackedTask:
+    def __init__(self, task_id: str, claim: str, api_key: str, emit, client, max_wait: float, interval: float):
+        self.task_id = task_id
+        self.claim = claim
+        self.api_key = api_key
+        self.emit = emit
+        self.client = client
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.tracked_at = time.monotonic()
+        self.deadline = self.tracked_at + max_wait
+        self.interval = interval
+        self.next_poll = time.monotonic() + interval
+        self.seen_updates = 0
+        self.errors = 0
+        self.polling = False
+        self.span = tracing.start_span("yutori research", "research", task_id=task_id)
+        self.trace_context = (self.span.trace, self.span) if self.span is not None else None
 
-    task_refs = []
-    for claim in top_claims:
+
+class YutoriPoller:
+    """One process-wide poller for every outstanding research task across all jobs.
+
+    Each task is polled on its own adaptive schedule: quickly at first, backing
+    off geometrically while nothing changes, and snapping back to the fastest
+    interval whenever new updates arrive. A global ceiling bounds the total
+    poll rate no matter how many jobs are waiting on verdicts.
+    """
+
+    def __init__(
+        self,
+        min_interval: float = YUTORI_POLL_MIN_INTERVAL,
+        max_interval: float = YUTORI_POLL_MAX_INTERVAL,
+        backoff: float = YUTORI_POLL_BACKOFF,
+        max_polls_per_sec: float = YUTORI_MAX_POLLS_PER_SEC,
+        max_errors: int = 3,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.min_spacing = 1.0 / max_polls_per_sec if max_polls_per_sec > 0 else 0.0
+        self.max_errors = max_errors
+        self._tasks: dict[str, _TrackedTask] = {}
+        self._wakeup = asyncio.Event()
+        self._runner: Optional[asyncio.Task] = None
+        self._inflight: set[asyncio.Task] = set()
+        self._last_poll = 0.0
+        self.polls = 0
+        self.completed = 0
+
+    def track(
+        self,
+        task_id: str,
+        claim: str,
+        api_key: str,
+        emit=None,
+        client: Optional[httpx.AsyncClient] = None,
+        max_wait: float = 180,
+    ) -> asyncio.Future:
+        """Start tracking a task; the returned future resolves to its result dict."""
+        tracked = self._tasks.get(task_id)
+        if tracked is None:
+            tracked = self._tasks[task_id] = _TrackedTask(task_id, claim, api_key, emit, client, max_wait, self.min_interval)
+            tracked.future.add_done_callback(lambda f: f.cancelled() and self._forget(tracked))
+        if self._runner is None or self._runner.done():
+            self._runner = asyncio.ensure_future(self._run())
+        self._wakeup.set()
+        return tracked.future
+
+    def _forget(self, tracked: _TrackedTask):
+        tracing.finish(tracked.span, outcome="cancelled")
+        if self._tasks.get(tracked.task_id) is tracked:
+            del self._tasks[tracked.task_id]
+
+    def untrack(self, task_id: str):
+        """Stop polling a task, e.g. because its job was cancelled."""
+        tracked = self._tasks.pop(task_id, None)
+        if tracked is not None and not tracked.future.done():
+            tracked.future.cancel()
+
+    @property
+    def outstanding(self) -> int:
+        return len(self._tasks)
+
+    async def _run(self):
+        # Started by whichever job tracked a task first, but polls for every job.
+        tracing.detach()
+        while self._tasks:
+            now = time.monotonic()
+            ready = [t for t in self._tasks.values() if not t.polling]
+            due = min(ready, key=lambda t: min(t.next_poll, t.deadline), default=None)
+            if due is None:
+                wait = self.max_interval
+            else:
+                wait = max(min(due.next_poll, due.deadline) - now, self._last_poll + self.min_spacing - now, 0)
+            if wait > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            if now >= due.deadline:
+                self._finish(due, _task_result(due.task_id, due.claim, {}, "timeout"))
+                continue
+            due.polling = True
+            self._last_poll = now
+            poll = asyncio.ensure_future(self._poll(due))
+            self._inflight.add(poll)
+            poll.add_done_callback(self._inflight.discard)
+
+    async def _poll(self, tracked: _TrackedTask):
+        self.polls += 1
         try:
-            ref = await create_research_task(claim, api_key, emit)
-            task_refs.append(ref)
+            with tracing.attached(tracked.trace_context):
+                data = await get_research_task(tracked.task_id, tracked.api_key, tracked.client)
         except Exception as e:
-            if emit:
-                await emit("log", {"message": f"Failed to create Yutori task for: {claim[:50]}... — {e}", "type": "warn"})
+            tracked.errors += 1
+            if tracked.errors >= self.max_errors:
+                self._finish(tracked, error=e)
+            else:
+                self._reschedule(tracked, changed=False)
+            return
+
+        tracked.errors = 0
+        status = data.get("status", "unknown")
+        seen = tracked.seen_updates
+        try:
+            tracked.seen_updates = await _emit_new_updates(tracked.task_id, tracked.claim, data, seen, tracked.emit)
+        except Exception:
+            tracked.seen_updates = len(data.get("updates", []))
+
+        if status in ("succeeded", "failed"):
+            self._finish(tracked, _task_result(tracked.task_id, tracked.claim, data, status))
+        else:
+            self._reschedule(tracked, changed=tracked.seen_updates > seen)
+
+    def _reschedule(self, tracked: _TrackedTask, changed: bool):
+        if changed:
+            tracked.interval = self.min_interval
+        else:
+            tracked.interval = min(tracked.interval * self.backoff, self.max_interval)
+        tracked.next_poll = time.monotonic() + tracked.interval
+        tracked.polling = False
+        self._wakeup.set()
+
+    def _finish(self, tracked: _TrackedTask, result: Optional[dict] = None, error: Optional[Exception] = None):
+        if self._tasks.get(tracked.task_id) is tracked:
+            del self._tasks[tracked.task_id]
+        self.completed += 1
+        outcome = "error" if error is not None else result.get("status", "unknown")
+        metrics.observe_verdict(time.monotonic() - tracked.tracked_at, outcome)
+        tracing.finish(tracked.span, outcome=outcome)
+        if not tracked.future.done():
+            if error is not None:
+                tracked.future.set_exception(error)
+            else:
+                tracked.future.set_result(result)
+        self._wakeup.set()
+
+    def stats(self) -> dict:
+        return {
+            "outstanding_tasks": len(self._tasks),
+            "polls": self.polls,
+            "completed": self.completed,
+            "max_polls_per_sec": round(1.0 / self.min_spacing, 2) if self.min_spacing else None,
+        }
+
+    async def aclose(self):
+        for task_id in list(self._tasks):
+            self.untrack(task_id)
+        for task in [self._runner, *self._inflight]:
+            if task is not None and not task.done():
+                task.cancel()
+
+
+_pollers: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, YutoriPoller]" = weakref.WeakKeyDictionary()
+
+
+def yutori_poller() -> YutoriPoller:
+    """The process-wide poller for the running event loop."""
+    loop = asyncio.get_running_loop()
+    poller = _pollers.get(loop)
+    if poller is None:
+        poller = _pollers[loop] = YutoriPoller()
+    return poller
+
+
+_background_cancels: set[asyncio.Task] = set()
+
+
+def _cancel_in_background(task_ids: list[str], api_key: str, client=None):
+    """Cancel abandoned research tasks without blocking the job's own cancellation."""
+    if not task_ids:
+        return
+
+    async def cancel_all():
+        results = await asyncio.gather(*(cancel_research_task(t, api_key, client) for t in task_ids))
+        cancellation.record("yutori_tasks_cancelled", sum(1 for ok in results if ok))
+
+    task = asyncio.ensure_future(cancel_all())
+    _background_cancels.add(task)
+    task.add_done_callback(_background_cancels.discard)
+
+
+async def verify_claims(
+    claims: list[str],
+    api_key: str,
+    emit=None,
+    client: Optional[httpx.AsyncClient] = None,
+    existing_tasks: Optional[dict[str, str]] = None,
+) -> list[dict]:
+    """Verify multiple claims in parallel using Yutori Research API.
+
+    If the calling job is cancelled, outstanding research tasks are dropped
+    from the poller and cancelled on Yutori's side. ``existing_tasks`` maps
+    claims to task_ids created by an earlier, interrupted run: those tasks are
+    adopted instead of re-created, and tasks are left running on cancellation
+    so the next resume can adopt them in turn. Recorded tasks whose claim is
+    not among the ones verified here are cancelled.
+
+    Claims whose task cannot be created or polled are left out. If every
+    claim fails, the first error is raised so callers see the outage (e.g.
+    Yutori's circuit breaker is open) and the feed is marked degraded.
+    """
+    top_claims = claims[:5]
+    if existing_tasks:
+        _cancel_in_background([t for c, t in existing_tasks.items() if t and c not in top_claims], api_key, client)
+
+    task_refs = []
+    errors: list[Exception] = []
+    poll_futures = []
+    poller = yutori_poller()
+    try:
+        for claim in top_claims:
+            if existing_tasks and existing_tasks.get(claim):
+                task_refs.append({"task_id": existing_tasks[claim], "view_url": "", "status": "resumed", "claim": claim})
+                if emit:
+                    await emit("log", {"message": f"Resuming Yutori task {existing_tasks[claim]} for: {claim[:50]}...", "type": "info"})
+                continue
+            try:
+                ref = await create_research_task(claim, api_key, emit, client)
+                task_refs.append(ref)
+            except Exception as e:
+                errors.append(e)
+                if emit:
+                    await emit("log", {"message": f"Failed to create Yutori task for: {claim[:50]}... — {e}", "type": "warn"})
 
-    if not task_refs:
-        return []
+        if not task_refs:
+            if errors:
+                raise errors[0]
+            return []
 
-    poll_tasks = [
-        poll_one_task(ref["task_id"], ref["claim"], api_key, emit)
-        for ref in task_refs
-    ]
-    results = await asyncio.gather(*poll_tasks, return_exceptions=True)
+        poll_futures = [
+            poller.track(ref["task_id"], ref["claim"], api_key, emit, client)
+            for ref in task_refs
+        ]
+        results = await asyncio.gather(*poll_futures, return_exceptions=True)
+    except asyncio.CancelledError:
+        outstanding = [
+            ref["task_id"] for i, ref in enumerate(task_refs)
+            if i >= len(poll_futures) or poll_futures[i].cancelled() or not poll_futures[i].done()
+        ]
+        if existing_tasks is None:
+            _cancel_in_background(outstanding, api_key, client)
+        raise
 
     verified = []
     for r in results:
         if isinstance(r, dict):
             verified.append(r)
         elif isinstance(r, Exception):
+            errors.append(r)
             if emit:
                 await emit("log", {"message": f"Yutori poll error: {r}", "type": "warn"})
 
+    if not verified and errors:
+        raise errors[0]
     return verified
@@ -0,0 +1,54 @@
+"""ClaimCache lookups: exact and paraphrased claims hit, claims that mean something else miss."""
+import asyncio
+
+import pytest
+
+from pipeline.claim_cache import ClaimCache
+
+CLAIM = "Nvidia did apply for export licenses to sell H20 chips to China under President Trump's administration"
+VERDICT = {"claim": CLAIM, "verdict": "verified", "explanation": "Confirmed by filings.", "confidence": 0.9}
+
+
+@pytest.fixture
+def cache() -> ClaimCache:
+    cache = ClaimCache(path=None)
+    asyncio.run(cache.store(CLAIM, VERDICT))
+    return cache
+
+
+def test_exact_claim_hits(cache):
+    assert cache.lookup(CLAIM) == VERDICT
+    assert cache.lookup(CLAIM.upper() + ".") == VERDICT
+    assert cache.stats()["hits"] == 2
+
+
+@pytest.mark.parametrize("paraphrase", [
+    "Nvidia did apply for the export licenses to sell H20 chips to China, under President Trump's administration.",
+    "Nvidia did apply for export licenses to sell its H20 chips to China under President Trump's administration",
+])
+def test_paraphrase_hits(cache, paraphrase):
+    assert cache.lookup(paraphrase) == VERDICT
+    assert cache.stats()["near_duplicate_hits"] == 1
+
+
+@pytest.mark.parametrize("negation", [
+    "Nvidia did not apply for export licenses to sell H20 chips to China under President Trump's administration",
+    "Nvidia didn't apply for export licenses to sell H20 chips to China under President Trump's administration",
+    "Nvidia never did apply for export licenses to sell H20 chips to China under President Trump's administration",
+])
+def test_negation_misses(cache, negation):
+    assert cache.lookup(negation) is None
+
+
+@pytest.mark.parametrize("swapped", [
+    "Nvidia did apply for export licenses to sell H20 chips to Russia under President Trump's administration",
+    "Nvidia did apply for export licenses to sell H20 chips to China under President Biden's administration",
+    "AMD did apply for export licenses to sell H20 chips to China under President Trump's administration",
+])
+def test_swapped_names_miss(cache, swapped):
+    assert cache.lookup(swapped) is None
+
+
+def test_differing_numbers_miss(cache):
+    assert cache.lookup(CLAIM.replace("H20", "H30")) is None
+    assert cache.stats()["misses"] == 1
@@ -0,0 +1,83 @@
+"""Cancelling a job must abort the GLiNER calls it was waiting on, even coalesced ones."""
+import asyncio
+
+import httpx
+
+from pipeline import cancellation
+from pipeline.fastino_client import GlinerCoalescer
+
+
+class _SlowGliner:
+    """Mock GLiNER endpoint whose calls hang until cancelled."""
+
+    def __init__(self):
+        self.started = asyncio.Event()
+        self.requests = 0
+        self.aborted = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.started.set()
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            self.aborted += 1
+            raise
+        return httpx.Response(200, json={"result": {}})
+
+
+def _run(mode: str, jobs: int = 1, cancel: int = 1) -> tuple[_SlowGliner, GlinerCoalescer, list]:
+    async def scenario():
+        gliner = _SlowGliner()
+        coalescer = GlinerCoalescer(window=0.001, mode=mode)
+        payload = {"task": "extract_entities", "text": "Jensen Huang spoke in Las Vegas.", "schema": ["person"]}
+        async with httpx.AsyncClient(transport=httpx.MockTransport(gliner)) as client:
+            job_tasks = [asyncio.ensure_future(coalescer.submit(payload, "key", client)) for _ in range(jobs)]
+            await asyncio.wait_for(gliner.started.wait(), 1)
+            for task in job_tasks[:cancel]:
+                task.cancel()
+            await asyncio.sleep(0.05)
+            states = [task.cancelled() or task.done() for task in job_tasks]
+            for task in job_tasks:
+                task.cancel()
+            await asyncio.gather(*job_tasks, return_exceptions=True)
+        return gliner, coalescer, states
+
+    return asyncio.run(scenario())
+
+
+def test_cancelled_job_aborts_in_flight_burst_call():
+    before = cancellation.stats()["fastino_calls_cancelled"]
+    gliner, coalescer, _ = _run("burst")
+    assert gliner.requests == 1
+    assert gliner.aborted == 1
+    assert coalescer.stats()["abandoned"] == 1
+    assert cancellation.stats()["fastino_calls_cancelled"] == before + 1
+
+
+def test_cancelled_job_aborts_in_flight_multi_call():
+    gliner, _, _ = _run("multi")
+    assert gliner.aborted == 1
+
+
+def test_shared_call_survives_while_another_job_waits():
+    gliner, _, states = _run("burst", jobs=2, cancel=1)
+    assert gliner.requests == 1  # deduplicated into one call
+    assert states == [True, False]  # the second job is still waiting on the live call
+    assert gliner.aborted == 1  # aborted only once the second job left too
+
+
+def test_cancel_before_dispatch_drops_the_request():
+    async def scenario():
+        gliner = _SlowGliner()
+        coalescer = GlinerCoalescer(window=0.05, mode="burst")
+        async with httpx.AsyncClient(transport=httpx.MockTransport(gliner)) as client:
+            task = asyncio.ensure_future(coalescer.submit({"task": "t", "text": "x", "schema": []}, "key", client))
+            await asyncio.sleep(0)
+            task.cancel()
+            await asyncio.sleep(0.1)
+        return gliner, coalescer
+
+    gliner, coalescer = asyncio.run(scenario())
+    assert gliner.requests == 0
+    assert coalescer.stats()["batches"] == 0
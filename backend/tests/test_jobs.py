@@ -0,0 +1,63 @@
+"""JobManager run slots: a cancelled job always gives its slot back."""
+import asyncio
+
+from pipeline.jobs import JobManager
+from pipeline.scheduler import PipelineScheduler
+
+
+async def _idle_runner(job):
+    await asyncio.sleep(30)
+
+
+def test_cancel_before_start_releases_the_slot():
+    async def scenario():
+        scheduler = PipelineScheduler(max_concurrent=1, max_queue=4)
+        jobs = JobManager(scheduler=scheduler)
+        job = jobs.start("https://youtu.be/abc", _idle_runner)
+        job.task.cancel()  # e.g. DELETE /api/jobs/{id} straight after the POST
+        await asyncio.gather(job.task, return_exceptions=True)
+        await asyncio.sleep(0)
+        return scheduler, job
+
+    scheduler, job = asyncio.run(scenario())
+    assert scheduler.stats()["running"] == 0
+    assert job.status == "cancelled"
+    assert job.finished_at is not None
+
+
+def test_next_job_runs_after_a_cancelled_one():
+    async def scenario():
+        scheduler = PipelineScheduler(max_concurrent=1, max_queue=4)
+        jobs = JobManager(scheduler=scheduler)
+        ran = asyncio.Event()
+
+        async def runner(job):
+            ran.set()
+
+        first = jobs.start("https://youtu.be/abc", _idle_runner)
+        second = jobs.start("https://youtu.be/abd", runner)
+        first.task.cancel()
+        await asyncio.wait_for(ran.wait(), 1)
+        await second.task
+        return scheduler, first, second
+
+    scheduler, first, second = asyncio.run(scenario())
+    assert first.status == "cancelled"
+    assert second.finished
+    assert scheduler.stats()["running"] == 0
+
+
+def test_cancel_while_running_releases_the_slot():
+    async def scenario():
+        scheduler = PipelineScheduler(max_concurrent=1, max_queue=4)
+        jobs = JobManager(scheduler=scheduler)
+        job = jobs.start("https://youtu.be/abc", _idle_runner)
+        await asyncio.sleep(0.01)
+        job.cancel("client went away")
+        await asyncio.gather(job.task, return_exceptions=True)
+        return scheduler, job
+
+    scheduler, job = asyncio.run(scenario())
+    assert scheduler.stats()["running"] == 0
+    assert job.status == "cancelled"
+    assert [event for _, event, _ in job._buffer][-1] == "cancelled"
@@ -0,0 +1,254 @@
+"""ResilientTransport against httpx.MockTransport: retries, the circuit breaker and hedging."""
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from pipeline import resilience
+from pipeline.resilience import CircuitOpenError, ResiliencePolicy, ResilientTransport
+
+
+@pytest.fixture(autouse=True)
+def fresh_health():
+    """Breakers and latency windows are process-wide; give every test its own."""
+    saved = dict(resilience._health)
+    resilience._health.clear()
+    yield
+    resilience._health.clear()
+    resilience._health.update(saved)
+
+
+def _policy(**overrides) -> ResiliencePolicy:
+    settings = dict(retries=2, retry_base=0.001, retry_max_delay=1.0, hedge=False, breaker_failures=5, breaker_reset=30.0)
+    settings.update(overrides)
+    return ResiliencePolicy(**settings)
+
+
+def _client(handler, vendor: str, policy: ResiliencePolicy) -> httpx.AsyncClient:
+    transport = ResilientTransport(httpx.MockTransport(handler), vendor, policy)
+    return httpx.AsyncClient(transport=transport, base_url="https://vendor.test")
+
+
+class _Replies:
+    """Handler answering with ``responses`` in turn, counting the calls."""
+
+    def __init__(self, *responses: httpx.Response):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        return self.responses.pop(0)
+
+
+class _TrackedStream(httpx.AsyncByteStream):
+    def __init__(self, body: bytes = b"{}"):
+        self.body = body
+        self.closed = False
+
+    async def __aiter__(self):
+        yield self.body
+
+    async def aclose(self):
+        self.closed = True
+
+
+# ── Retries ──
+
+def test_429_retry_after_within_cap_is_waited_out():
+    replies = _Replies(httpx.Response(429, headers={"Retry-After": "0.1"}), httpx.Response(200, json={}))
+
+    async def call():
+        async with _client(replies, "fastino", _policy()) as client:
+            started = time.monotonic()
+            response = await client.post("/gliner-2", json={})
+            return response, time.monotonic() - started
+
+    response, elapsed = asyncio.run(call())
+    assert response.status_code == 200
+    assert replies.calls == 2
+    assert elapsed >= 0.1
+
+
+def test_429_retry_after_beyond_cap_is_returned():
+    replies = _Replies(httpx.Response(429, headers={"Retry-After": "30"}), httpx.Response(200, json={}))
+
+    async def call():
+        async with _client(replies, "fastino", _policy(retry_max_delay=1.0)) as client:
+            return await client.post("/gliner-2", json={})
+
+    response = asyncio.run(call())
+    assert response.status_code == 429
+    assert replies.calls == 1
+
+
+def test_non_idempotent_post_is_not_retried_on_5xx():
+    replies = _Replies(httpx.Response(503), httpx.Response(200, json={"task_id": "t"}))
+
+    async def call():
+        async with _client(replies, "yutori", _policy()) as client:
+            return await client.post("/v1/research/tasks", json={"query": "claim"})
+
+    response = asyncio.run(call())
+    assert response.status_code == 503
+    assert replies.calls == 1
+    assert resilience.stats()["yutori"]["retries"] == 0
+
+
+def test_read_is_retried_on_5xx():
+    replies = _Replies(httpx.Response(503), httpx.Response(200, json={}))
+
+    async def call():
+        async with _client(replies, "fastino", _policy()) as client:
+            return await client.post("/gliner-2", json={})
+
+    assert asyncio.run(call()).status_code == 200
+    assert replies.calls == 2
+
+
+# ── Circuit breaker ──
+
+def test_breaker_opens_probes_once_and_closes():
+    calls = []
+
+    async def scenario():
+        release = asyncio.Event()
+        started = asyncio.Event()
+        failing = True
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            calls.append(request.url.path)
+            if failing:
+                return httpx.Response(503)
+            started.set()
+            await release.wait()
+            return httpx.Response(200, json={})
+
+        policy = _policy(retries=0, breaker_failures=2, breaker_reset=0.05)
+        async with _client(handler, "fastino", policy) as client:
+            breaker = resilience.vendor_health("fastino").breaker
+            states = [breaker.state]
+            for _ in range(2):
+                assert (await client.post("/gliner-2", json={})).status_code == 503
+            states.append(breaker.state)
+            with pytest.raises(CircuitOpenError):
+                await client.post("/gliner-2", json={})
+            assert len(calls) == 2  # rejected without reaching the vendor
+
+            await asyncio.sleep(0.06)
+            failing = False
+            probe = asyncio.ensure_future(client.post("/gliner-2", json={}))
+            await asyncio.wait_for(started.wait(), 1)
+            states.append(breaker.state)
+            with pytest.raises(CircuitOpenError):
+                await client.post("/gliner-2", json={})  # only the probe gets through
+            release.set()
+            assert (await probe).status_code == 200
+            states.append(breaker.state)
+            assert (await client.post("/gliner-2", json={})).status_code == 200
+            return states, breaker.stats()
+
+    states, stats = asyncio.run(scenario())
+    assert states == ["closed", "open", "half_open", "closed"]
+    assert stats["trips"] == 1
+    assert stats["rejected"] == 2
+    assert len(calls) == 4
+
+
+def test_failed_probe_reopens_the_breaker():
+    replies = _Replies(httpx.Response(503), httpx.Response(503))
+
+    async def scenario():
+        async with _client(replies, "fastino", _policy(retries=0, breaker_failures=1, breaker_reset=0.02)) as client:
+            await client.post("/gliner-2", json={})
+            await asyncio.sleep(0.03)
+            await client.post("/gliner-2", json={})
+            return resilience.vendor_health("fastino").breaker.state
+
+    assert asyncio.run(scenario()) == "open"
+
+
+# ── Hedging ──
+
+def _hedging_policy() -> ResiliencePolicy:
+    return _policy(hedge=True, hedge_min_delay=0.01, hedge_min_samples=1, hedge_budget=1.0)
+
+
+def _prime(client: httpx.AsyncClient, seconds: float = 0.01):
+    window = client._transport.health.latency.setdefault("/gliner-2", resilience._LatencyWindow())
+    for _ in range(20):
+        window.add(seconds)
+
+
+def test_slow_primary_loses_to_hedge_and_is_cancelled():
+    seen = {"calls": 0, "cancelled": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        seen["calls"] += 1
+        if seen["calls"] == 1:
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                seen["cancelled"] += 1
+                raise
+        return httpx.Response(200, json={"attempt": seen["calls"]})
+
+    async def scenario():
+        async with _client(handler, "fastino", _hedging_policy()) as client:
+            _prime(client)
+            response = await client.post("/gliner-2", json={})
+            await asyncio.sleep(0.01)  # let the cancelled primary unwind
+            return response
+
+    response = asyncio.run(scenario())
+    assert response.json() == {"attempt": 2}
+    assert seen["cancelled"] == 1
+    stats = resilience.stats()["fastino"]
+    assert stats["hedges"] == 1 and stats["hedge_wins"] == 1
+
+
+def test_losing_response_is_closed():
+    streams = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        attempt = len(streams)
+        stream = _TrackedStream()
+        streams.append(stream)
+        if attempt == 0:
+            await asyncio.sleep(0.05)  # answers after the hedge was sent, with a failure
+            return httpx.Response(503, stream=stream)
+        await asyncio.sleep(0.1)
+        return httpx.Response(200, stream=stream)
+
+    async def scenario():
+        async with _client(handler, "fastino", _hedging_policy()) as client:
+            _prime(client)
+            return await client.post("/gliner-2", json={})
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert len(streams) == 2
+    assert streams[0].closed  # the primary's 503 lost and was released
+
+
+def test_reka_qa_is_retried_but_never_hedged():
+    seen = {"calls": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        seen["calls"] += 1
+        if seen["calls"] == 1:
+            return httpx.Response(503)
+        await asyncio.sleep(0.1)  # far slower than the primed p95
+        return httpx.Response(200, json={"chat_response": "answer"})
+
+    async def scenario():
+        async with _client(handler, "reka", _hedging_policy()) as client:
+            window = client._transport.health.latency.setdefault("/v1/qa/chat", resilience._LatencyWindow())
+            for _ in range(20):
+                window.add(0.01)
+            return await client.post("/v1/qa/chat", json={"video_id": "v", "messages": []})
+
+    assert asyncio.run(scenario()).status_code == 200
+    assert seen["calls"] == 2  # one retry after the 503, no hedge
+    assert resilience.stats()["reka"]["hedges"] == 0
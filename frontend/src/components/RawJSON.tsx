@@ -1,6 +1,7 @@
 "use client";
 
 import { useState } from "react";
+import { useNewsForgeStore } from "@/store/newsforgeStore";
 import type { IntelligenceFeed } from "@/types";
 
 interface Props {
@@ -10,6 +11,8 @@ interface Props {
 export default function RawJSON({ data }: Props) {
   const [open, setOpen] = useState(false);
   const [copied, setCopied] = useState(false);
+  const loadRawReka = useNewsForgeStore((s) => s.loadRawReka);
+  const rawLoading = useNewsForgeStore((s) => s.rawLoading);
 
   const jsonStr = JSON.stringify(data, null, 2);
 
@@ -22,7 +25,11 @@ export default function RawJSON({ data }: Props) {
   return (
     <div className="bg-[#111118] border border-[#1e1e2e] rounded-xl overflow-hidden">
       <button
-        onClick={() => setOpen(!open)}
+        onClick={() => {
+          // A feed sent by reference fetches its raw Reka answers on first open
+          if (!open) loadRawReka();
+          setOpen(!open);
+        }}
         className="w-full px-5 py-3 flex items-center justify-between hover:bg-[#151520] transition-colors"
       >
         <span className="text-sm font-medium text-zinc-400 flex items-center gap-2">
@@ -30,7 +37,7 @@ export default function RawJSON({ data }: Props) {
           {open ? "Hide" : "Show"} Raw JSON
         </span>
         <span className="text-zinc-600 text-xs">
-          {(jsonStr.length / 1024).toFixed(1)} KB
+          {rawLoading ? "Loading raw Reka answers…" : `${(jsonStr.length / 1024).toFixed(1)} KB`}
         </span>
       </button>
 
@@ -24,15 +24,19 @@ interface NewsForgeState {
   sentiment: string | null;
   claims: VerifiedClaim[];
   feed: IntelligenceFeed | null;
+  rawLoading: boolean;
   error: string | null;
 
   startAnalysis: (videoUrl: string) => void;
   handleSSEEvent: (eventType: string, data: Record<string, unknown>) => void;
+  loadRawReka: () => Promise<void>;
   reset: () => void;
 }
 
 let logCounter = 0;
 
+const backendUrl = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
+
 function addLog(
   state: Pick<NewsForgeState, "liveLog">,
   message: string,
@@ -62,6 +66,7 @@ export const useNewsForgeStore = create<NewsForgeState>((set, get) => ({
   sentiment: null,
   claims: [],
   feed: null,
+  rawLoading: false,
   error: null,
 
   startAnalysis: (videoUrl: string) => {
@@ -83,6 +88,7 @@ export const useNewsForgeStore = create<NewsForgeState>((set, get) => ({
       sentiment: null,
       claims: [],
       feed: null,
+      rawLoading: false,
       error: null,
     });
   },
@@ -106,6 +112,15 @@ export const useNewsForgeStore = create<NewsForgeState>((set, get) => ({
         break;
       }
 
+      case "queued": {
+        const position = (data.position as number) || 0;
+        const wait = Math.round((data.estimated_wait as number) || 0);
+        set({
+          liveLog: addLog(state, `Queued at position ${position} (~${wait}s wait)`, "info"),
+        });
+        break;
+      }
+
       case "video_uploaded": {
         set({
           liveLog: addLog(state, `Video uploaded: ${data.video_id}`, "success"),
@@ -123,13 +138,15 @@ export const useNewsForgeStore = create<NewsForgeState>((set, get) => ({
 
       case "reka_stream": {
         const prompt = (data.prompt as string) || "unknown";
-        const chunk = (data.chunk as string) || "";
+        // Frames are deltas: keep the first `offset` chars, then append `delta`
+        const offset = (data.offset as number) || 0;
+        const delta = (data.delta as string) || "";
         set({
           rekaStreams: {
             ...state.rekaStreams,
-            [prompt]: (state.rekaStreams[prompt] || "") + " " + chunk,
+            [prompt]: (state.rekaStreams[prompt] || "").slice(0, offset) + delta,
           },
-          liveLog: addLog(state, chunk, "stream"),
+          liveLog: addLog(state, delta.length > 80 ? delta.slice(-80) : delta, "stream"),
         });
         break;
       }
@@ -183,6 +200,29 @@ export const useNewsForgeStore = create<NewsForgeState>((set, get) => ({
         break;
       }
 
+      case "entities_partial": {
+        const partial = (data.entities as Record<string, string[]>) || {};
+        set({
+          entities: {
+            persons: partial.person || [],
+            organizations: partial.organization || [],
+            locations: [...(partial.location || []), ...(partial.country || [])],
+            dates: partial.date || [],
+            topics: partial.topic || [],
+          },
+        });
+        break;
+      }
+
+      case "events_partial": {
+        const found = (data.events as ExtractedEvent[]) || [];
+        set({
+          events: [...state.events, ...found],
+          liveLog: addLog(state, `Fastino: ${found.length} events found in transcript segment ${data.segment}`, "info"),
+        });
+        break;
+      }
+
       case "fastino_complete": {
         set({
           events: (data.events as ExtractedEvent[]) || [],
@@ -203,8 +243,12 @@ export const useNewsForgeStore = create<NewsForgeState>((set, get) => ({
       }
 
       case "complete": {
+        const feed = data.feed as IntelligenceFeed;
         set({
-          feed: data.feed as IntelligenceFeed,
+          // By reference, raw_reka is left out and fetched from raw_url when needed
+          feed: data.raw_url
+            ? { ...feed, feed_id: data.feed_id as number, raw_url: data.raw_url as string }
+            : feed,
           stage: "done",
           progress: 100,
           liveLog: addLog(state, "Analysis complete!", "success"),
@@ -229,6 +273,16 @@ export const useNewsForgeStore = create<NewsForgeState>((set, get) => ({
         break;
       }
 
+      case "timing": {
+        const path = ((data.critical_path as { stage: string; duration_s: number }[]) || [])
+          .map((s) => `${s.stage} ${s.duration_s}s`)
+          .join(" → ");
+        set({
+          liveLog: addLog(state, `Critical path (${data.total_s}s): ${path}`, "info"),
+        });
+        break;
+      }
+
       case "ping":
         break;
 
@@ -237,6 +291,26 @@ export const useNewsForgeStore = create<NewsForgeState>((set, get) => ({
     }
   },
 
+  loadRawReka: async () => {
+    const { feed, rawLoading } = get();
+    if (!feed || feed.raw_reka || !feed.raw_url || rawLoading) return;
+    set({ rawLoading: true });
+    try {
+      const resp = await fetch(`${backendUrl}${feed.raw_url}`);
+      if (!resp.ok) throw new Error(`HTTP ${resp.status}: ${resp.statusText}`);
+      const raw = (await resp.json()) as Record<string, unknown>;
+      const current = get().feed;
+      // Skip it if a new analysis replaced the feed meanwhile
+      if (current && current.raw_url === feed.raw_url) {
+        set({ feed: { ...current, raw_reka: raw } });
+      }
+    } catch (err) {
+      set({ liveLog: addLog(get(), `Could not load raw Reka answers: ${err}`, "warn") });
+    } finally {
+      set({ rawLoading: false });
+    }
+  },
+
   reset: () => {
     logCounter = 0;
     set({
@@ -254,6 +328,7 @@ export const useNewsForgeStore = create<NewsForgeState>((set, get) => ({
       sentiment: null,
       claims: [],
       feed: null,
+      rawLoading: false,
       error: null,
     });
   },
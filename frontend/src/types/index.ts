@@ -40,7 +40,11 @@ export interface IntelligenceFeed {
   total_stories: number;
   key_quotes: string[];
   broadcast_tags: string[];
-  raw_reka: Record<string, unknown>;
+  raw_reka?: Record<string, unknown>;
+  // Set when the backend sends raw_reka by reference (FEED_RAW_BY_REFERENCE):
+  // fetch raw_url for it on demand
+  feed_id?: number;
+  raw_url?: string;
 }
 
 export interface PipelineStep {